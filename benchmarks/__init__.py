@@ -0,0 +1 @@
+"""Offline solver benchmarks (no network, no LLM)."""
@@ -0,0 +1,76 @@
+"""Benchmark the solver's variable encodings on the same synthetic instances.
+
+Usage: uv run python -m benchmarks.encodings [--instances 20] [--seed 0] [--timeout 60] [--overloaded]
+
+Prints one JSON object per (instance, encoding) run, then one summary object per encoding.
+Each run builds a fresh context, so the timing covers encoding and solving. ``--overloaded``
+makes every instance unsat with a pigeonhole, to time infeasibility proofs instead.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+
+from benchmarks.instances import generate_instance, overload
+from easyorario.services.solver import ENCODINGS, IncrementalSolver
+
+
+def _clauses(stats: dict[str, float]) -> int:
+    """Clauses Z3 created, counted by the SMT core or, for QF_FD, by the SAT core."""
+    return int(stats.get("mk clause", stats.get("sat mk clause 2ary", 0) + stats.get("sat mk clause nary", 0)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--instances", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--overloaded", action="store_true")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    instances = [generate_instance(rng) for _ in range(args.instances)]
+    if args.overloaded:
+        instances = [overload(solver_input) for solver_input in instances]
+    timings: dict[str, list[float]] = {}
+    clauses: dict[str, list[int]] = {}
+    for index, solver_input in enumerate(instances):
+        for name in ENCODINGS:
+            started = time.perf_counter()
+            context = IncrementalSolver(solver_input, encoding=name)
+            outcome = context.check(solver_input, args.timeout)
+            elapsed = time.perf_counter() - started
+            stats = context.solver.statistics()
+            created = _clauses(dict(stats[i] for i in range(len(stats))))
+            timings.setdefault(name, []).append(elapsed)
+            clauses.setdefault(name, []).append(created)
+            print(
+                json.dumps(
+                    {
+                        "instance": index,
+                        "encoding": name,
+                        "status": str(outcome),
+                        "seconds": elapsed,
+                        "clauses": created,
+                    }
+                )
+            )
+
+    for name, values in timings.items():
+        print(
+            json.dumps(
+                {
+                    "encoding": name,
+                    "runs": len(values),
+                    "median_seconds": statistics.median(values),
+                    "total_seconds": sum(values),
+                    "median_clauses": statistics.median(clauses[name]),
+                }
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Synthetic timetable instances shaped like real Italian school classes."""
+
+import dataclasses
+import random
+import uuid
+
+from easyorario.services.grid import DAYS, SolverInput, slots_per_day, subject_hours
+
+SUBJECTS: tuple[str, ...] = (
+    "Italiano",
+    "Matematica",
+    "Inglese",
+    "Storia",
+    "Filosofia",
+    "Fisica",
+    "Scienze",
+    "Latino",
+    "Disegno",
+    "Scienze motorie",
+    "Religione",
+    "Informatica",
+    "Chimica",
+    "Arte",
+)
+
+# A full-time Italian secondary teaching post (cattedra) is 18 lessons a week.
+TEACHER_WEEKLY_HOURS = 18
+
+
+def _formal(constraint_type: str, **fields) -> dict:
+    base = {
+        "constraint_type": constraint_type,
+        "description": "",
+        "teacher": None,
+        "subject": None,
+        "days": None,
+        "time_slots": None,
+        "max_consecutive_hours": None,
+        "room": None,
+        "notes": None,
+    }
+    return {**base, **fields}
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128)))
+
+
+def _constraints(rng: random.Random, subjects: list[str], teachers: dict[str, str], slots: int) -> dict[str, dict]:
+    """The mix a class typically collects: a few unavailable teachers, consecutive-hour caps
+    and a subject or two pinned to part of the day.
+    """
+    constraints: dict[str, dict] = {}
+    staff = sorted(set(teachers.values()))
+    for teacher in rng.sample(staff, min(len(staff), rng.randint(1, 3))):
+        constraints[_uuid(rng)] = _formal(
+            "teacher_unavailable",
+            teacher=teacher,
+            days=rng.sample(DAYS, rng.choice((1, 1, 2))),
+            time_slots=rng.choice((None, None, list(range(1, slots // 2 + 1)))),
+        )
+    for subject in rng.sample(subjects, rng.randint(1, 3)):
+        constraints[_uuid(rng)] = _formal("max_consecutive", subject=subject, max_consecutive_hours=2)
+    for subject in rng.sample(subjects, rng.randint(0, 2)):
+        half = slots // 2 + 1
+        early = rng.random() < 0.5
+        constraints[_uuid(rng)] = _formal(
+            "subject_scheduling",
+            subject=subject,
+            time_slots=list(range(1, half + 1)) if early else list(range(slots - half + 1, slots + 1)),
+        )
+    return constraints
+
+
+def _class_skeleton(rng: random.Random) -> SolverInput:
+    """A class with hours and subjects but no teachers or constraints yet."""
+    return SolverInput(
+        timetable_id=_uuid(rng),
+        weekly_hours=rng.randint(24, 40),
+        subjects=rng.sample(SUBJECTS, rng.randint(8, 14)),
+        teachers={},
+        constraints={},
+    )
+
+
+def generate_instance(rng: random.Random) -> SolverInput:
+    """A single class with random teacher availability and scheduling restrictions.
+
+    Each teacher covers two of the class's subjects, as with Italiano and Storia.
+    """
+    solver_input = _class_skeleton(rng)
+    solver_input.teachers = {subject: f"Prof. {i // 2 + 1}" for i, subject in enumerate(solver_input.subjects)}
+    solver_input.constraints = _constraints(
+        rng, solver_input.subjects, solver_input.teachers, slots_per_day(solver_input.weekly_hours)
+    )
+    return solver_input
+
+
+def generate_school(rng: random.Random, classes: int) -> list[SolverInput]:
+    """Classes of one school whose teachers teach their subject in several classes.
+
+    A subject goes to one of its teachers with room left in their weekly post; a new teacher
+    is hired when none has, so nobody is booked for more than ``TEACHER_WEEKLY_HOURS``.
+    """
+    load: dict[str, int] = {}
+    staff: dict[str, list[str]] = {}
+    inputs: list[SolverInput] = []
+    for _ in range(classes):
+        solver_input = _class_skeleton(rng)
+        for subject, hours in subject_hours(solver_input).items():
+            candidates = [t for t in staff.get(subject, []) if load[t] + hours <= TEACHER_WEEKLY_HOURS]
+            if candidates:
+                teacher = rng.choice(candidates)
+            else:
+                teacher = f"Prof. {subject} {len(staff.get(subject, [])) + 1}"
+                staff.setdefault(subject, []).append(teacher)
+                load[teacher] = 0
+            load[teacher] += hours
+            solver_input.teachers[subject] = teacher
+        solver_input.constraints = _constraints(
+            rng, solver_input.subjects, solver_input.teachers, slots_per_day(solver_input.weekly_hours)
+        )
+        inputs.append(solver_input)
+    return inputs
+
+
+def overload(solver_input: SolverInput, window: int = 2) -> SolverInput:
+    """Unsat variant: confine subjects to the first ``window`` daily slots until they cannot fit.
+
+    A pigeonhole over whole weeks, the kind of infeasibility whose proof suffers most from
+    symmetric models.
+    """
+    capacity = len(DAYS) * window
+    constraints = dict(solver_input.constraints)
+    confined = 0
+    for subject, hours in subject_hours(solver_input).items():
+        constraints[f"overload-{subject}"] = _formal(
+            "subject_scheduling", subject=subject, time_slots=list(range(1, window + 1))
+        )
+        confined += hours
+        if confined > capacity:
+            break
+    return dataclasses.replace(solver_input, timetable_id=str(uuid.uuid4()), constraints=constraints)
@@ -0,0 +1,76 @@
+"""Replay SMT-LIB2 solver dumps with timing and Z3 statistics.
+
+Usage: uv run python -m benchmarks.replay DUMP_OR_DIR... [--timeout 60] [--config sat] [--repeat 1]
+       [--output report.json]
+
+Dumps are written by the service when SOLVER_DUMP_DIR is set, one per solved instance; a
+directory argument replays every dump in it. Each dump is checked with the configuration it
+was solved with, or ``--config`` for all of them, so a tactic or encoding change can be
+measured against the instances that were slow in production. Prints one JSON object per
+run, then a summary with median and p95 check time and sat/unsat/timeout counts.
+"""
+
+import argparse
+import json
+import statistics
+from pathlib import Path
+
+from benchmarks.suite import percentile
+from easyorario.services.smtlib import DUMP_SUFFIX, read_dump, replay
+from easyorario.services.solver import PORTFOLIO
+
+
+def _dumps(paths: list[Path]) -> list[Path]:
+    found: list[Path] = []
+    for path in paths:
+        found.extend(sorted(path.glob(f"*{DUMP_SUFFIX}")) if path.is_dir() else [path])
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="+", type=Path)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--config", choices=[config.name for config in PORTFOLIO])
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    configs = {config.name: config for config in PORTFOLIO}
+    runs: list[dict] = []
+    for path in _dumps(args.paths):
+        header, text = read_dump(path)
+        if args.config is not None:
+            config = configs[args.config]
+            logic, params = config.logic, list(config.params)
+        else:
+            logic, params = header.get("logic"), [tuple(param) for param in header.get("params", [])]
+        for attempt in range(args.repeat):
+            status, seconds, stats = replay(text, args.timeout, logic, params)
+            run = {
+                "dump": path.name,
+                "attempt": attempt,
+                "config": args.config or header.get("config"),
+                "encoding": header.get("encoding"),
+                "status": status,
+                "seconds": seconds,
+                "statistics": stats,
+            }
+            print(json.dumps(run), flush=True)
+            runs.append(run)
+
+    seconds = [run["seconds"] for run in runs]
+    summary = {
+        "runs": len(runs),
+        **{status: sum(run["status"] == status for run in runs) for status in ("sat", "unsat", "timeout")},
+        "median_seconds": statistics.median(seconds) if seconds else 0.0,
+        "p95_seconds": percentile(seconds, 0.95),
+        "total_seconds": sum(seconds),
+    }
+    print(json.dumps(summary))
+    if args.output is not None:
+        args.output.write_text(json.dumps({"parameters": vars(args), "runs": runs, "summary": summary}, default=str))
+
+
+if __name__ == "__main__":
+    main()
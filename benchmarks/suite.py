@@ -0,0 +1,146 @@
+"""Benchmark the solver service on synthetic single-class and school instances.
+
+Usage: uv run python -m benchmarks.suite [--instances 20] [--schools 5] [--classes 4] [--unsat-share 0.2]
+       [--seed 0] [--timeout 60] [--encoding onehot] [--workers 2] [--output report.json]
+
+Prints one JSON object per solve, then one summary object per instance kind with median and
+p95 solve time, peak Z3 memory and sat/unsat/timeout counts. ``--output`` also writes the whole
+report as one JSON document, so encoding or tactic changes can be compared run to run.
+Solves go through SolverService and its worker pool, without database, network or LLM.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import statistics
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+import structlog
+
+from benchmarks.instances import generate_instance, generate_school, overload
+from easyorario.exceptions import SolverJobError
+from easyorario.services.grid import SolverInput
+from easyorario.services.solver import DEFAULT_ENCODING, ENCODINGS, SolverService
+from easyorario.services.solver_pool import SolverPool
+
+
+def percentile(values: list[float], share: float) -> float:
+    """Nearest-rank percentile; 0.0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(share * len(ordered)) - 1))]
+
+
+def summarize(kind: str, runs: list[dict]) -> dict:
+    seconds = [run["seconds"] for run in runs]
+    # Z3's own peak heap in the worker, as reported by its "max memory" statistic.
+    memory = [run["memory_mb"] for run in runs if run["memory_mb"] is not None]
+    return {
+        "kind": kind,
+        "runs": len(runs),
+        **{status: sum(run["status"] == status for run in runs) for status in ("sat", "unsat", "timeout", "failed")},
+        "median_seconds": statistics.median(seconds) if seconds else 0.0,
+        "p95_seconds": percentile(seconds, 0.95),
+        "max_memory_mb": max(memory, default=None),
+    }
+
+
+async def _measure(kind: str, index: int, solve: Callable[[], Awaitable], **fields) -> dict:
+    started = time.perf_counter()
+    try:
+        result = await solve()
+    except SolverJobError as exc:
+        status, memory = "failed", None
+        fields["error"] = exc.error_key
+    else:
+        status, memory = result.status, result.statistics.get("max memory")
+    run = {
+        "kind": kind,
+        "instance": index,
+        **fields,
+        "status": status,
+        "seconds": time.perf_counter() - started,
+        "memory_mb": memory,
+    }
+    print(json.dumps(run), flush=True)
+    return run
+
+
+def _size(inputs: list[SolverInput]) -> dict:
+    return {
+        "classes": len(inputs),
+        "weekly_hours": sum(solver_input.weekly_hours for solver_input in inputs),
+        "constraints": sum(len(solver_input.constraints) for solver_input in inputs),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    rng = random.Random(args.seed)
+    classes = [generate_instance(rng) for _ in range(args.instances)]
+    unsat = set(rng.sample(range(len(classes)), round(args.unsat_share * len(classes))))
+    classes = [overload(c) if i in unsat else c for i, c in enumerate(classes)]
+    schools = [generate_school(rng, args.classes) for _ in range(args.schools)]
+
+    pool = SolverPool(workers=args.workers, preload=["easyorario.services.solver"])
+    service = SolverService(
+        constraint_repo=None,  # type: ignore[arg-type]  # only pre-built inputs are solved
+        solver_pool=pool,
+        timeout_seconds=args.timeout,
+        encoding=args.encoding,
+    )
+    runs: list[dict] = []
+    try:
+        for index, solver_input in enumerate(classes):
+            runs.append(
+                await _measure(
+                    "class",
+                    index,
+                    lambda s=solver_input: service.solve_input(s),
+                    overloaded=index in unsat,
+                    **_size([solver_input]),
+                )
+            )
+        for index, inputs in enumerate(schools):
+            runs.append(
+                await _measure("school", index, lambda s=inputs: service.solve_school_inputs(s), **_size(inputs))
+            )
+    finally:
+        pool.shutdown()
+
+    summaries = [summarize(kind, [r for r in runs if r["kind"] == kind]) for kind in ("class", "school")]
+    for summary in summaries:
+        print(json.dumps(summary))
+    return {"parameters": vars(args), "runs": runs, "summary": summaries}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--instances", type=int, default=20)
+    parser.add_argument("--schools", type=int, default=5)
+    parser.add_argument("--classes", type=int, default=4)
+    parser.add_argument("--unsat-share", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--encoding", choices=sorted(ENCODINGS), default=DEFAULT_ENCODING)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    # Keep stdout machine-readable: service logs go to stderr, warnings and up only.
+    structlog.configure(
+        wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING),
+        logger_factory=structlog.PrintLoggerFactory(sys.stderr),
+    )
+    report = asyncio.run(run(args))
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
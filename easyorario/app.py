@@ -1,6 +1,9 @@
 """Litestar application factory."""
 
+import functools
 import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Any
 
@@ -14,13 +17,16 @@
 )
 from advanced_alchemy.extensions.litestar.plugins.init.config.asyncio import autocommit_handler_maker
 from litestar import Litestar, Request, Response
+from litestar.config.app import AppConfig
 from litestar.config.csrf import CSRFConfig
 from litestar.connection import ASGIConnection
 from litestar.contrib.jinja import JinjaTemplateEngine
+from litestar.datastructures import State
 from litestar.di import Provide
 from litestar.exceptions import NotAuthorizedException
 from litestar.logging import StructLoggingConfig
 from litestar.middleware.session.server_side import ServerSideSessionBackend, ServerSideSessionConfig
+from litestar.plugins import InitPluginProtocol
 from litestar.plugins.structlog import StructlogConfig, StructlogPlugin
 from litestar.response import Redirect, Template
 from litestar.security.session_auth import SessionAuth
@@ -38,16 +44,25 @@
 from easyorario.controllers.health import HealthController
 from easyorario.controllers.home import HomeController
 from easyorario.controllers.settings import SettingsController
+from easyorario.controllers.solver import SolverController
 from easyorario.controllers.timetable import TimetableController
 from easyorario.i18n.errors import MESSAGES
 from easyorario.models.base import Base
 from easyorario.models.user import User
 from easyorario.repositories.constraint import ConstraintRepository
+from easyorario.repositories.revision import RevisionRepository
+from easyorario.repositories.solver_cache import SolverCacheRepository
 from easyorario.repositories.timetable import TimetableRepository
 from easyorario.repositories.user import UserRepository
 from easyorario.services.auth import AuthService
+from easyorario.services.cancellation import CancellationRegistry
 from easyorario.services.constraint import ConstraintService
+from easyorario.services.generation import GenerationRunner, GenerationWorker
 from easyorario.services.llm import LLMService
+from easyorario.services.progress import ProgressBroker
+from easyorario.services.scheduler import SolverScheduler
+from easyorario.services.solver import SolverService, limit_z3_memory
+from easyorario.services.solver_pool import SolverPool, WorkerLimits
 from easyorario.services.timetable import TimetableService
 
 _BASE_DIR = Path(__file__).resolve().parent.parent
@@ -62,6 +77,29 @@ def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
     cursor.close()
 
 
+class GenerationWorkerPlugin(InitPluginProtocol):
+    """Runs the inline generation worker for as long as the application serves requests.
+
+    Listed after the SQLAlchemy plugin, so its lifespan is entered once the engine exists and
+    left, handing running jobs back to the queue, before the engine is disposed.
+    """
+
+    def __init__(self, worker: GenerationWorker) -> None:
+        self.worker = worker
+
+    def on_app_init(self, app_config: AppConfig) -> AppConfig:
+        app_config.lifespan.append(self.lifespan)
+        return app_config
+
+    @asynccontextmanager
+    async def lifespan(self, _: Litestar) -> AsyncIterator[None]:
+        self.worker.start()
+        try:
+            yield
+        finally:
+            await self.worker.shutdown()
+
+
 def _auth_exception_handler(request: Request, _: NotAuthorizedException) -> Response:
     """Handle auth exceptions: redirect unauthenticated users, show 403 for wrong role."""
     user = request.scope.get("user")
@@ -100,6 +138,16 @@ async def provide_constraint_repository(db_session: AsyncSession) -> ConstraintR
     return ConstraintRepository(session=db_session)
 
 
+async def provide_revision_repository(db_session: AsyncSession) -> RevisionRepository:
+    """Provide RevisionRepository via DI."""
+    return RevisionRepository(session=db_session)
+
+
+async def provide_solver_cache_repository(db_session: AsyncSession) -> SolverCacheRepository:
+    """Provide SolverCacheRepository via DI."""
+    return SolverCacheRepository(session=db_session)
+
+
 async def provide_constraint_service(
     constraint_repo: ConstraintRepository, llm_service: LLMService
 ) -> ConstraintService:
@@ -112,8 +160,78 @@ async def provide_llm_service() -> LLMService:
     return LLMService()
 
 
-def create_app(database_url: str | None = None, create_all: bool = False, static_pool: bool = False) -> Litestar:
-    """Create and configure the Litestar application."""
+async def provide_solver_pool(state: State) -> SolverPool:
+    """Provide the application-wide SolverPool via DI."""
+    return state.solver_pool
+
+
+async def provide_solver_scheduler(state: State) -> SolverScheduler:
+    """Provide the application-wide SolverScheduler via DI."""
+    return state.solver_scheduler
+
+
+def build_solver_pool() -> SolverPool:
+    """Build the solver worker pool with the configured resource limits; shared by the app and worker."""
+    limits = WorkerLimits(memory_mb=settings.solver_memory_limit_mb, cpu_seconds=settings.solver_cpu_limit_seconds)
+    return SolverPool(
+        workers=settings.solver_workers,
+        preload=["easyorario.services.solver"],
+        limits=limits,
+        initializer=functools.partial(limit_z3_memory, limits.memory_mb) if limits.memory_mb > 0 else None,
+    )
+
+
+def build_solver_service(
+    db_session: AsyncSession, solver_pool: SolverPool, solver_scheduler: SolverScheduler | None = None
+) -> SolverService:
+    """Build a SolverService on a session; shared by DI and background generation jobs."""
+    return SolverService(
+        constraint_repo=ConstraintRepository(session=db_session),
+        revision_repo=RevisionRepository(session=db_session),
+        timetable_repo=TimetableRepository(session=db_session),
+        cache_repo=SolverCacheRepository(session=db_session),
+        cache_size=settings.solver_cache_size,
+        solver_pool=solver_pool,
+        scheduler=solver_scheduler,
+        timeout_seconds=settings.solver_timeout_seconds,
+        core_budget_seconds=settings.solver_core_budget_seconds,
+        portfolio_size=settings.solver_portfolio_size,
+        encoding=settings.solver_encoding,
+        dump_dir=settings.solver_dump_dir,
+        idle_hours=settings.solver_minimize_idle_hours,
+    )
+
+
+async def provide_solver_service(
+    db_session: AsyncSession, solver_pool: SolverPool, solver_scheduler: SolverScheduler
+) -> SolverService:
+    """Provide SolverService via DI."""
+    return build_solver_service(db_session, solver_pool, solver_scheduler)
+
+
+async def provide_generation_runner(state: State) -> GenerationRunner:
+    """Provide the application-wide GenerationRunner via DI."""
+    return state.generation_runner
+
+
+async def provide_cancellation(state: State) -> CancellationRegistry:
+    """Provide the application-wide CancellationRegistry via DI."""
+    return state.cancellation
+
+
+def create_app(
+    database_url: str | None = None,
+    create_all: bool = False,
+    static_pool: bool = False,
+    inline_worker: bool | None = None,
+) -> Litestar:
+    """Create and configure the Litestar application.
+
+    ``inline_worker`` overrides ``settings.solver_inline_worker``; without a worker, generation
+    jobs stay queued until a standalone worker claims them.
+    """
+    if inline_worker is None:
+        inline_worker = settings.solver_inline_worker
     engine_cfg = EngineConfig(poolclass=StaticPool) if static_pool else EngineConfig()
     db_config = SQLAlchemyAsyncConfig(
         connection_string=database_url or settings.database_url,
@@ -173,6 +291,36 @@ async def retrieve_user_handler(
         header_name="x-csrftoken",
     )
 
+    # Worker processes are spawned lazily on the first solve job.
+    solver_pool = build_solver_pool()
+    solver_scheduler = SolverScheduler(
+        solver_pool, per_owner=settings.solver_jobs_per_owner, queue_size=settings.solver_queue_size
+    )
+    cancellation = CancellationRegistry()
+    broker = ProgressBroker()
+    session_maker = db_config.create_session_maker()
+
+    def service_factory(session: AsyncSession) -> SolverService:
+        return build_solver_service(session, solver_pool, solver_scheduler)
+
+    generation_worker = (
+        GenerationWorker(
+            session_maker=session_maker,
+            service_factory=service_factory,
+            broker=broker,
+            cancellation=cancellation,
+            concurrency=settings.solver_workers,
+        )
+        if inline_worker
+        else None
+    )
+    generation_runner = GenerationRunner(
+        broker=broker,
+        session_maker=session_maker,
+        service_factory=service_factory,
+        worker=generation_worker,
+    )
+
     static_files = create_static_files_router(path="/static", directories=[_BASE_DIR / "static"])
 
     struct_log_config = StructLoggingConfig(
@@ -202,10 +350,15 @@ async def retrieve_user_handler(
             DashboardController,
             TimetableController,
             ConstraintController,
+            SolverController,
             SettingsController,
             static_files,
         ],
-        plugins=[SQLAlchemyPlugin(config=db_config), structlog_plugin],
+        plugins=[
+            SQLAlchemyPlugin(config=db_config),
+            *([GenerationWorkerPlugin(generation_worker)] if generation_worker is not None else []),
+            structlog_plugin,
+        ],
         dependencies={
             "user_repo": Provide(provide_user_repository),
             "auth_service": Provide(provide_auth_service),
@@ -213,8 +366,24 @@ async def retrieve_user_handler(
             "timetable_service": Provide(provide_timetable_service),
             "constraint_repo": Provide(provide_constraint_repository),
             "constraint_service": Provide(provide_constraint_service),
+            "revision_repo": Provide(provide_revision_repository),
+            "solver_cache_repo": Provide(provide_solver_cache_repository),
             "llm_service": Provide(provide_llm_service),
+            "solver_pool": Provide(provide_solver_pool),
+            "solver_scheduler": Provide(provide_solver_scheduler),
+            "solver_service": Provide(provide_solver_service),
+            "generation_runner": Provide(provide_generation_runner),
+            "cancellation": Provide(provide_cancellation),
         },
+        state=State(
+            {
+                "solver_pool": solver_pool,
+                "solver_scheduler": solver_scheduler,
+                "generation_runner": generation_runner,
+                "cancellation": cancellation,
+            }
+        ),
+        on_shutdown=[generation_runner.shutdown, solver_pool.shutdown],
         on_app_init=[session_auth.on_app_init],
         exception_handlers={NotAuthorizedException: _auth_exception_handler},
         csrf_config=csrf_config,
@@ -14,6 +14,33 @@ class Settings:
     database_url: str = field(default_factory=lambda: os.environ.get("DATABASE_URL", "sqlite+aiosqlite:///app.db"))
     debug: bool = field(default_factory=lambda: os.environ.get("DEBUG", "false").lower() == "true")
     base_dir: Path = field(default_factory=lambda: Path(__file__).resolve().parent.parent)
+    solver_workers: int = field(default_factory=lambda: int(os.environ.get("SOLVER_WORKERS", "2")))
+    solver_timeout_seconds: float = field(
+        default_factory=lambda: float(os.environ.get("SOLVER_TIMEOUT_SECONDS", "300"))
+    )
+    solver_core_budget_seconds: float = field(
+        default_factory=lambda: float(os.environ.get("SOLVER_CORE_BUDGET_SECONDS", "10"))
+    )
+    solver_encoding: str = field(default_factory=lambda: os.environ.get("SOLVER_ENCODING", "onehot"))
+    solver_portfolio_size: int = field(default_factory=lambda: int(os.environ.get("SOLVER_PORTFOLIO_SIZE", "1")))
+    solver_cache_size: int = field(default_factory=lambda: int(os.environ.get("SOLVER_CACHE_SIZE", "1000")))
+    solver_jobs_per_owner: int = field(default_factory=lambda: int(os.environ.get("SOLVER_JOBS_PER_OWNER", "2")))
+    solver_queue_size: int = field(default_factory=lambda: int(os.environ.get("SOLVER_QUEUE_SIZE", "64")))
+    # Per solver worker: address space in MB (Z3 gets most of it as memory_max_size) and CPU seconds per job; 0 = off.
+    solver_memory_limit_mb: int = field(default_factory=lambda: int(os.environ.get("SOLVER_MEMORY_LIMIT_MB", "0")))
+    solver_cpu_limit_seconds: int = field(default_factory=lambda: int(os.environ.get("SOLVER_CPU_LIMIT_SECONDS", "0")))
+    # Dump every single-timetable solve here as SMT-LIB2, for `just replay`; unset disables dumps.
+    solver_dump_dir: Path | None = field(
+        default_factory=lambda: Path(os.environ["SOLVER_DUMP_DIR"]) if os.environ.get("SOLVER_DUMP_DIR") else None
+    )
+    # Minimize teachers' idle hours between lessons; solves then use their whole timeout unless proven optimal.
+    solver_minimize_idle_hours: bool = field(
+        default_factory=lambda: os.environ.get("SOLVER_MINIMIZE_IDLE_HOURS", "false").lower() == "true"
+    )
+    # Run queued generation jobs inside the web process; false when `python -m easyorario.worker` runs them.
+    solver_inline_worker: bool = field(
+        default_factory=lambda: os.environ.get("SOLVER_INLINE_WORKER", "true").lower() == "true"
+    )
 
 
 settings = Settings()
@@ -14,9 +14,13 @@
 from easyorario.exceptions import InvalidConstraintDataError
 from easyorario.guards.auth import requires_responsible_professor
 from easyorario.i18n.errors import MESSAGES
+from easyorario.models.constraint import Constraint
+from easyorario.models.timetable import Timetable
 from easyorario.repositories.timetable import TimetableRepository
-from easyorario.services.constraint import ConstraintService
+from easyorario.services.cancellation import TRANSLATION, CancellationRegistry
+from easyorario.services.constraint import ConflictWarning, ConstraintService
 from easyorario.services.llm import get_llm_config
+from easyorario.services.solver import SolverService
 
 _log = structlog.get_logger()
 
@@ -26,6 +30,35 @@ class ConstraintFormData:
     text: str = ""
 
 
+def _verification_page(
+    request: Request,
+    timetable: Timetable,
+    constraints: list[Constraint],
+    constraint_service: ConstraintService,
+    notice: str | None = None,
+    warnings: list[ConflictWarning] | None = None,
+    flagged_id: uuid.UUID | None = None,
+) -> Template:
+    """Render the verification page; ``warnings`` go before the pre-solve conflict checks.
+
+    ``flagged_id`` is a constraint that failed its approval check: it gets an "approve anyway" button.
+    """
+    return Template(
+        template_name="pages/timetable_verification.html",
+        context={
+            "timetable": timetable,
+            "constraints": constraints,
+            "translated_count": sum(1 for c in constraints if c.status == "translated"),
+            "failed_count": sum(1 for c in constraints if c.status == "translation_failed"),
+            "verified_count": sum(1 for c in constraints if c.status == "verified"),
+            "conflict_warnings": [*(warnings or []), *constraint_service.detect_conflicts(constraints, timetable)],
+            "notice": notice,
+            "flagged_id": flagged_id,
+            "user": request.user,
+        },
+    )
+
+
 class ConstraintController(Controller):
     """Constraint input, listing, and verification for a timetable."""
 
@@ -103,8 +136,12 @@ async def translate_constraints(
         timetable_id: uuid.UUID,
         timetable_repo: TimetableRepository,
         constraint_service: ConstraintService,
+        cancellation: CancellationRegistry,
     ) -> Template | Redirect:
-        """Trigger LLM translation of pending constraints and render verification page."""
+        """Trigger LLM translation of pending constraints and render verification page.
+
+        The batch can be stopped from another request through the timetable's cancel endpoint.
+        """
         timetable = await timetable_repo.get(timetable_id)
         if timetable.owner_id != request.user.id:
             raise NotAuthorizedException(detail="Insufficient permissions")
@@ -113,27 +150,19 @@ async def translate_constraints(
         if not llm_config:
             return Redirect(path="/impostazioni?message=llm_config_required")
 
-        constraints = await constraint_service.translate_pending_constraints(
-            timetable=timetable,
-            llm_config=llm_config,
-        )
-
-        translated_count = sum(1 for c in constraints if c.status == "translated")
-        failed_count = sum(1 for c in constraints if c.status == "translation_failed")
-        verified_count = sum(1 for c in constraints if c.status == "verified")
-        conflict_warnings = constraint_service.detect_conflicts(constraints, timetable)
+        with cancellation.track(timetable_id, TRANSLATION) as scope:
+            constraints = await constraint_service.translate_pending_constraints(
+                timetable=timetable,
+                llm_config=llm_config,
+                scope=scope,
+            )
 
-        return Template(
-            template_name="pages/timetable_verification.html",
-            context={
-                "timetable": timetable,
-                "constraints": constraints,
-                "translated_count": translated_count,
-                "failed_count": failed_count,
-                "verified_count": verified_count,
-                "conflict_warnings": conflict_warnings,
-                "user": request.user,
-            },
+        return _verification_page(
+            request,
+            timetable,
+            constraints,
+            constraint_service,
+            notice=MESSAGES["translation_cancelled"] if scope.cancelled else None,
         )
 
     @get("/verifica", guards=[requires_responsible_professor])
@@ -143,6 +172,7 @@ async def show_verification(
         timetable_id: uuid.UUID,
         timetable_repo: TimetableRepository,
         constraint_service: ConstraintService,
+        message: str | None = None,
     ) -> Template:
         """Show already-translated constraints without re-translating."""
         timetable = await timetable_repo.get(timetable_id)
@@ -150,22 +180,12 @@ async def show_verification(
             raise NotAuthorizedException(detail="Insufficient permissions")
 
         constraints = await constraint_service.list_constraints(timetable_id=timetable_id)
-        translated_count = sum(1 for c in constraints if c.status == "translated")
-        failed_count = sum(1 for c in constraints if c.status == "translation_failed")
-        verified_count = sum(1 for c in constraints if c.status == "verified")
-        conflict_warnings = constraint_service.detect_conflicts(constraints, timetable)
-
-        return Template(
-            template_name="pages/timetable_verification.html",
-            context={
-                "timetable": timetable,
-                "constraints": constraints,
-                "translated_count": translated_count,
-                "failed_count": failed_count,
-                "verified_count": verified_count,
-                "conflict_warnings": conflict_warnings,
-                "user": request.user,
-            },
+        return _verification_page(
+            request,
+            timetable,
+            constraints,
+            constraint_service,
+            notice=MESSAGES.get(message) if message else None,
         )
 
     @post("/{constraint_id:uuid}/approva", guards=[requires_responsible_professor])
@@ -176,11 +196,27 @@ async def approve_constraint(
         constraint_id: uuid.UUID,
         timetable_repo: TimetableRepository,
         constraint_service: ConstraintService,
-    ) -> Redirect:
-        """Approve a translated constraint (set status to verified)."""
+        solver_service: SolverService,
+        conferma: bool = False,
+    ) -> Template | Redirect:
+        """Approve a translated constraint (set status to verified).
+
+        A quick satisfiability check runs first: a constraint that would make the timetable
+        impossible is flagged instead of approved, and the page shows which verified constraints
+        it clashes with. The coordinator can still approve it with ``conferma``, skipping the check.
+        """
         timetable = await timetable_repo.get(timetable_id)
         if timetable.owner_id != request.user.id:
             raise NotAuthorizedException(detail="Insufficient permissions")
+        warning = None if conferma else await solver_service.check_approval(timetable, constraint_id)
+        if warning is not None:
+            await _log.ainfo("approve_infeasible", constraint_id=str(constraint_id), timetable_id=str(timetable_id))
+            constraints = await constraint_service.list_constraints(timetable_id=timetable_id)
+            return _verification_page(
+                request, timetable, constraints, constraint_service, warnings=[warning], flagged_id=constraint_id
+            )
+        if conferma:
+            await _log.ainfo("approve_confirmed", constraint_id=str(constraint_id), timetable_id=str(timetable_id))
         try:
             await constraint_service.verify_constraint(
                 constraint_id=constraint_id,
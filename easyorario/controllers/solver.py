@@ -0,0 +1,160 @@
+"""Solver controller — start timetable generation and stream its progress."""
+
+import json
+import uuid
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import Annotated
+
+import structlog
+from litestar import Controller, Request, get, post
+from litestar.enums import RequestEncodingType
+from litestar.exceptions import NotAuthorizedException, NotFoundException
+from litestar.params import Body
+from litestar.response import Redirect, ServerSentEvent, ServerSentEventMessage, Template
+
+from easyorario.guards.auth import requires_responsible_professor
+from easyorario.i18n.errors import MESSAGES
+from easyorario.repositories.revision import RevisionRepository
+from easyorario.repositories.timetable import TimetableRepository
+from easyorario.services.generation import ALTERNATIVES, SCHOOL, GenerationRunner
+from easyorario.services.grid import DAYS, CompactGrid, slots_per_day
+from easyorario.services.solver import SolverService
+
+_log = structlog.get_logger()
+
+
+@dataclass
+class ChooseFormData:
+    index: str = ""  # position of the chosen grid among the job's alternatives
+
+
+class SolverController(Controller):
+    """Timetable generation page, job start, Server-Sent Events progress stream, and choice among alternatives."""
+
+    path = "/orario/{timetable_id:uuid}/genera"
+
+    @get("/", guards=[requires_responsible_professor])
+    async def show_generation(
+        self,
+        request: Request,
+        timetable_id: uuid.UUID,
+        timetable_repo: TimetableRepository,
+        revision_repo: RevisionRepository,
+        job: str | None = None,
+        message: str | None = None,
+    ) -> Template:
+        """Render the generation page with the latest revision; with ``job`` it follows that job's progress."""
+        timetable = await timetable_repo.get(timetable_id)
+        if timetable.owner_id != request.user.id:
+            raise NotAuthorizedException(detail="Insufficient permissions")
+        latest = await revision_repo.get_latest(timetable_id) if job is None else None
+        return Template(
+            template_name="pages/timetable_generation.html",
+            context={
+                "timetable": timetable,
+                "job_id": job,
+                "revision": latest,
+                "days": DAYS,
+                "rows": (
+                    CompactGrid.from_grid(latest.grid_data, slots=slots_per_day(timetable.weekly_hours)).rows()
+                    if latest
+                    else []
+                ),
+                "notice": MESSAGES.get(message) if message else None,
+                "user": request.user,
+            },
+        )
+
+    @post("/", guards=[requires_responsible_professor])
+    async def start_generation(
+        self,
+        request: Request,
+        timetable_id: uuid.UUID,
+        timetable_repo: TimetableRepository,
+        generation_runner: GenerationRunner,
+    ) -> Redirect:
+        """Queue a generation job and redirect to its progress page."""
+        timetable = await timetable_repo.get(timetable_id)
+        if timetable.owner_id != request.user.id:
+            raise NotAuthorizedException(detail="Insufficient permissions")
+        job_id = await generation_runner.start(timetable_id)
+        return Redirect(path=f"/orario/{timetable_id}/genera?job={job_id}")
+
+    @post("/alternative", guards=[requires_responsible_professor])
+    async def start_alternatives(
+        self,
+        request: Request,
+        timetable_id: uuid.UUID,
+        timetable_repo: TimetableRepository,
+        generation_runner: GenerationRunner,
+    ) -> Redirect:
+        """Queue a search for several distinct timetables and redirect to its progress page."""
+        timetable = await timetable_repo.get(timetable_id)
+        if timetable.owner_id != request.user.id:
+            raise NotAuthorizedException(detail="Insufficient permissions")
+        job_id = await generation_runner.start(timetable_id, kind=ALTERNATIVES)
+        return Redirect(path=f"/orario/{timetable_id}/genera?job={job_id}")
+
+    @post("/scuola", guards=[requires_responsible_professor])
+    async def start_school_generation(
+        self,
+        request: Request,
+        timetable_id: uuid.UUID,
+        timetable_repo: TimetableRepository,
+        generation_runner: GenerationRunner,
+    ) -> Redirect:
+        """Queue a generation of all the coordinator's timetables together and redirect to its progress page."""
+        timetable = await timetable_repo.get(timetable_id)
+        if timetable.owner_id != request.user.id:
+            raise NotAuthorizedException(detail="Insufficient permissions")
+        job_id = await generation_runner.start(timetable_id, kind=SCHOOL)
+        return Redirect(path=f"/orario/{timetable_id}/genera?job={job_id}")
+
+    @post("/{job_id:str}/scegli", guards=[requires_responsible_professor])
+    async def choose_alternative(
+        self,
+        request: Request,
+        timetable_id: uuid.UUID,
+        job_id: str,
+        data: Annotated[ChooseFormData, Body(media_type=RequestEncodingType.URL_ENCODED)],
+        timetable_repo: TimetableRepository,
+        generation_runner: GenerationRunner,
+        solver_service: SolverService,
+    ) -> Redirect:
+        """Save the chosen alternative as the timetable's next revision."""
+        timetable = await timetable_repo.get(timetable_id)
+        if timetable.owner_id != request.user.id:
+            raise NotAuthorizedException(detail="Insufficient permissions")
+        if await generation_runner.timetable_of(job_id) != timetable_id:
+            raise NotFoundException(detail="Unknown generation job")
+        grid = await generation_runner.alternative(job_id, int(data.index)) if data.index.isdigit() else None
+        if grid is None:
+            return Redirect(path=f"/orario/{timetable_id}/genera?message=alternative_unavailable")
+        revision = await solver_service.adopt_grid(timetable, grid)
+        await _log.ainfo(
+            "alternative_chosen", timetable_id=str(timetable_id), job_id=job_id, revision=revision.revision_number
+        )
+        return Redirect(path=f"/orario/{timetable_id}/genera")
+
+    @get("/{job_id:str}/eventi", guards=[requires_responsible_professor])
+    async def stream_events(
+        self,
+        request: Request,
+        timetable_id: uuid.UUID,
+        job_id: str,
+        timetable_repo: TimetableRepository,
+        generation_runner: GenerationRunner,
+    ) -> ServerSentEvent:
+        """Stream a job's progress until it is done."""
+        timetable = await timetable_repo.get(timetable_id)
+        if timetable.owner_id != request.user.id:
+            raise NotAuthorizedException(detail="Insufficient permissions")
+        if await generation_runner.timetable_of(job_id) != timetable_id:
+            raise NotFoundException(detail="Unknown generation job")
+
+        async def messages() -> AsyncIterator[ServerSentEventMessage]:
+            async for event in generation_runner.events(job_id):
+                yield ServerSentEventMessage(event=event["state"], data=json.dumps(event, ensure_ascii=False))
+
+        return ServerSentEvent(messages())
@@ -1,18 +1,26 @@
 """Timetable controller — create timetable form."""
 
+import uuid
 from dataclasses import dataclass
 from typing import Annotated
 
+import structlog
 from litestar import Controller, Request, get, post
 from litestar.enums import RequestEncodingType
+from litestar.exceptions import NotAuthorizedException
 from litestar.params import Body
 from litestar.response import Redirect, Template
 
 from easyorario.exceptions import InvalidTimetableDataError
 from easyorario.guards.auth import requires_responsible_professor
 from easyorario.i18n.errors import MESSAGES
+from easyorario.repositories.timetable import TimetableRepository
+from easyorario.services.cancellation import TRANSLATION, CancellationRegistry
+from easyorario.services.generation import GenerationRunner
 from easyorario.services.timetable import TimetableService
 
+_log = structlog.get_logger()
+
 
 @dataclass
 class TimetableFormData:
@@ -23,6 +31,11 @@ class TimetableFormData:
     teachers: str = ""
 
 
+@dataclass
+class CancelFormData:
+    job: str = ""  # generation job whose page to return to, if any
+
+
 class TimetableController(Controller):
     """Timetable creation and constraints management."""
 
@@ -63,3 +76,37 @@ async def create_timetable(
                     "form": data,
                 },
             )
+
+    @post("/{timetable_id:uuid}/annulla", guards=[requires_responsible_professor])
+    async def cancel_jobs(
+        self,
+        request: Request,
+        timetable_id: uuid.UUID,
+        data: Annotated[CancelFormData, Body(media_type=RequestEncodingType.URL_ENCODED)],
+        timetable_repo: TimetableRepository,
+        cancellation: CancellationRegistry,
+        generation_runner: GenerationRunner,
+    ) -> Redirect:
+        """Cancel the timetable's running generation and translation jobs, freeing their solver slots."""
+        timetable = await timetable_repo.get(timetable_id)
+        if timetable.owner_id != request.user.id:
+            raise NotAuthorizedException(detail="Insufficient permissions")
+        translations = cancellation.cancel(timetable_id, TRANSLATION)
+        # Stops the generations this process runs now rather than at their next heartbeat.
+        cancellation.cancel(timetable_id)
+        generations = await generation_runner.cancel(timetable_id)
+        await _log.ainfo(
+            "timetable_jobs_cancelled",
+            timetable_id=str(timetable_id),
+            translations=translations,
+            generations=generations,
+        )
+        if data.job:
+            return Redirect(path=f"/orario/{timetable_id}/genera?job={data.job}")
+        if translations:
+            message = "translation_cancelled"
+        elif generations:
+            message = "job_cancelled"
+        else:
+            message = "nothing_to_cancel"
+        return Redirect(path=f"/orario/{timetable_id}/vincoli/verifica?message={message}")
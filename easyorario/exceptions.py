@@ -61,3 +61,19 @@ class LLMTranslationError(EasyorarioError):
     def __init__(self, error_key: str) -> None:
         self.error_key = error_key
         super().__init__(error_key)
+
+
+class SolverJobError(EasyorarioError):
+    """Raised when a solver job does not produce an answer (timeout, crash)."""
+
+    def __init__(self, error_key: str) -> None:
+        self.error_key = error_key
+        super().__init__(error_key)
+
+
+class JobCancelledError(EasyorarioError):
+    """Raised when a solve or translation job is cancelled by the user."""
+
+    def __init__(self, error_key: str) -> None:
+        self.error_key = error_key
+        super().__init__(error_key)
@@ -38,4 +38,41 @@
     "conflict_hour_total_mismatch": (
         "Le ore totali assegnate ({total}) superano le ore settimanali dell'orario ({weekly_hours})"
     ),
+    "solver_timeout": "Tempo massimo di generazione superato. Prova a semplificare i vincoli",
+    "solver_crashed": "Errore interno durante la generazione dell'orario",
+    "solver_queue_full": "Troppe generazioni in attesa. Riprova tra qualche minuto",
+    "solver_resource_limit": (
+        "La generazione ha superato i limiti di memoria o di tempo di calcolo. Prova a semplificare i vincoli"
+    ),
+    "solver_unsat": "Impossibile generare un orario che rispetti tutti i vincoli",
+    "conflict_unsat_core": (
+        "Impossibile generare l'orario: questi {count} vincoli non possono essere rispettati insieme"
+    ),
+    "constraint_infeasible": (
+        "Vincolo non approvato: da solo rende impossibile generare l'orario. Rifiutalo o approvalo comunque"
+    ),
+    "constraint_conflicting": (
+        "Vincolo non approvato: renderebbe impossibile generare l'orario insieme a questi vincoli già verificati."
+        " Rifiutalo o approvalo comunque"
+    ),
+    "generation_completed": "Orario generato: revisione {revision_number}",
+    "school_generation_completed": (
+        "Orari della scuola generati: {count} classi, revisione {revision_number} per questa classe"
+    ),
+    "alternatives_found": "Trovate {count} alternative: scegli quella da salvare come nuova revisione",
+    "alternative_unavailable": "Alternativa non disponibile: genera di nuovo le alternative",
+    "job_cancelled": "Generazione annullata",
+    "translation_cancelled": "Traduzione interrotta: i vincoli non ancora tradotti restano in attesa",
+    "nothing_to_cancel": "Nessuna operazione in corso da annullare",
+    "conflict_unsat_no_core": (
+        "Impossibile generare l'orario, ma non è stato possibile individuare i vincoli in conflitto in tempo."
+        " Riprova o rivedi i vincoli di disponibilità"
+    ),
+    "conflict_unsat_base": (
+        "Impossibile generare l'orario: le {weekly_hours} ore settimanali non entrano nelle {cells} fasce disponibili"
+    ),
+    "conflict_school_unsat_base": (
+        "Impossibile generare gli orari della scuola: le ore settimanali di una classe non entrano nelle fasce"
+        " disponibili, o un docente condiviso ha più lezioni di quante ne entrino nella settimana"
+    ),
 }
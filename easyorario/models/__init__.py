@@ -1,7 +1,10 @@
 """ORM models."""
 
 from easyorario.models.constraint import Constraint
+from easyorario.models.job import Job
+from easyorario.models.revision import Revision
+from easyorario.models.solver_cache import SolverCacheEntry
 from easyorario.models.timetable import Timetable
 from easyorario.models.user import User
 
-__all__ = ["Constraint", "Timetable", "User"]
+__all__ = ["Constraint", "Job", "Revision", "SolverCacheEntry", "Timetable", "User"]
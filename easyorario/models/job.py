@@ -0,0 +1,46 @@
+"""Background job ORM model."""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import JSON, Boolean, DateTime, ForeignKey, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from easyorario.models.base import Base
+
+
+class Job(Base):
+    """A durable unit of background work, claimed and run by a worker process.
+
+    ``status`` moves from ``queued`` to ``running`` when a worker claims the job, then to
+    ``done``, ``failed`` or ``cancelled``. A running job whose ``heartbeat_at`` goes stale is
+    requeued (or failed after too many attempts), so work survives a worker restart.
+    """
+
+    __tablename__ = "jobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)
+    timetable_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("timetables.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="queued", index=True)
+    # Fingerprint of the solver input, so a repeated request joins the identical active job.
+    payload_hash: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    worker_id: Mapped[str | None] = mapped_column(String(64), nullable=True, default=None)
+    cancel_requested: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    # Latest progress event while running; the final ``done`` event once finished.
+    progress: Mapped[dict | None] = mapped_column(JSON, nullable=True, default=None)
+    result: Mapped[dict | None] = mapped_column(JSON, nullable=True, default=None)
+    revision_id: Mapped[uuid.UUID | None] = mapped_column(
+        ForeignKey("revisions.id", ondelete="SET NULL"),
+        nullable=True,
+        default=None,
+    )
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    started_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, default=None)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, default=None)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, default=None)
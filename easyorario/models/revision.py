@@ -0,0 +1,33 @@
+"""Revision ORM model."""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import JSON, DateTime, ForeignKey, Integer, UniqueConstraint, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from easyorario.models.base import Base
+
+
+class Revision(Base):
+    """A generated timetable grid together with the constraints it was solved against.
+
+    No relationship to Timetable: grids are large, so revisions are only loaded through
+    RevisionRepository where a page or job needs them.
+    """
+
+    __tablename__ = "revisions"
+    __table_args__ = (
+        UniqueConstraint("timetable_id", "revision_number", name="uq_revisions_timetable_id_revision_number"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    timetable_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("timetables.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    revision_number: Mapped[int] = mapped_column(Integer, nullable=False)
+    grid_data: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    constraints_snapshot: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
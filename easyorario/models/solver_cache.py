@@ -0,0 +1,27 @@
+"""Solver cache ORM model."""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import JSON, Boolean, DateTime, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from easyorario.models.base import Base
+
+
+class SolverCacheEntry(Base):
+    """A sat/unsat answer stored under the fingerprint of the solver input that produced it."""
+
+    __tablename__ = "solver_cache"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    fingerprint: Mapped[str] = mapped_column(String(64), unique=True, nullable=False, index=True)
+    status: Mapped[str] = mapped_column(String(20), nullable=False)
+    grid_data: Mapped[dict | None] = mapped_column(JSON, nullable=True, default=None)
+    # Unsat core as positions in the fingerprint's canonical constraint order, not constraint ids,
+    # so the entry stays valid when identical constraints are re-created with new ids.
+    core_positions: Mapped[list] = mapped_column(JSON, nullable=False, default=list)
+    cost: Mapped[int | None] = mapped_column(Integer, nullable=True, default=None)
+    optimal: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    last_used_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
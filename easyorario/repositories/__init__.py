@@ -1,7 +1,15 @@
 """Data access repositories."""
 
 from easyorario.repositories.constraint import ConstraintRepository
+from easyorario.repositories.revision import RevisionRepository
+from easyorario.repositories.solver_cache import SolverCacheRepository
 from easyorario.repositories.timetable import TimetableRepository
 from easyorario.repositories.user import UserRepository
 
-__all__ = ["ConstraintRepository", "TimetableRepository", "UserRepository"]
+__all__ = [
+    "ConstraintRepository",
+    "RevisionRepository",
+    "SolverCacheRepository",
+    "TimetableRepository",
+    "UserRepository",
+]
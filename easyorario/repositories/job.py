@@ -0,0 +1,152 @@
+"""Job repository for data access."""
+
+import uuid
+from datetime import UTC, datetime, timedelta
+from typing import cast
+
+from advanced_alchemy.repository import SQLAlchemyAsyncRepository
+from sqlalchemy import CursorResult, Update, case, select, update
+
+from easyorario.models.job import Job
+
+# Statuses of jobs that still have work ahead of them.
+ACTIVE_STATUSES = ("queued", "running")
+
+
+def _now() -> datetime:
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+# Back to the queue, unless the job was cancelled meanwhile.
+_REQUEUED = case((Job.cancel_requested.is_(True), "cancelled"), else_="queued")
+
+
+class JobRepository(SQLAlchemyAsyncRepository[Job]):
+    """Repository for Job persistence operations.
+
+    State changes are single conditional UPDATEs, so concurrent workers (and web processes)
+    never both win the same transition.
+    """
+
+    model_type = Job
+
+    async def _update(self, stmt: Update) -> int:
+        """Run a bulk UPDATE and return how many rows it changed."""
+        outcome = cast(CursorResult, await self.session.execute(stmt.execution_options(synchronize_session=False)))
+        return outcome.rowcount
+
+    async def get_active(self, timetable_id: uuid.UUID, payload_hash: str, kind: str) -> Job | None:
+        """Return the timetable's queued or running job of ``kind`` with this payload, if any."""
+        stmt = (
+            select(Job)
+            .where(
+                Job.timetable_id == timetable_id,
+                Job.kind == kind,
+                Job.payload_hash == payload_hash,
+                Job.status.in_(ACTIVE_STATUSES),
+                Job.cancel_requested.is_(False),
+            )
+            .order_by(Job.created_at)
+            .limit(1)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalars().first()
+
+    async def claim(self, worker_id: str, limit: int = 1) -> list[Job]:
+        """Atomically take up to ``limit`` of the oldest queued jobs for ``worker_id``."""
+        candidates = select(Job.id).where(Job.status == "queued").order_by(Job.created_at, Job.id).limit(limit * 4)
+        claimed: list[Job] = []
+        for job_id in (await self.session.execute(candidates)).scalars().all():
+            now = _now()
+            changed = await self._update(
+                update(Job)
+                .where(Job.id == job_id, Job.status == "queued")
+                .values(
+                    status="running",
+                    worker_id=worker_id,
+                    attempts=Job.attempts + 1,
+                    started_at=now,
+                    heartbeat_at=now,
+                )
+            )
+            if changed == 1:
+                claimed.append(await self.session.get_one(Job, job_id, populate_existing=True))
+                if len(claimed) == limit:
+                    break
+        return claimed
+
+    async def heartbeat(self, job_id: uuid.UUID, worker_id: str, progress: dict | None = None) -> bool:
+        """Record that ``worker_id`` is still running the job.
+
+        Returns False when the worker should stop: the job was cancelled, or was recovered and
+        handed to another worker after this one went silent.
+        """
+        values: dict = {"heartbeat_at": _now()}
+        if progress is not None:
+            values["progress"] = progress
+        changed = await self._update(
+            update(Job)
+            .where(
+                Job.id == job_id,
+                Job.worker_id == worker_id,
+                Job.status == "running",
+                Job.cancel_requested.is_(False),
+            )
+            .values(**values)
+        )
+        return changed == 1
+
+    async def finish(
+        self,
+        job_id: uuid.UUID,
+        worker_id: str,
+        status: str,
+        result: dict,
+        revision_id: uuid.UUID | None = None,
+    ) -> bool:
+        """Store the outcome of a job this worker still owns; False if it was taken away."""
+        changed = await self._update(
+            update(Job)
+            .where(Job.id == job_id, Job.worker_id == worker_id, Job.status == "running")
+            .values(status=status, result=result, progress=result, revision_id=revision_id, finished_at=_now())
+        )
+        return changed == 1
+
+    async def recover_orphans(self, stale_after: timedelta, max_attempts: int) -> int:
+        """Requeue running jobs whose worker stopped heartbeating; fail those out of attempts.
+
+        Returns how many jobs were recovered either way.
+        """
+        cutoff = _now() - stale_after
+        stale = (Job.status == "running", Job.heartbeat_at < cutoff)
+        failed = await self._update(
+            update(Job).where(*stale, Job.attempts >= max_attempts).values(status="failed", finished_at=_now())
+        )
+        requeued = await self._update(
+            update(Job)
+            .where(*stale, Job.attempts < max_attempts)
+            .values(status=_REQUEUED, worker_id=None, heartbeat_at=None)
+        )
+        return failed + requeued
+
+    async def release(self, worker_id: str) -> int:
+        """Put the jobs ``worker_id`` is running back in the queue, e.g. when it shuts down."""
+        return await self._update(
+            update(Job)
+            .where(Job.worker_id == worker_id, Job.status == "running")
+            .values(status=_REQUEUED, worker_id=None, heartbeat_at=None)
+        )
+
+    async def request_cancel(self, timetable_id: uuid.UUID) -> int:
+        """Cancel the timetable's queued jobs and flag its running ones; return how many."""
+        queued = await self._update(
+            update(Job)
+            .where(Job.timetable_id == timetable_id, Job.status == "queued")
+            .values(status="cancelled", cancel_requested=True, finished_at=_now())
+        )
+        running = await self._update(
+            update(Job)
+            .where(Job.timetable_id == timetable_id, Job.status == "running", Job.cancel_requested.is_(False))
+            .values(cancel_requested=True)
+        )
+        return queued + running
@@ -0,0 +1,56 @@
+"""Revision repository for data access."""
+
+import uuid
+
+from advanced_alchemy.repository import SQLAlchemyAsyncRepository
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from easyorario.models.revision import Revision
+
+# Inserts of a next revision tried before a numbering conflict is raised.
+ADD_NEXT_ATTEMPTS = 3
+
+
+class RevisionRepository(SQLAlchemyAsyncRepository[Revision]):
+    """Repository for Revision persistence operations."""
+
+    model_type = Revision
+
+    async def get_by_timetable(self, timetable_id: uuid.UUID) -> list[Revision]:
+        """Return all revisions of a timetable, oldest first."""
+        stmt = select(Revision).where(Revision.timetable_id == timetable_id).order_by(Revision.revision_number)
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def get_latest(self, timetable_id: uuid.UUID) -> Revision | None:
+        """Return the highest-numbered revision of a timetable, if any."""
+        stmt = (
+            select(Revision)
+            .where(Revision.timetable_id == timetable_id)
+            .order_by(Revision.revision_number.desc())
+            .limit(1)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalars().first()
+
+    async def add_next(self, revision: Revision) -> Revision:
+        """Insert ``revision`` numbered after the timetable's latest one.
+
+        Numbers are unique per timetable; when a concurrent job takes the number first, the
+        insert is retried with the following one and the IntegrityError raised after
+        ``ADD_NEXT_ATTEMPTS`` conflicts.
+        """
+        for _ in range(ADD_NEXT_ATTEMPTS - 1):
+            try:
+                return await self._insert_next(revision)
+            except IntegrityError:
+                continue
+        return await self._insert_next(revision)
+
+    async def _insert_next(self, revision: Revision) -> Revision:
+        latest = await self.get_latest(revision.timetable_id)
+        revision.revision_number = latest.revision_number + 1 if latest else 1
+        async with self.session.begin_nested():
+            self.session.add(revision)
+        return revision
@@ -0,0 +1,45 @@
+"""Solver cache repository for data access."""
+
+from datetime import UTC, datetime
+
+from advanced_alchemy.repository import SQLAlchemyAsyncRepository
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+
+from easyorario.models.solver_cache import SolverCacheEntry
+
+
+class SolverCacheRepository(SQLAlchemyAsyncRepository[SolverCacheEntry]):
+    """Repository for SolverCacheEntry persistence operations."""
+
+    model_type = SolverCacheEntry
+
+    async def get_by_fingerprint(self, fingerprint: str) -> SolverCacheEntry | None:
+        """Return the entry for a fingerprint and mark it as recently used."""
+        stmt = select(SolverCacheEntry).where(SolverCacheEntry.fingerprint == fingerprint)
+        result = await self.session.execute(stmt)
+        entry = result.scalars().first()
+        if entry is not None:
+            entry.last_used_at = datetime.now(UTC).replace(tzinfo=None)
+            await self.session.flush()
+        return entry
+
+    async def put(self, entry: SolverCacheEntry) -> None:
+        """Insert an entry, unless a concurrent solve already stored the same fingerprint."""
+        try:
+            async with self.session.begin_nested():
+                self.session.add(entry)
+        except IntegrityError:
+            pass
+
+    async def evict(self, max_entries: int) -> int:
+        """Delete the least recently used entries beyond ``max_entries``; return how many went."""
+        stale = (
+            select(SolverCacheEntry.id)
+            .order_by(SolverCacheEntry.last_used_at.desc(), SolverCacheEntry.created_at.desc())
+            .offset(max_entries)
+        )
+        ids = list((await self.session.execute(stale)).scalars().all())
+        if ids:
+            await self.session.execute(delete(SolverCacheEntry).where(SolverCacheEntry.id.in_(ids)))
+        return len(ids)
@@ -0,0 +1,79 @@
+"""Cooperative cancellation of long-running work (solves, LLM batches) started for a timetable."""
+
+import asyncio
+import contextlib
+import uuid
+from collections.abc import Awaitable, Iterator
+
+from easyorario.exceptions import JobCancelledError
+
+# Kind of the scopes opened for LLM translation batches; generation scopes use their job's kind.
+TRANSLATION = "translation"
+
+
+class CancelScope:
+    """One cancellable unit of work; its awaitables are abandoned as soon as it is cancelled."""
+
+    def __init__(self, kind: str = "") -> None:
+        self.kind = kind
+        self._event = asyncio.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    async def run[T](self, awaitable: Awaitable[T]) -> T:
+        """Await ``awaitable`` unless the scope is cancelled first.
+
+        On cancellation the awaitable's task is cancelled and awaited — so a solver worker is
+        killed and its pool slot freed, or an HTTP request closed — then JobCancelledError is raised.
+        """
+        if self.cancelled:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise JobCancelledError("job_cancelled")
+        task = asyncio.ensure_future(awaitable)
+        waiter = asyncio.ensure_future(self._event.wait())
+        try:
+            await asyncio.wait({task, waiter}, return_when=asyncio.FIRST_COMPLETED)
+        except BaseException:
+            task.cancel()
+            raise
+        finally:
+            waiter.cancel()
+        if not task.done():
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+            raise JobCancelledError("job_cancelled")
+        return task.result()
+
+
+class CancellationRegistry:
+    """The cancel scopes currently open for each timetable, shared application-wide."""
+
+    def __init__(self) -> None:
+        self._scopes: dict[uuid.UUID, set[CancelScope]] = {}
+
+    @contextlib.contextmanager
+    def track(self, timetable_id: uuid.UUID, kind: str = "") -> Iterator[CancelScope]:
+        """Open a scope of ``kind`` that ``cancel(timetable_id)`` reaches until the block exits."""
+        scope = CancelScope(kind)
+        scopes = self._scopes.setdefault(timetable_id, set())
+        scopes.add(scope)
+        try:
+            yield scope
+        finally:
+            scopes.discard(scope)
+            if not scopes:
+                self._scopes.pop(timetable_id, None)
+
+    def cancel(self, timetable_id: uuid.UUID, kind: str | None = None) -> int:
+        """Cancel the timetable's open scopes, or only those of ``kind``; return how many there were."""
+        scopes = [scope for scope in self._scopes.get(timetable_id, ()) if kind is None or scope.kind == kind]
+        for scope in scopes:
+            scope.cancel()
+        return len(scopes)
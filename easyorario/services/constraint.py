@@ -6,11 +6,17 @@
 import structlog
 from litestar.exceptions import NotAuthorizedException
 
-from easyorario.exceptions import InvalidConstraintDataError, LLMConfigError, LLMTranslationError
+from easyorario.exceptions import (
+    InvalidConstraintDataError,
+    JobCancelledError,
+    LLMConfigError,
+    LLMTranslationError,
+)
 from easyorario.i18n.errors import MESSAGES
 from easyorario.models.constraint import Constraint
 from easyorario.models.timetable import Timetable
 from easyorario.repositories.constraint import ConstraintRepository
+from easyorario.services.cancellation import CancelScope
 from easyorario.services.llm import LLMService
 
 _log = structlog.get_logger()
@@ -20,7 +26,9 @@
 class ConflictWarning:
     """A detected pre-solve conflict between constraints."""
 
-    conflict_type: str  # "teacher_double_booking" or "hour_total_mismatch"
+    # "teacher_double_booking", "hour_total_mismatch", "unsat_core", "unsat_base", "unsat_no_core"
+    # or "unsat_approval"
+    conflict_type: str
     message: str  # Italian human-readable description
     constraint_descriptions: list[str]  # descriptions of the conflicting constraints
 
@@ -214,8 +222,13 @@ async def translate_pending_constraints(
         *,
         timetable: Timetable,
         llm_config: dict[str, str],
+        scope: CancelScope | None = None,
     ) -> list[Constraint]:
-        """Translate all pending constraints for a timetable via LLM."""
+        """Translate all pending constraints for a timetable via LLM.
+
+        When ``scope`` is cancelled the in-flight request is aborted and the batch stops;
+        constraints translated so far are kept and the rest stay in their current state.
+        """
         constraints = await self.constraint_repo.get_by_timetable(timetable.id)
         pending = [c for c in constraints if c.status in ("pending", "translation_failed")]
 
@@ -228,16 +241,24 @@ async def translate_pending_constraints(
         }
 
         for i, constraint in enumerate(pending):
+            translation = self.llm_service.translate_constraint(
+                base_url=llm_config["base_url"],
+                api_key=llm_config["api_key"],
+                model_id=llm_config["model_id"],
+                constraint_text=constraint.natural_language_text,
+                timetable_context=timetable_context,
+            )
             try:
-                result = await self.llm_service.translate_constraint(
-                    base_url=llm_config["base_url"],
-                    api_key=llm_config["api_key"],
-                    model_id=llm_config["model_id"],
-                    constraint_text=constraint.natural_language_text,
-                    timetable_context=timetable_context,
-                )
+                result = await (scope.run(translation) if scope is not None else translation)
                 constraint.formal_representation = result
                 constraint.status = "translated"
+            except JobCancelledError:
+                await _log.ainfo(
+                    "constraint_translation_cancelled",
+                    timetable_id=str(timetable.id),
+                    remaining=len(pending) - i,
+                )
+                break
             except LLMConfigError as exc:
                 # Config error (bad API key, etc.) — fail fast, mark all remaining as failed
                 await _log.awarning(
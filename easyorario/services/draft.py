@@ -0,0 +1,97 @@
+"""Draft timetables by greedy graph coloring, built in milliseconds while Z3 has yet to run."""
+
+from collections import Counter
+
+from easyorario.services.grid import Cell, Grid, SolverInput, TimetableShape
+
+
+class DraftBuilder(TimetableShape):
+    """DSatur-style coloring of a class's lessons with day × slot cells.
+
+    All lessons of a class clash with each other, so the saturation of a subject is how few
+    cells its remaining lessons can still take: cells already used, cells its hard constraints
+    rule out and cells that would break a ``max_consecutive`` run all count against it; ties
+    go to the subject with fewer ``teacher_preferred`` cells left. The least free subject is
+    placed next, in the cell that violates the fewest preferences, keeps the subject spread
+    over the week and is wanted (without penalty) by the fewest other subjects.
+    """
+
+    def __init__(self, solver_input: SolverInput) -> None:
+        super().__init__(solver_input)
+        reduced = self.reduced_domains()
+        self.feasible = reduced is not None
+        self.allowed: dict[str, set[Cell]] = reduced if reduced is not None else self.domains()
+        self.runs: list[tuple[set[str], int]] = []  # (subjects, max consecutive lessons)
+        self.preferred: list[tuple[set[str], set[Cell]]] = []  # (subjects, cells they would rather use)
+        for formal in solver_input.constraints.values():
+            kind = formal.get("constraint_type")
+            if kind == "max_consecutive":
+                limit = formal.get("max_consecutive_hours")
+                subjects = self._constrained_subjects(formal)
+                if isinstance(limit, int) and limit >= 1 and subjects:
+                    self.runs.append((set(subjects), limit))
+            elif kind == "teacher_preferred":
+                self.preferred.append((set(self._constrained_subjects(formal)), self._cells(formal)))
+
+    def build(self) -> Grid | None:
+        """A grid meeting every hard constraint, or None when the greedy pass gets stuck."""
+        if not self.fits or not self.feasible:
+            return None
+        placed: dict[Cell, str] = {}
+        remaining = {subject: hours for subject, hours in self.hours.items() if hours > 0}
+        while remaining:
+            options = {subject: self._options(subject, placed) for subject in remaining}
+            free = {s: sum(1 for cell in options[s] if not self._penalty(s, cell)) for s in remaining}
+            subject = min(
+                remaining,
+                key=lambda s: (len(options[s]) - remaining[s], free[s] - remaining[s], -remaining[s]),
+            )
+            if not options[subject]:
+                return None
+            demand = Counter(
+                cell
+                for other in remaining
+                if other != subject
+                for cell in options[other]
+                if not self._penalty(other, cell)
+            )
+            same_day = Counter(day for (day, _), taught in placed.items() if taught == subject)
+            cell = min(
+                options[subject],
+                key=lambda c: (self._penalty(subject, c), same_day[c[0]], demand[c], c),
+            )
+            placed[cell] = subject
+            remaining[subject] -= 1
+            if not remaining[subject]:
+                del remaining[subject]
+        return self._grid(placed)
+
+    def _grid(self, placed: dict[Cell, str]) -> Grid:
+        return self.compact(placed).to_grid()
+
+    def _options(self, subject: str, placed: dict[Cell, str]) -> list[Cell]:
+        return [
+            cell for cell in self.allowed[subject] if cell not in placed and not self._breaks_run(subject, cell, placed)
+        ]
+
+    def _breaks_run(self, subject: str, cell: Cell, placed: dict[Cell, str]) -> bool:
+        day, slot = cell
+        for subjects, limit in self.runs:
+            if subject not in subjects:
+                continue
+            before = next((n for n in range(slot - 1) if placed.get((day, slot - 1 - n)) not in subjects), slot - 1)
+            after = next(
+                (n for n in range(self.slots - slot) if placed.get((day, slot + 1 + n)) not in subjects),
+                self.slots - slot,
+            )
+            if before + 1 + after > limit:
+                return True
+        return False
+
+    def _penalty(self, subject: str, cell: Cell) -> int:
+        return sum(1 for subjects, cells in self.preferred if subject in subjects and cell not in cells)
+
+
+def draft_grid(solver_input: SolverInput) -> Grid | None:
+    """A quick heuristic timetable for ``solver_input``, or None when the heuristic fails."""
+    return DraftBuilder(solver_input).build()
@@ -0,0 +1,421 @@
+"""Generation service — durable timetable generation jobs, the worker that runs them, and their progress."""
+
+import asyncio
+import contextlib
+import dataclasses
+import hashlib
+import os
+import socket
+import uuid
+from collections.abc import AsyncIterator, Callable
+from datetime import timedelta
+
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from easyorario.exceptions import JobCancelledError, SolverJobError
+from easyorario.i18n.errors import MESSAGES
+from easyorario.models.job import Job
+from easyorario.repositories.job import JobRepository
+from easyorario.repositories.timetable import TimetableRepository
+from easyorario.services.cancellation import CancellationRegistry
+from easyorario.services.progress import FINAL_STATE, ProgressBroker
+from easyorario.services.solver import AlternativesResult, SolveEvent, SolverService, build_solver_input, fingerprint
+
+_log = structlog.get_logger()
+
+# Job kinds: a new revision, several alternative grids for the coordinator to pick from, or a
+# new revision of every timetable of the owner, solved together as one school.
+GENERATION = "generation"
+ALTERNATIVES = "alternatives"
+SCHOOL = "school"
+
+# Grids an alternatives job looks for.
+ALTERNATIVES_COUNT = 3
+
+# A running job's worker refreshes its heartbeat this often, saving a snapshot of its latest progress event.
+HEARTBEAT_SECONDS = 2.0
+
+# A running job whose heartbeat is older than this has lost its worker and is requeued.
+STALE_AFTER = timedelta(seconds=30)
+
+# Claims of one job before a worker crash on it counts as the job's own fault.
+MAX_ATTEMPTS = 3
+
+# How often idle workers look for queued jobs, and a web process re-reads the jobs run by other workers.
+POLL_SECONDS = 1.0
+
+FINISHED_STATUSES = ("done", "failed", "cancelled")
+
+
+def _final_event(status: str) -> dict:
+    """The ``done`` event of a job that finished without storing one (cancelled while queued, orphaned)."""
+    key = "job_cancelled" if status == "cancelled" else "solver_crashed"
+    return {"state": FINAL_STATE, "status": status, "revision_number": None, "conflicts": [], "message": MESSAGES[key]}
+
+
+def _snapshot(event: SolveEvent) -> dict:
+    """A progress event as saved with a heartbeat: no grid, and of Z3's counters only the conflicts shown."""
+    snapshot = dataclasses.asdict(event)
+    snapshot["grid"] = None
+    snapshot["statistics"] = {key: value for key, value in event.statistics.items() if key == "conflicts"}
+    return snapshot
+
+
+def _alternatives_event(result: AlternativesResult) -> dict:
+    """The ``done`` event of an alternatives job; its grids stay on the job row for ``GenerationRunner.alternative``."""
+    if result.grids:
+        message = MESSAGES["alternatives_found"].format(count=len(result.grids))
+    else:
+        message = MESSAGES["solver_unsat" if result.status == "unsat" else "solver_timeout"]
+    return {
+        "status": result.status,
+        "elapsed_seconds": result.elapsed_seconds,
+        "alternatives": result.grids,
+        "message": message,
+    }
+
+
+class GenerationWorker:
+    """Claims queued generation jobs from the jobs table and runs up to ``concurrency`` at once.
+
+    It runs inside the web process or on its own (``python -m easyorario.worker``); either
+    way a restart loses nothing: jobs stay queued in the database, and running jobs whose
+    worker died are requeued once their heartbeat goes stale. Progress is published to
+    ``broker`` for streams served by this process; for the rest, a snapshot without grids is
+    saved with the heartbeat whenever it changed.
+    """
+
+    def __init__(
+        self,
+        session_maker: Callable[[], AsyncSession],
+        service_factory: Callable[[AsyncSession], SolverService],
+        broker: ProgressBroker,
+        cancellation: CancellationRegistry,
+        concurrency: int = 1,
+        worker_id: str | None = None,
+    ) -> None:
+        self.session_maker = session_maker
+        self.service_factory = service_factory
+        self.broker = broker
+        self.cancellation = cancellation
+        self.concurrency = max(1, concurrency)
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._tasks: dict[uuid.UUID, asyncio.Task] = {}
+        self._wake: asyncio.Event | None = None
+        self._loop: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Run the claim loop as a background task of the current event loop."""
+        self._loop = asyncio.create_task(self.run_forever())
+
+    def wake(self) -> None:
+        """Look for queued jobs now rather than at the next poll."""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def run_forever(self) -> None:
+        self._wake = asyncio.Event()
+        await _log.ainfo("generation_worker_started", worker_id=self.worker_id, concurrency=self.concurrency)
+        while True:
+            try:
+                await self.poll()
+            except Exception:
+                await _log.aexception("generation_worker_poll_failed", worker_id=self.worker_id)
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), POLL_SECONDS)
+            self._wake.clear()
+
+    async def poll(self) -> int:
+        """Recover orphaned jobs, then claim as many queued jobs as there are free slots."""
+        async with self.session_maker() as session:
+            repo = JobRepository(session=session)
+            recovered = await repo.recover_orphans(STALE_AFTER, MAX_ATTEMPTS)
+            free = self.concurrency - len(self._tasks)
+            jobs = await repo.claim(self.worker_id, free) if free > 0 else []
+            await session.commit()
+        if recovered:
+            await _log.awarning("generation_jobs_recovered", worker_id=self.worker_id, count=recovered)
+        for job in jobs:
+            task = asyncio.create_task(self.run_job(job.id, job.timetable_id, job.kind))
+            self._tasks[job.id] = task
+            task.add_done_callback(lambda _, job_id=job.id: self._finished(job_id))
+        return len(jobs)
+
+    async def shutdown(self) -> None:
+        """Stop claiming, cancel running jobs and put them back in the queue for another worker."""
+        if self._loop is not None:
+            self._loop.cancel()
+            await asyncio.gather(self._loop, return_exceptions=True)
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        async with self.session_maker() as session:
+            released = await JobRepository(session=session).release(self.worker_id)
+            await session.commit()
+        if released:
+            await _log.ainfo("generation_jobs_released", worker_id=self.worker_id, count=released)
+
+    def _finished(self, job_id: uuid.UUID) -> None:
+        self._tasks.pop(job_id, None)
+        self.wake()
+
+    async def run_job(self, job_id: uuid.UUID, timetable_id: uuid.UUID, kind: str = GENERATION) -> None:
+        """Run a claimed job — a new revision, alternatives, or the school's revisions — and store its outcome.
+
+        A school job is queued from one of the owner's timetables; its outcome, and the revision
+        linked to the job, are that timetable's.
+        """
+        channel = job_id.hex
+        if not self.broker.has(channel):
+            self.broker.open(channel)
+        latest: SolveEvent | None = None
+
+        def publish(event: SolveEvent) -> None:
+            nonlocal latest
+            latest = event
+            self.broker.publish(channel, dataclasses.asdict(event))
+
+        done: dict = {"state": FINAL_STATE, "status": "failed", "revision_number": None, "conflicts": []}
+        status, revision_id = "failed", None
+        with self.cancellation.track(timetable_id, kind) as scope:
+
+            async def heartbeat() -> None:
+                saved: dict | None = None
+                while True:
+                    await asyncio.sleep(HEARTBEAT_SECONDS)
+                    snapshot = _snapshot(latest) if latest is not None else None
+                    progress = snapshot if snapshot != saved else None
+                    async with self.session_maker() as session:
+                        alive = await JobRepository(session=session).heartbeat(job_id, self.worker_id, progress)
+                        await session.commit()
+                    saved = snapshot
+                    if not alive:
+                        scope.cancel()
+                        return
+
+            beating = asyncio.create_task(heartbeat())
+            try:
+                async with self.session_maker() as session:
+                    service = self.service_factory(session)
+                    timetable = await TimetableRepository(session=session).get(timetable_id)
+                    if kind == ALTERNATIVES:
+                        alternatives = await scope.run(
+                            service.generate_alternatives(timetable, ALTERNATIVES_COUNT, on_event=publish)
+                        )
+                        done.update(_alternatives_event(alternatives))
+                    elif kind == SCHOOL:
+                        publish(SolveEvent("solving"))
+                        school, revisions = await scope.run(service.generate_school_revisions(timetable.owner_id))
+                        await session.commit()
+                        done.update(status=school.status, elapsed_seconds=school.elapsed_seconds)
+                        revision = revisions.get(str(timetable_id))
+                        if revision is not None:
+                            revision_id = revision.id
+                            done.update(
+                                revision_number=revision.revision_number,
+                                message=MESSAGES["school_generation_completed"].format(
+                                    count=len(revisions), revision_number=revision.revision_number
+                                ),
+                            )
+                        elif school.status == "unsat":
+                            constraints = [
+                                constraint
+                                for other in await TimetableRepository(session=session).get_by_owner(timetable.owner_id)
+                                for constraint in await service.constraint_repo.get_by_timetable(other.id)
+                            ]
+                            warning = service.explain_school_unsat(school, constraints)
+                            done.update(
+                                message=warning.message if warning else MESSAGES["solver_unsat"],
+                                conflicts=warning.constraint_descriptions if warning else [],
+                            )
+                        else:
+                            done.update(message=MESSAGES["solver_timeout"])
+                    else:
+                        result, revision = await scope.run(service.generate_revision(timetable, on_event=publish))
+                        await session.commit()
+                        done.update(status=result.status, elapsed_seconds=result.elapsed_seconds, cost=result.cost)
+                        if revision is not None:
+                            revision_id = revision.id
+                            done.update(
+                                revision_number=revision.revision_number,
+                                message=MESSAGES["generation_completed"].format(
+                                    revision_number=revision.revision_number
+                                ),
+                            )
+                        elif result.status == "unsat":
+                            constraints = await service.constraint_repo.get_by_timetable(timetable_id)
+                            warning = service.explain_unsat(result, timetable, constraints)
+                            done.update(
+                                message=warning.message if warning else MESSAGES["solver_unsat"],
+                                conflicts=warning.constraint_descriptions if warning else [],
+                            )
+                        else:
+                            done.update(message=MESSAGES["solver_timeout"])
+                    status = "done"
+            except JobCancelledError as exc:
+                await _log.ainfo("generation_cancelled", job_id=channel, timetable_id=str(timetable_id))
+                status = "cancelled"
+                done.update(status="cancelled", message=MESSAGES[exc.error_key])
+            except SolverJobError as exc:
+                limited = exc.error_key == "solver_resource_limit"
+                done.update(status="resource_limit" if limited else "failed", message=MESSAGES[exc.error_key])
+            except Exception:
+                await _log.aexception("generation_failed", job_id=channel, timetable_id=str(timetable_id))
+                done.update(message=MESSAGES["solver_crashed"])
+            finally:
+                beating.cancel()
+                await asyncio.gather(beating, return_exceptions=True)
+        async with self.session_maker() as session:
+            await JobRepository(session=session).finish(job_id, self.worker_id, status, done, revision_id)
+            await session.commit()
+        self.broker.publish(channel, done)
+
+
+class GenerationRunner:
+    """The web side of generation: queues jobs and streams their progress to the page.
+
+    Jobs are rows of the jobs table, run by a GenerationWorker — ``worker`` when this process
+    runs one, or a separate worker process. With ``worker``, a job's broker channel opens as
+    it is queued, so its stream comes live from the broker from the start. Jobs run elsewhere
+    get a broker channel too, fed by one relay task per process that reads all of them in a
+    single query every ``POLL_SECONDS``: streams only ever subscribe to the broker.
+    """
+
+    def __init__(
+        self,
+        broker: ProgressBroker,
+        session_maker: Callable[[], AsyncSession],
+        service_factory: Callable[[AsyncSession], SolverService],
+        worker: GenerationWorker | None = None,
+    ) -> None:
+        self.broker = broker
+        self.session_maker = session_maker
+        self.service_factory = service_factory
+        self.worker = worker
+        self._relayed: dict[str, dict | None] = {}  # remote job -> progress last published
+        self._relay: asyncio.Task | None = None
+
+    async def start(self, timetable_id: uuid.UUID, kind: str = GENERATION) -> str:
+        """Queue a job of ``kind`` for the timetable; return the job id to stream.
+
+        A job of the same kind for the same timetable and identical solver input that is still
+        queued or running is reused instead of queueing a duplicate. The input of a school job
+        is that of every timetable of the owner.
+        """
+        async with self.session_maker() as session:
+            service = self.service_factory(session)
+            timetable_repo = TimetableRepository(session=session)
+            timetable = await timetable_repo.get(timetable_id)
+            timetables = await timetable_repo.get_by_owner(timetable.owner_id) if kind == SCHOOL else [timetable]
+            fingerprints = [
+                fingerprint(
+                    build_solver_input(other, await service.constraint_repo.get_by_timetable(other.id)),
+                    service.encoding,
+                    service.timeout_seconds,
+                )
+                for other in timetables
+            ]
+            payload_hash = (
+                hashlib.sha256("".join(sorted(fingerprints)).encode()).hexdigest()
+                if kind == SCHOOL
+                else fingerprints[0]
+            )
+            repo = JobRepository(session=session)
+            job = await repo.get_active(timetable_id, payload_hash, kind)
+            if job is None:
+                job = await repo.add(Job(kind=kind, timetable_id=timetable_id, payload_hash=payload_hash))
+                await _log.ainfo("generation_queued", job_id=job.id.hex, timetable_id=str(timetable_id), kind=kind)
+            await session.commit()
+        if self.worker is not None:
+            channel = job.id.hex
+            if not self.broker.has(channel):
+                self.broker.open(channel)
+                self.broker.publish(channel, {"state": "queued"})
+            self.worker.wake()
+        return job.id.hex
+
+    async def timetable_of(self, job_id: str) -> uuid.UUID | None:
+        """The timetable a job generates, or None for unknown jobs."""
+        job = await self._job(job_id)
+        return job.timetable_id if job is not None else None
+
+    async def events(self, job_id: str) -> AsyncIterator[dict]:
+        """Yield the job's current state, then its progress until it is done."""
+        if not self.broker.has(job_id):
+            job = await self._job(job_id)
+            if job is None:
+                return
+            if job.status in FINISHED_STATUSES:
+                yield job.result or _final_event(job.status)
+                return
+            self._follow(job)
+        async for event in self.broker.subscribe(job_id):
+            yield event
+
+    def _follow(self, job: Job) -> None:
+        """Open a broker channel for a job another worker runs, fed by the relay."""
+        channel = job.id.hex
+        if self.broker.has(channel):
+            return  # another stream opened it while this one read the job
+        self.broker.open(channel)
+        self.broker.publish(channel, job.progress or {"state": "queued"})
+        self._relayed[channel] = job.progress
+        if self._relay is None or self._relay.done():
+            self._relay = asyncio.create_task(self._run_relay())
+
+    async def _run_relay(self) -> None:
+        """Publish the saved progress of every relayed job to the broker until all of them are finished."""
+        while self._relayed:
+            await asyncio.sleep(POLL_SECONDS)
+            try:
+                async with self.session_maker() as session:
+                    ids = [uuid.UUID(hex=channel) for channel in self._relayed]
+                    jobs = {job.id.hex: job for job in await JobRepository(session=session).list(Job.id.in_(ids))}
+            except Exception:
+                await _log.aexception("generation_relay_failed", jobs=len(self._relayed))
+                continue
+            for channel, published in list(self._relayed.items()):
+                job = jobs.get(channel)
+                if job is None or job.status in FINISHED_STATUSES:
+                    status = job.status if job is not None else "failed"
+                    self.broker.publish(channel, (job.result if job is not None else None) or _final_event(status))
+                    del self._relayed[channel]
+                elif job.progress is not None and job.progress != published:
+                    self.broker.publish(channel, job.progress)
+                    self._relayed[channel] = job.progress
+
+    async def alternative(self, job_id: str, index: int) -> dict | None:
+        """Grid ``index`` found by a finished alternatives job, or None."""
+        job = await self._job(job_id)
+        if job is None or job.kind != ALTERNATIVES or job.status != "done" or not job.result:
+            return None
+        grids = job.result.get("alternatives") or []
+        return grids[index] if 0 <= index < len(grids) else None
+
+    async def cancel(self, timetable_id: uuid.UUID) -> int:
+        """Cancel the timetable's queued jobs and ask the workers running its others to stop."""
+        async with self.session_maker() as session:
+            repo = JobRepository(session=session)
+            queued = await repo.list(Job.timetable_id == timetable_id, Job.status == "queued")
+            count = await repo.request_cancel(timetable_id)
+            await session.commit()
+        # Queued jobs never reach a worker, so their open channels are closed here.
+        for job in queued:
+            self.broker.publish(job.id.hex, _final_event("cancelled"))
+        return count
+
+    async def shutdown(self) -> None:
+        """Stop relaying; streams of relayed jobs end with the process anyway."""
+        if self._relay is not None:
+            self._relay.cancel()
+            await asyncio.gather(self._relay, return_exceptions=True)
+
+    async def _job(self, job_id: str) -> Job | None:
+        try:
+            key = uuid.UUID(hex=job_id)
+        except ValueError:
+            return None
+        async with self.session_maker() as session:
+            return await JobRepository(session=session).get_one_or_none(id=key)
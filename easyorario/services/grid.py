@@ -0,0 +1,332 @@
+"""Timetable grid shape: days, slots and hours of a class, and how constraints name them.
+
+Free of Z3, so heuristics and the solver's encodings read constraints the same way.
+"""
+
+import struct
+from dataclasses import dataclass
+from typing import Self
+
+DAYS: tuple[str, ...] = ("lunedì", "martedì", "mercoledì", "giovedì", "venerdì", "sabato")
+MAX_SLOTS_PER_DAY = 8
+
+type Grid = dict[str, dict[str, dict[str, str | None]]]
+type Cell = tuple[int, int]  # (day index, slot)
+type Lesson = tuple[str, str | None, str | None]  # (subject, teacher, room)
+
+# Constraint types that only take cells away from subjects, see ``TimetableShape.domains``.
+AVAILABILITY_TYPES = frozenset({"teacher_unavailable", "subject_scheduling"})
+
+
+def slots_per_day(weekly_hours: int) -> int:
+    """Number of daily time slots, matching the slot range offered to the LLM translator."""
+    return max(1, min(weekly_hours // 5, MAX_SLOTS_PER_DAY))
+
+
+@dataclass
+class SolverInput:
+    """Picklable snapshot of a timetable and its verified constraints."""
+
+    timetable_id: str
+    weekly_hours: int
+    subjects: list[str]
+    teachers: dict[str, str]
+    constraints: dict[str, dict]  # constraint id -> formal_representation
+
+
+def subject_hours(solver_input: SolverInput) -> dict[str, int]:
+    """Split weekly hours evenly across subjects; earlier subjects absorb the remainder."""
+    count = len(solver_input.subjects)
+    if not count:
+        return {}
+    base, extra = divmod(solver_input.weekly_hours, count)
+    return {subject: base + (1 if i < extra else 0) for i, subject in enumerate(solver_input.subjects)}
+
+
+def grid_cells(grid: Grid) -> dict[tuple[int, int], str]:
+    """Flatten a grid to ``(day index, slot) -> subject``, skipping unknown days and malformed cells."""
+    cells: dict[tuple[int, int], str] = {}
+    for day, slots in grid.items():
+        if day not in DAYS or not isinstance(slots, dict):
+            continue
+        for slot, cell in slots.items():
+            if isinstance(cell, dict) and (subject := cell.get("subject")) and str(slot).isdigit():
+                cells[(DAYS.index(day), int(slot))] = subject
+    return cells
+
+
+def grid_distance(a: Grid, b: Grid) -> int:
+    """Number of cells whose subject differs between two grids."""
+    cells_a, cells_b = grid_cells(a), grid_cells(b)
+    return sum(1 for key in cells_a.keys() | cells_b.keys() if cells_a.get(key) != cells_b.get(key))
+
+
+# Layout of ``CompactGrid.pack``: version, slots and lesson count, then each lesson's three
+# strings (length-prefixed, _NONE_LENGTH for None), then one byte per cell.
+_PACK_VERSION = 1
+_PACK_HEADER = struct.Struct("<BBB")
+_PACK_LENGTH = struct.Struct("<H")
+_NONE_LENGTH = 0xFFFF
+
+
+def _lesson_key(lesson: Lesson) -> tuple[str, str, str, bool, bool]:
+    subject, teacher, room = lesson
+    return (subject, teacher or "", room or "", teacher is None, room is None)
+
+
+class CompactGrid:
+    """A week of lessons as a fixed days × slots array of small lesson ids.
+
+    ``lessons`` interns every distinct (subject, teacher, room) of the grid once, in a canonical
+    order; cell ``day * slots + slot - 1`` of ``cells`` holds 0 for a free hour, or ``i + 1`` for
+    ``lessons[i]``. Equal weeks therefore have equal tables and byte strings: comparing, hashing
+    and diffing candidate grids touches no per-cell dict or string. ``to_grid`` gives the JSON
+    form stored on revisions, ``rows`` the week-grid template context.
+    """
+
+    __slots__ = ("_hash", "cells", "lessons", "slots")
+
+    def __init__(self, slots: int, lessons: tuple[Lesson, ...], cells: bytes) -> None:
+        if len(cells) != len(DAYS) * slots:
+            raise ValueError(f"expected {len(DAYS) * slots} cells, got {len(cells)}")
+        if len(lessons) > 255 or any(cell > len(lessons) for cell in cells):
+            raise ValueError("cell ids must index the lesson table")
+        self.slots = slots
+        self.lessons = lessons
+        self.cells = cells
+        self._hash: int | None = None
+
+    @classmethod
+    def from_cells(cls, slots: int, placed: dict[Cell, Lesson]) -> Self:
+        """Build a grid from ``(day index, slot) -> lesson``; cells outside the week are dropped."""
+        placed = {(day, slot): lesson for (day, slot), lesson in placed.items() if 1 <= slot <= slots}
+        lessons = tuple(sorted(set(placed.values()), key=_lesson_key))
+        ids = {lesson: i + 1 for i, lesson in enumerate(lessons)}
+        cells = bytearray(len(DAYS) * slots)
+        for (day, slot), lesson in placed.items():
+            cells[day * slots + slot - 1] = ids[lesson]
+        return cls(slots, lessons, bytes(cells))
+
+    @classmethod
+    def from_grid(cls, grid: Grid, slots: int | None = None) -> Self:
+        """Convert the JSON form, skipping unknown days and malformed cells like ``grid_cells``.
+
+        Without ``slots`` the week is as long as the latest lesson.
+        """
+        placed: dict[Cell, Lesson] = {}
+        for day, lessons in grid.items():
+            if day not in DAYS or not isinstance(lessons, dict):
+                continue
+            for slot, cell in lessons.items():
+                if isinstance(cell, dict) and (subject := cell.get("subject")) and str(slot).isdigit():
+                    placed[(DAYS.index(day), int(slot))] = (subject, cell.get("teacher"), cell.get("room"))
+        if slots is None:
+            slots = max((slot for _, slot in placed), default=1)
+        return cls.from_cells(min(slots, 255), placed)
+
+    @classmethod
+    def unpack(cls, data: bytes) -> Self:
+        """Inverse of ``pack``."""
+        version, slots, count = _PACK_HEADER.unpack_from(data)
+        if version != _PACK_VERSION:
+            raise ValueError(f"unknown packed grid version {version}")
+        offset = _PACK_HEADER.size
+        strings: list[str | None] = []
+        for _ in range(count * 3):
+            (length,) = _PACK_LENGTH.unpack_from(data, offset)
+            offset += _PACK_LENGTH.size
+            if length == _NONE_LENGTH:
+                strings.append(None)
+                continue
+            strings.append(data[offset : offset + length].decode())
+            offset += length
+        lessons = tuple((strings[i], strings[i + 1], strings[i + 2]) for i in range(0, len(strings), 3))
+        return cls(slots, lessons, data[offset:])  # type: ignore[arg-type]  # subjects are never None
+
+    def pack(self) -> bytes:
+        """A few hundred bytes for a typical week: header, lesson table, one byte per cell."""
+        parts = [_PACK_HEADER.pack(_PACK_VERSION, self.slots, len(self.lessons))]
+        for lesson in self.lessons:
+            for text in lesson:
+                if text is None:
+                    parts.append(_PACK_LENGTH.pack(_NONE_LENGTH))
+                else:
+                    encoded = text.encode()
+                    parts.append(_PACK_LENGTH.pack(len(encoded)))
+                    parts.append(encoded)
+        parts.append(self.cells)
+        return b"".join(parts)
+
+    def lesson(self, day: int, slot: int) -> Lesson | None:
+        """The lesson taught in a cell, None for a free hour or a slot past the end of the day."""
+        if not 1 <= slot <= self.slots:
+            return None
+        cell = self.cells[day * self.slots + slot - 1]
+        return self.lessons[cell - 1] if cell else None
+
+    def subjects(self) -> dict[Cell, str]:
+        """``(day index, slot) -> subject`` of every lesson, as ``grid_cells`` gives for the JSON form."""
+        return {
+            (index // self.slots, index % self.slots + 1): self.lessons[cell - 1][0]
+            for index, cell in enumerate(self.cells)
+            if cell
+        }
+
+    def distance(self, other: Self) -> int:
+        """Number of cells whose subject differs, as ``grid_distance``."""
+        if self.slots == other.slots and self.lessons == other.lessons:
+            return sum(1 for mine, theirs in zip(self.cells, other.cells, strict=True) if mine != theirs)
+        mine, theirs = self.subjects(), other.subjects()
+        return sum(1 for cell in mine.keys() | theirs.keys() if mine.get(cell) != theirs.get(cell))
+
+    def to_grid(self) -> Grid:
+        """The JSON form: ``{day: {slot: {"subject", "teacher", "room"}}}``, free hours left out."""
+        lessons = [{"subject": subject, "teacher": teacher, "room": room} for subject, teacher, room in self.lessons]
+        grid: Grid = {}
+        for index, cell in enumerate(self.cells):
+            if cell:
+                day, slot = divmod(index, self.slots)
+                grid.setdefault(DAYS[day], {})[str(slot + 1)] = dict(lessons[cell - 1])
+        return grid
+
+    def rows(self) -> list[tuple[int, list[Lesson | None]]]:
+        """Week-grid template context: one ``(slot, lesson or None per day)`` row per slot."""
+        return [(slot, [self.lesson(day, slot) for day in range(len(DAYS))]) for slot in range(1, self.slots + 1)]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CompactGrid):
+            return NotImplemented
+        return self.slots == other.slots and self.cells == other.cells and self.lessons == other.lessons
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash((self.slots, self.cells, self.lessons))
+        return self._hash
+
+    def __repr__(self) -> str:
+        return f"CompactGrid(slots={self.slots}, lessons={len(self.lessons)}, taught={sum(map(bool, self.cells))})"
+
+
+def normalize_name(name: str | None) -> str:
+    """Teacher, subject and day names compare case- and whitespace-insensitively."""
+    return (name or "").strip().casefold()
+
+
+class TimetableShape:
+    """A class's grid dimensions and hours, and how constraint fields name its days, slots and subjects."""
+
+    def __init__(self, solver_input: SolverInput) -> None:
+        self.input = solver_input
+        self.slots = slots_per_day(solver_input.weekly_hours)
+        self.hours = subject_hours(solver_input)
+
+    @property
+    def fits(self) -> bool:
+        """False when the weekly hours cannot fit the grid at all (a pigeonhole Z3 is slow to refute)."""
+        return sum(self.hours.values()) <= len(DAYS) * self.slots
+
+    def domains(self) -> dict[str, set[Cell]]:
+        """Cells each subject may use under its ``teacher_unavailable`` and ``subject_scheduling`` constraints."""
+        every = {(day, slot) for day in range(len(DAYS)) for slot in self._all_slots()}
+        allowed = {subject: set(every) for subject in self.input.subjects}
+        for formal in self.input.constraints.values():
+            kind = formal.get("constraint_type")
+            if kind == "teacher_unavailable":
+                for subject in self._subjects_of_teacher(formal.get("teacher")):
+                    allowed[subject] -= self._cells(formal)
+            elif kind == "subject_scheduling":
+                subject = self._subject(formal.get("subject"))
+                if subject is not None:
+                    allowed[subject] &= self._cells(formal)
+        return allowed
+
+    def reduced_domains(self) -> dict[str, set[Cell]] | None:
+        """``domains`` made arc consistent; None when a subject or a teacher runs out of cells.
+
+        A group (one subject, or all subjects of one teacher) needs as many cells as its weekly
+        hours. When its domains offer exactly that many, every one of those cells goes to the
+        group, so they leave the domains of all other subjects; repeated until nothing changes.
+        """
+        domains = self.domains()
+        taught = [subject for subject in self.input.subjects if self.hours.get(subject)]
+        by_teacher: dict[str, set[str]] = {}
+        for subject in taught:
+            by_teacher.setdefault(normalize_name(self.input.teachers.get(subject)), set()).add(subject)
+        groups = [{subject} for subject in taught]
+        groups += [subjects for teacher, subjects in by_teacher.items() if teacher and len(subjects) > 1]
+        changed = True
+        while changed:
+            changed = False
+            for group in groups:
+                cells = set().union(*(domains[subject] for subject in group))
+                needed = sum(self.hours[subject] for subject in group)
+                if len(cells) < needed:
+                    return None
+                if len(cells) > needed:
+                    continue
+                for other in taught:
+                    if other not in group and domains[other] & cells:
+                        domains[other] -= cells
+                        changed = True
+        return domains
+
+    def count_idle_hours(self, grid: Grid) -> int:
+        """Teachers' free slots between their first and last lesson of a day in ``grid``."""
+        busy: dict[tuple[str, int], set[int]] = {}
+        for (day, slot), subject in grid_cells(grid).items():
+            teacher = normalize_name(self.input.teachers.get(subject))
+            if teacher and 1 <= slot <= self.slots:
+                busy.setdefault((teacher, day), set()).add(slot)
+        return sum(max(slots) - min(slots) + 1 - len(slots) for slots in busy.values())
+
+    def _cells(self, formal: dict) -> set[Cell]:
+        """The cells a constraint's ``days`` and ``time_slots`` name (all of them when omitted)."""
+        return {(day, slot) for day in self._days(formal.get("days")) for slot in self._slots(formal.get("time_slots"))}
+
+    def _all_slots(self) -> range:
+        return range(1, self.slots + 1)
+
+    def _days(self, days: list[str] | None) -> list[int]:
+        if not days:
+            return list(range(len(DAYS)))
+        wanted = {normalize_name(d) for d in days}
+        return [i for i, name in enumerate(DAYS) if name in wanted]
+
+    def _slots(self, slots: list[int] | None) -> list[int]:
+        if not slots:
+            return list(self._all_slots())
+        return sorted({s for s in slots if isinstance(s, int) and 1 <= s <= self.slots})
+
+    def _subject(self, name: str | None) -> str | None:
+        wanted = normalize_name(name)
+        return next((s for s in self.input.subjects if normalize_name(s) == wanted), None) if wanted else None
+
+    def _subjects_of_teacher(self, teacher: str | None) -> list[str]:
+        wanted = normalize_name(teacher)
+        if not wanted:
+            return []
+        return [s for s in self.input.subjects if normalize_name(self.input.teachers.get(s)) == wanted]
+
+    def _constrained_subjects(self, formal: dict) -> list[str]:
+        subject = self._subject(formal.get("subject"))
+        if subject is not None:
+            return [subject]
+        return self._subjects_of_teacher(formal.get("teacher"))
+
+    def _room_of(self, subject: str) -> str | None:
+        for formal in self.input.constraints.values():
+            if formal.get("constraint_type") == "room_requirement" and self._subject(formal.get("subject")) == subject:
+                return formal.get("room")
+        return None
+
+    def lesson_table(self) -> dict[str, Lesson]:
+        """The lesson of each subject, with its teacher and required room."""
+        return {
+            subject: (subject, self.input.teachers.get(subject), self._room_of(subject))
+            for subject in self.input.subjects
+        }
+
+    def compact(self, placed: dict[Cell, str]) -> CompactGrid:
+        """The grid of ``(day index, slot) -> subject`` placements."""
+        table = self.lesson_table()
+        return CompactGrid.from_cells(self.slots, {cell: table[subject] for cell, subject in placed.items()})
@@ -0,0 +1,75 @@
+"""In-process pub/sub of solve job progress, feeding the generation page's event stream."""
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+
+# The last event a job publishes; subscribers stop after it.
+FINAL_STATE = "done"
+
+
+class _Channel:
+    def __init__(self) -> None:
+        # Latest event per state, in first-seen order: a late subscriber gets the current
+        # picture without replaying every intermediate solution.
+        self.latest: dict[str, dict] = {}
+        self.subscribers: set[asyncio.Queue[dict]] = set()
+
+    @property
+    def finished(self) -> bool:
+        return FINAL_STATE in self.latest
+
+
+class ProgressBroker:
+    """Fan-out of job events to any number of stream subscribers, with no database reads.
+
+    Events are plain JSON-ready dicts with at least a ``state`` key. Channels of finished jobs
+    are kept (up to ``retain``) so a page opened after completion still gets the outcome.
+    """
+
+    def __init__(self, retain: int = 256) -> None:
+        self.retain = retain
+        self._channels: OrderedDict[str, _Channel] = OrderedDict()
+
+    def open(self, job_id: str) -> None:
+        """Create the channel of a new job."""
+        self._channels[job_id] = _Channel()
+        while len(self._channels) > self.retain:
+            stale = next((key for key, channel in self._channels.items() if channel.finished), None)
+            if stale is None:
+                break
+            del self._channels[stale]
+
+    def has(self, job_id: str) -> bool:
+        return job_id in self._channels
+
+    def publish(self, job_id: str, event: dict) -> None:
+        """Record an event and hand it to every current subscriber of the job."""
+        channel = self._channels.get(job_id)
+        if channel is None or channel.finished:
+            return
+        channel.latest[event["state"]] = event
+        for queue in channel.subscribers:
+            queue.put_nowait(event)
+
+    async def subscribe(self, job_id: str) -> AsyncIterator[dict]:
+        """Yield the job's current state, then live events until it is done."""
+        channel = self._channels.get(job_id)
+        if channel is None:
+            return
+        queue: asyncio.Queue[dict] = asyncio.Queue()
+        snapshot = list(channel.latest.values())
+        if not channel.finished:
+            channel.subscribers.add(queue)
+        try:
+            for event in snapshot:
+                yield event
+            if channel.finished:
+                return
+            while True:
+                event = await queue.get()
+                yield event
+                if event["state"] == FINAL_STATE:
+                    return
+        finally:
+            channel.subscribers.discard(queue)
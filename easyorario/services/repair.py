@@ -0,0 +1,116 @@
+"""Minimal-change repair of an existing timetable after a small constraint edit."""
+
+from collections import Counter
+
+from easyorario.services.draft import DraftBuilder
+from easyorario.services.grid import Cell, Grid, grid_cells
+
+# Longest ejection chain tried for one lesson: it may displace this many others in turn.
+MAX_CHAIN_LENGTH = 3
+
+# Cells tried across all chains of one repair, so a hopeless search gives up in milliseconds.
+MAX_CHAIN_STEPS = 5000
+
+
+def changed_constraints(before: dict[str, dict], after: dict[str, dict]) -> list[dict]:
+    """Formal representations in ``after`` that are new or differ from ``before``.
+
+    Removed constraints are left out: dropping a constraint never invalidates a grid.
+    """
+    return [formal for constraint_id, formal in after.items() if before.get(constraint_id) != formal]
+
+
+class RepairBuilder(DraftBuilder):
+    """Moves only the lessons of an existing grid that break the current hard constraints.
+
+    Broken lessons are lifted out and put back into a free valid cell when there is one;
+    otherwise an ejection chain lets the lesson take an occupied cell whose occupant is placed
+    in turn, up to ``MAX_CHAIN_LENGTH`` moves deep. Every other lesson stays where it was.
+    """
+
+    def violated(self, grid: Grid) -> bool:
+        """Whether ``grid`` still matches the class but breaks one of its current hard constraints.
+
+        Only such a grid is worth repairing; one that no longer matches the class is solved anew.
+        """
+        placed = grid_cells(grid)
+        if not self._matches(placed):
+            return False
+        return any(
+            cell not in self.allowed[subject] or self._breaks_run(subject, cell, placed)
+            for cell, subject in placed.items()
+        )
+
+    def repair(self, grid: Grid) -> Grid | None:
+        """The repaired grid, or None if the grid no longer matches the class or no chain works."""
+        placed = grid_cells(grid)
+        if not self._matches(placed):
+            return None
+        lifted: list[str] = []
+        for cell, subject in sorted(placed.items()):
+            if cell not in self.allowed[subject]:
+                lifted.append(placed.pop(cell))
+        for cell in sorted(placed):
+            if self._breaks_run(placed[cell], cell, placed):
+                lifted.append(placed.pop(cell))
+        self._steps = MAX_CHAIN_STEPS
+        for subject in lifted:
+            if not self._reinsert(subject, placed, MAX_CHAIN_LENGTH, set()):
+                return None
+        return self._grid(placed)
+
+    def windows(self, grid: Grid, changed: list[dict]) -> list[list[Cell]]:
+        """Cells a re-solve may rearrange, smallest first.
+
+        The narrow window holds the lessons of the subjects (or the teacher's subjects) the
+        changed constraints name, plus the cells they mention; the wide one extends it to the
+        whole days involved. Empty when the changes name no subject, teacher or cell.
+        """
+        subjects: set[str] = set()
+        mentioned: set[Cell] = set()
+        for formal in changed:
+            subjects.update(self._constrained_subjects(formal))
+            if formal.get("days") or formal.get("time_slots"):
+                mentioned.update(self._cells(formal))
+        narrow = {cell for cell, subject in grid_cells(grid).items() if subject in subjects} | mentioned
+        if not narrow:
+            return []
+        wide = {(day, slot) for day in {day for day, _ in narrow} for slot in self._all_slots()}
+        return [sorted(narrow), sorted(wide)] if wide != narrow else [sorted(narrow)]
+
+    def cost(self, grid: Grid) -> int | None:
+        """``teacher_preferred`` violations of ``grid``, None when the class has no preferences."""
+        if not self.preferred:
+            return None
+        return sum(self._penalty(subject, cell) for cell, subject in grid_cells(grid).items())
+
+    def _matches(self, placed: dict[Cell, str]) -> bool:
+        """Whether ``placed`` holds exactly the class's lessons, all within its day length."""
+        expected = Counter({subject: hours for subject, hours in self.hours.items() if hours})
+        return self.feasible and Counter(placed.values()) == expected and all(slot <= self.slots for _, slot in placed)
+
+    def _reinsert(self, subject: str, placed: dict[Cell, str], depth: int, locked: set[Cell]) -> bool:
+        """Place one lesson of ``subject``, displacing at most ``depth`` lessons in a chain.
+
+        On failure ``placed`` is left exactly as it was.
+        """
+        options = self._options(subject, placed)
+        if options:
+            placed[min(options, key=lambda c: (self._penalty(subject, c), c))] = subject
+            return True
+        if depth == 0:
+            return False
+        for cell in sorted(self.allowed[subject] - locked, key=lambda c: (self._penalty(subject, c), c)):
+            occupant = placed.get(cell)
+            if occupant is None or occupant == subject:
+                continue
+            if self._steps <= 0:
+                return False
+            self._steps -= 1
+            placed[cell] = subject
+            if not self._breaks_run(subject, cell, placed) and self._reinsert(
+                occupant, placed, depth - 1, locked | {cell}
+            ):
+                return True
+            placed[cell] = occupant
+        return False
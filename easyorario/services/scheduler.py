@@ -0,0 +1,140 @@
+"""Fair admission of solver jobs to the worker pool across owners and priorities."""
+
+import asyncio
+import contextlib
+import itertools
+from collections import Counter
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import structlog
+
+from easyorario.exceptions import SolverJobError
+from easyorario.services.solver_pool import JobFunction, SolverPool
+
+_log = structlog.get_logger()
+
+# Job priorities, lower runs first: a user waiting on one timetable beats a school-wide batch.
+INTERACTIVE = 0
+BATCH = 1
+
+
+@dataclass
+class _Ticket:
+    priority: int
+    sequence: int
+    owner: str
+    slots: int
+    granted: asyncio.Future[None] = field(default_factory=lambda: asyncio.get_running_loop().create_future())
+
+
+class SolverScheduler:
+    """Queues solver jobs in front of a SolverPool and decides which one gets the next worker.
+
+    At most ``capacity`` jobs (the pool's worker count by default) run at once, and at most
+    ``per_owner`` of them for the same owner, so one user's large batch leaves workers for
+    everybody else. A group of jobs raced together, such as a portfolio, is admitted through
+    ``reserve`` as one job of its owner that occupies several workers. Waiting jobs start by
+    priority, first come first served within a priority, skipping jobs whose owner is at its
+    cap. More than ``queue_size`` waiting jobs of one priority is refused with
+    ``SolverJobError("solver_queue_full")`` rather than queued indefinitely; each priority has
+    its own bound, so school-wide batches filling the queue never refuse an interactive solve.
+    """
+
+    def __init__(
+        self,
+        pool: SolverPool,
+        per_owner: int = 2,
+        queue_size: int = 64,
+        capacity: int | None = None,
+    ) -> None:
+        self.pool = pool
+        self.per_owner = max(1, per_owner)
+        self.queue_size = max(0, queue_size)
+        self.capacity = max(1, capacity or pool.max_workers)
+        self._waiting: list[_Ticket] = []  # sorted by (priority, sequence)
+        self._running: Counter[str] = Counter()  # admitted tickets per owner
+        self._busy = 0  # workers held by admitted tickets
+        self._sequence = itertools.count()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiting)
+
+    @property
+    def running(self) -> int:
+        return self._busy
+
+    async def run(
+        self,
+        fn: JobFunction,
+        payload: Any,
+        *,
+        owner: str | None,
+        priority: int = INTERACTIVE,
+        timeout: float,
+        on_event: Callable[[Any], None] | None = None,
+        affinity: str | None = None,
+    ) -> Any:
+        """Wait for the job's turn, then run it on the pool; see ``SolverPool.run``."""
+        async with self.reserve(owner=owner, priority=priority):
+            return await self.pool.run(fn, payload, timeout=timeout, on_event=on_event, affinity=affinity)
+
+    @contextlib.asynccontextmanager
+    async def reserve(self, *, owner: str | None, priority: int = INTERACTIVE, slots: int = 1) -> AsyncIterator[None]:
+        """Wait for the turn of a group of up to ``slots`` jobs, then hold their workers.
+
+        The group counts once against the owner's cap; its jobs go straight to the pool.
+        ``slots`` beyond ``capacity`` wait for the whole pool instead.
+        """
+        ticket = _Ticket(
+            priority=priority, sequence=next(self._sequence), owner=owner or "", slots=min(max(1, slots), self.capacity)
+        )
+        await self._admit(ticket)
+        try:
+            yield
+        finally:
+            self._release(ticket)
+
+    async def _admit(self, ticket: _Ticket) -> None:
+        owner, priority = ticket.owner, ticket.priority
+        self._waiting.append(ticket)
+        self._waiting.sort(key=lambda t: (t.priority, t.sequence))
+        self._dispatch()
+        if ticket.granted.done():
+            return
+        if sum(1 for waiting in self._waiting if waiting.priority == priority) > self.queue_size:
+            self._waiting.remove(ticket)
+            await _log.awarning("solver_queue_full", owner=owner, priority=priority, waiting=len(self._waiting))
+            raise SolverJobError("solver_queue_full")
+        try:
+            await ticket.granted
+        except BaseException:
+            if ticket in self._waiting:
+                self._waiting.remove(ticket)
+            elif not ticket.granted.cancelled():
+                self._release(ticket)  # granted just as the caller was cancelled: hand the slot on
+            raise
+
+    def _release(self, ticket: _Ticket) -> None:
+        self._busy -= ticket.slots
+        self._running[ticket.owner] -= 1
+        if self._running[ticket.owner] <= 0:
+            del self._running[ticket.owner]
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant waiting tickets in order while workers and owner caps allow."""
+        for ticket in list(self._waiting):
+            if ticket.granted.done():  # its caller was cancelled while waiting
+                self._waiting.remove(ticket)
+                continue
+            if self._running[ticket.owner] >= self.per_owner:
+                continue
+            if self._busy + ticket.slots > self.capacity:
+                return
+            self._waiting.remove(ticket)
+            self._busy += ticket.slots
+            self._running[ticket.owner] += 1
+            ticket.granted.set_result(None)
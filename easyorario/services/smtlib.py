@@ -0,0 +1,87 @@
+"""SMT-LIB2 dumps of solver instances, replayed offline to reproduce slow production solves.
+
+A dump is the Z3 benchmark of one solve's first check (``Solver.to_smt2``) preceded by a
+one-line JSON header with everything else the answer depends on: configuration, logic,
+parameters, encoding and timeout. Constraints stay behind assumption literals, as on the
+warm context, and end the file as ``(check-sat-assuming ...)``. The hint and the bounds of
+later optimization rounds are not part of it: the fingerprint that names the dump ignores
+the hint, and no bound exists yet when the first check starts. Dumps are named by the input's
+fingerprint, so the same instance solved twice is dumped once and a directory of dumps is a
+deduplicated benchmark corpus.
+"""
+
+import json
+import os
+import re
+import time
+from pathlib import Path
+
+import z3
+
+DUMP_SUFFIX = ".smt2"
+
+_HEADER_PREFIX = "; easyorario "
+
+_CHECK_SAT_ASSUMING = re.compile(r"^\(check-sat-assuming \((.*)\)\)$", re.MULTILINE)
+
+
+def dump_path(directory: Path, key: str) -> Path:
+    """Where the dump of the instance with fingerprint ``key`` lives."""
+    return directory / f"{key}{DUMP_SUFFIX}"
+
+
+def write_dump(
+    path: Path, assertions: list[z3.BoolRef], header: dict, assumptions: list[z3.BoolRef] | None = None
+) -> bool:
+    """Write the assertions as an SMT-LIB2 benchmark unless ``path`` exists; return whether it was written.
+
+    With ``assumptions`` the benchmark ends in ``(check-sat-assuming ...)`` instead of
+    ``(check-sat)``. The file is written aside and renamed into place, so concurrent solves of
+    the same instance never leave a truncated dump behind.
+    """
+    if path.exists():
+        return False
+    solver = z3.Solver()
+    solver.add(assertions)
+    text = solver.to_smt2()
+    if assumptions:
+        names = " ".join(str(literal) for literal in assumptions)
+        text = text.removesuffix("(check-sat)\n") + f"(check-sat-assuming ({names}))\n"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    partial.write_text(f"{_HEADER_PREFIX}{json.dumps(header, sort_keys=True)}\n{text}")
+    os.replace(partial, path)
+    return True
+
+
+def read_dump(path: Path) -> tuple[dict, str]:
+    """Return a dump's header and its SMT-LIB2 text."""
+    text = path.read_text()
+    first, _, _ = text.partition("\n")
+    header = json.loads(first.removeprefix(_HEADER_PREFIX)) if first.startswith(_HEADER_PREFIX) else {}
+    return header, text
+
+
+def replay(
+    text: str,
+    timeout_seconds: float,
+    logic: str | None = None,
+    params: list[tuple[str, int | str]] | None = None,
+) -> tuple[str, float, dict[str, float]]:
+    """Check an SMT-LIB2 benchmark; return its status, the seconds the check took, and Z3's statistics.
+
+    ``from_string`` only loads assertions, so a final ``(check-sat-assuming ...)`` is applied here.
+    """
+    solver = z3.SolverFor(logic) if logic else z3.Solver()
+    for key, value in params or []:
+        solver.set(key, value)
+    solver.from_string(text)
+    match = _CHECK_SAT_ASSUMING.search(text)
+    assumptions = [z3.Bool(name) for name in match.group(1).split()] if match else []
+    solver.set("timeout", max(1, int(timeout_seconds * 1000)))
+    started = time.perf_counter()
+    outcome = solver.check(*assumptions)
+    elapsed = time.perf_counter() - started
+    stats = solver.statistics()
+    status = "sat" if outcome == z3.sat else "unsat" if outcome == z3.unsat else "timeout"
+    return status, elapsed, dict(stats[i] for i in range(len(stats)))
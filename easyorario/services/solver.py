@@ -0,0 +1,1817 @@
+"""Solver service — sole Z3 interface: encodes timetables and solves them in worker processes."""
+
+import abc
+import asyncio
+import contextlib
+import hashlib
+import itertools
+import json
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, cast
+
+import structlog
+import z3
+
+from easyorario.exceptions import SolverJobError
+from easyorario.i18n.errors import MESSAGES
+from easyorario.models.constraint import Constraint
+from easyorario.models.revision import Revision
+from easyorario.models.solver_cache import SolverCacheEntry
+from easyorario.models.timetable import Timetable
+from easyorario.repositories.constraint import ConstraintRepository
+from easyorario.repositories.revision import RevisionRepository
+from easyorario.repositories.solver_cache import SolverCacheRepository
+from easyorario.repositories.timetable import TimetableRepository
+from easyorario.services.constraint import ConflictWarning
+from easyorario.services.draft import draft_grid
+from easyorario.services.grid import (
+    AVAILABILITY_TYPES,
+    DAYS,
+    MAX_SLOTS_PER_DAY,
+    Cell,
+    CompactGrid,
+    Grid,
+    SolverInput,
+    TimetableShape,
+    grid_cells,
+    grid_distance,
+    normalize_name,
+    slots_per_day,
+)
+from easyorario.services.repair import RepairBuilder, changed_constraints
+from easyorario.services.scheduler import BATCH, INTERACTIVE, SolverScheduler
+from easyorario.services.smtlib import dump_path, write_dump
+from easyorario.services.solver_pool import JobFunction, SolverPool
+
+_log = structlog.get_logger()
+
+# Z3's own timeout fires this much earlier than the pool's hard kill, so an ordinary
+# timeout comes back as a clean result and the worker process survives.
+SOFT_TIMEOUT_MARGIN_SECONDS = 2.0
+
+# Variable encoding used unless configured otherwise. On benchmarks/encodings.py instances the
+# one-hot encoding solves about 3x faster than integer lesson positions with Distinct.
+DEFAULT_ENCODING = "onehot"
+
+# Warm per-timetable solver contexts kept by each worker process.
+CONTEXT_CACHE_SIZE = 16
+
+# Budget of the Z3 window re-solve in repair mode, before falling back to a full solve.
+REPAIR_TIMEOUT_SECONDS = 1.0
+
+# Budget of the check run when a constraint is approved, and of shrinking its unsat core: the
+# warm context usually answers in milliseconds, and the approval click must stay responsive.
+FEASIBILITY_TIMEOUT_SECONDS = 3.0
+FEASIBILITY_CORE_BUDGET_SECONDS = 1.0
+
+# Lessons that must move between two alternative timetables, so alternatives are not
+# near-copies of each other differing by one swapped pair.
+ALTERNATIVE_MIN_DISTANCE = 4
+
+# Share of a worker's memory limit handed to Z3's own memory_max_size: Z3 then stops in a
+# known way before the kernel refuses an allocation somewhere in the interpreter.
+Z3_MEMORY_SHARE = 0.8
+
+# Part of every fingerprint: bump it when an encoding change alters answers, so cached
+# results computed by the old model stop matching.
+FINGERPRINT_VERSION = 1
+
+
+@dataclass(frozen=True)
+class SolverConfig:
+    """One Z3 search configuration of the portfolio."""
+
+    name: str
+    logic: str | None = None  # None: default SMT solver; "QF_FD": SAT-based bit-blasting of cardinalities
+    params: tuple[tuple[str, int | str], ...] = ()
+
+
+# Raced in this order; on timetabling instances runtimes swing with tactic, phase and seed.
+PORTFOLIO: tuple[SolverConfig, ...] = (
+    SolverConfig("default"),
+    SolverConfig("sat", logic="QF_FD"),
+    SolverConfig("smt-phase-false", params=(("phase_selection", 0),)),
+    SolverConfig("smt-phase-random", params=(("phase_selection", 4), ("random_seed", 1))),
+    SolverConfig("sat-seed-1", logic="QF_FD", params=(("random_seed", 1),)),
+    SolverConfig("default-seed-2", params=(("random_seed", 2),)),
+    SolverConfig("sat-phase-random", logic="QF_FD", params=(("phase", "random"), ("random_seed", 3))),
+    SolverConfig("smt-phase-true", params=(("phase_selection", 1),)),
+)
+DEFAULT_CONFIG = PORTFOLIO[0]
+
+
+@dataclass
+class SolveJob:
+    """A solve request shipped to a worker process."""
+
+    input: SolverInput
+    timeout_seconds: float
+    core_budget_seconds: float = 0.0
+    config: SolverConfig = DEFAULT_CONFIG
+    encoding: str = DEFAULT_ENCODING
+    hint: Grid | None = None  # previous revision's grid, used as phase hints
+    optimize: bool = True  # minimize teacher_preferred violations once a grid is found
+    idle_hours: bool = False  # also minimize teachers' idle hours, see ``TimetableModel.idle_hours``
+    dump: Path | None = None  # write the instance here as SMT-LIB2 before solving; see services/smtlib.py
+
+
+@dataclass
+class SolveEvent:
+    """Progress of a running solve job, streamed from the worker."""
+
+    state: str  # "queued", "draft", "encoding", "solving", "conflicts", "improved", "repaired" or "alternative"
+    grid: Grid | None = None
+    cost: int | None = None  # teacher_preferred violations of ``grid``, plus idle hours if minimized
+    idle_hours: int | None = None  # the part of ``cost`` due to idle hours; None if they are not minimized
+    elapsed_seconds: float = 0.0
+    statistics: dict[str, float] = field(default_factory=dict)  # Z3 counters at the time of the event
+    conflicting_constraint_ids: list[str] = field(default_factory=list)
+    index: int | None = None  # position of an "alternative" event's grid in the job's result
+
+
+@dataclass
+class SolveResult:
+    """Outcome of a solve job."""
+
+    status: str  # "sat", "unsat" or "timeout"
+    grid: Grid | None = None
+    elapsed_seconds: float = 0.0
+    statistics: dict[str, float] = field(default_factory=dict)
+    conflicting_constraint_ids: list[str] = field(default_factory=list)  # unsat core, empty otherwise
+    core_extracted: bool = True  # False when unsat but the core could not be computed in time
+    config: str = DEFAULT_CONFIG.name
+    cost: int | None = None  # teacher_preferred violations (plus idle hours if minimized); None if not optimized
+    optimal: bool = False  # True when no grid with a lower cost exists
+
+
+def _cacheable(result: SolveResult) -> bool:
+    """Whether ``result`` is what any later solve of the same input would settle on.
+
+    A grid cut short while optimizing (``cost`` set but not ``optimal``) depends on timing, and
+    so does an ``unsat`` whose core could not be extracted.
+    """
+    if result.status == "unsat":
+        return result.core_extracted
+    return result.optimal or result.cost is None
+
+
+def build_solver_input(timetable: Timetable, constraints: list[Constraint]) -> SolverInput:
+    """Snapshot a timetable and its verified, translated constraints for the solver."""
+    return SolverInput(
+        timetable_id=str(timetable.id),
+        weekly_hours=timetable.weekly_hours,
+        subjects=list(timetable.subjects),
+        teachers=dict(timetable.teachers),
+        constraints={
+            str(c.id): c.formal_representation
+            for c in constraints
+            if c.status == "verified" and isinstance(c.formal_representation, dict)
+        },
+    )
+
+
+def canonical_constraints(solver_input: SolverInput) -> list[tuple[str, str]]:
+    """``(canonical JSON, constraint id)`` pairs in a content-defined order."""
+    return sorted(
+        (json.dumps(formal, sort_keys=True, ensure_ascii=False), constraint_id)
+        for constraint_id, formal in solver_input.constraints.items()
+    )
+
+
+def fingerprint(solver_input: SolverInput, encoding: str, timeout_seconds: float, idle_hours: bool = False) -> str:
+    """Content hash of everything a solve's answer depends on.
+
+    Timetable and constraint ids are left out on purpose: two inputs with the same shape and
+    the same verified constraints share one fingerprint.
+    """
+    payload = {
+        "version": FINGERPRINT_VERSION,
+        "weekly_hours": solver_input.weekly_hours,
+        "subjects": solver_input.subjects,
+        "teachers": sorted(solver_input.teachers.items()),
+        "constraints": [canonical for canonical, _ in canonical_constraints(solver_input)],
+        "encoding": encoding,
+        "timeout_seconds": timeout_seconds,
+    }
+    if idle_hours:
+        payload["idle_hours"] = True  # only when set, so fingerprints cached without it stay valid
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+def _minimal_core(solver: z3.Solver, literals: dict[str, z3.BoolRef], budget_seconds: float) -> list[str]:
+    """Constraint ids in the last ``unsat`` check's core, shrunk by deletion within ``budget_seconds``.
+
+    Each constraint of Z3's core is dropped in turn and stays out if the rest is still unsat.
+    When the budget runs out the core returned is still a valid explanation, just possibly
+    not minimal.
+    """
+    by_name = {str(literal): cid for cid, literal in literals.items()}
+    core = [by_name[str(lit)] for lit in solver.unsat_core() if str(lit) in by_name]
+    deadline = time.monotonic() + budget_seconds
+    index = 0
+    while index < len(core):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        candidate = core[:index] + core[index + 1 :]
+        solver.set("timeout", max(1, int(remaining * 1000)))
+        if solver.check(*[literals[cid] for cid in candidate]) == z3.unsat:
+            # Z3's new core may drop more than one constraint at once; the ones before
+            # ``index`` are known to be necessary and always survive.
+            reduced = {by_name[str(lit)] for lit in solver.unsat_core() if str(lit) in by_name}
+            core = [cid for cid in candidate if cid in reduced]
+        else:
+            index += 1
+    return core
+
+
+def _conjunction(parts: list[z3.BoolRef]) -> z3.BoolRef:
+    """``z3.And`` that tolerates an empty list."""
+    return cast(z3.BoolRef, z3.And(parts)) if parts else z3.BoolVal(True)
+
+
+def _disjunction(parts: list[z3.BoolRef]) -> z3.BoolRef:
+    """``z3.Or`` that tolerates an empty list."""
+    return cast(z3.BoolRef, z3.Or(parts)) if parts else z3.BoolVal(False)
+
+
+def _negation(part: z3.BoolRef) -> z3.BoolRef:
+    """``z3.Not`` typed as a formula."""
+    return cast(z3.BoolRef, z3.Not(part))
+
+
+def _equals(left: z3.ExprRef, right: z3.ExprRef | int) -> z3.BoolRef:
+    """``left == right`` typed as a formula rather than ``object.__eq__``'s bool."""
+    return cast(z3.BoolRef, left == right)
+
+
+class TimetableModel(TimetableShape, abc.ABC):
+    """Z3 encoding of a single class; subclasses choose the decision variables.
+
+    ``cells[(subject, day, slot)]`` is a Boolean expression that holds when the subject is taught
+    in that cell. Constraint encodings are written against ``cells`` only, so they work with
+    every variable encoding.
+    """
+
+    encoding = ""
+
+    def __init__(self, solver_input: SolverInput) -> None:
+        super().__init__(solver_input)
+        self.prefix = solver_input.timetable_id.replace("-", "")[:12]
+        self.cells: dict[tuple[str, int, int], z3.BoolRef] = self._make_cells()
+
+    @abc.abstractmethod
+    def base_assertions(self) -> list[z3.BoolRef]:
+        """At most one lesson per cell and exactly the allotted hours per subject."""
+
+    @abc.abstractmethod
+    def _make_cells(self) -> dict[tuple[str, int, int], z3.BoolRef]:
+        """The Boolean of every cell, building the encoding's decision variables."""
+
+    @abc.abstractmethod
+    def hint(self, grid: Grid) -> list[tuple[z3.ExprRef, z3.ExprRef]]:
+        """Initial values steering the search towards ``grid``; cells outside this model are ignored."""
+
+    def encode(self, formal: dict) -> z3.BoolRef:
+        """Encode one formal_representation as a single hard Z3 formula.
+
+        ``teacher_preferred``, ``room_requirement`` and ``general`` constraints do not restrict
+        a single class timetable and encode to ``True``; preferences are soft, see ``penalties``.
+        """
+        kind = formal.get("constraint_type")
+        days = self._days(formal.get("days"))
+        slots = self._slots(formal.get("time_slots"))
+        if kind == "teacher_unavailable":
+            subjects = self._subjects_of_teacher(formal.get("teacher"))
+            return _conjunction([_negation(self.cells[(s, d, t)]) for s in subjects for d in days for t in slots])
+        if kind == "subject_scheduling":
+            subject = self._subject(formal.get("subject"))
+            if subject is None:
+                return z3.BoolVal(True)
+            allowed = {(d, t) for d in days for t in slots}
+            return _conjunction(
+                [
+                    _negation(self.cells[(subject, d, t)])
+                    for d in range(len(DAYS))
+                    for t in self._all_slots()
+                    if (d, t) not in allowed
+                ]
+            )
+        if kind == "max_consecutive":
+            limit = formal.get("max_consecutive_hours")
+            subjects = self._constrained_subjects(formal)
+            if not isinstance(limit, int) or limit < 1 or not subjects:
+                return z3.BoolVal(True)
+            return _conjunction(self._max_consecutive(subjects, limit))
+        return z3.BoolVal(True)
+
+    def confine(self, domains: dict[str, set[Cell]]) -> z3.BoolRef:
+        """No lesson in a cell outside its subject's ``domains``, as returned by ``reduced_domains``."""
+        return _conjunction(
+            [
+                _negation(cell)
+                for (subject, day, slot), cell in self.cells.items()
+                if (day, slot) not in domains[subject]
+            ]
+        )
+
+    def penalties(self) -> list[z3.BoolRef]:
+        """One term per lesson a ``teacher_preferred`` constraint would rather see elsewhere.
+
+        Every lesson of the teacher (or of the named subject) taught outside the preferred
+        days and slots costs 1; the optimizer minimizes the number of true terms.
+        """
+        terms: list[z3.BoolRef] = []
+        for formal in self.input.constraints.values():
+            if formal.get("constraint_type") != "teacher_preferred":
+                continue
+            preferred = {(d, t) for d in self._days(formal.get("days")) for t in self._slots(formal.get("time_slots"))}
+            for subject in self._constrained_subjects(formal):
+                terms.extend(
+                    self.cells[(subject, d, t)]
+                    for d in range(len(DAYS))
+                    for t in self._all_slots()
+                    if (d, t) not in preferred
+                )
+        return terms
+
+    def idle_hours(self) -> tuple[list[z3.BoolRef], list[z3.BoolRef]]:
+        """Teachers' idle hours ("ore buche"): free slots between a day's first and last lesson.
+
+        Returns the definitions to assert and one Boolean per (teacher, day, slot) that holds
+        exactly when the slot is idle. ``before``/``after`` flags chain along the day, so each
+        slot costs a few small equivalences rather than an ``If`` sum over the whole day.
+        """
+        definitions: list[z3.BoolRef] = []
+        idle: list[z3.BoolRef] = []
+        teachers = sorted({normalize_name(teacher) for teacher in self.input.teachers.values()} - {""})
+        for k, teacher in enumerate(teachers):
+            subjects = self._subjects_of_teacher(teacher)
+            for day in range(len(DAYS)):
+                busy = [_disjunction([self.cells[(s, day, slot)] for s in subjects]) for slot in self._all_slots()]
+                name = f"{self.prefix}_{k}_{day}"
+                before = self._seen(busy, f"ib_{name}", definitions)
+                after = self._seen(busy[::-1], f"ia_{name}", definitions)[::-1]
+                for i in range(1, len(busy) - 1):
+                    gap = z3.Bool(f"ig_{name}_{i}")
+                    definitions.append(_equals(gap, _conjunction([_negation(busy[i]), before[i], after[i]])))
+                    idle.append(gap)
+        return definitions, idle
+
+    @staticmethod
+    def _seen(busy: list[z3.BoolRef], name: str, definitions: list[z3.BoolRef]) -> list[z3.BoolRef]:
+        """``seen[i]`` holds when any of ``busy[:i]`` does."""
+        seen: list[z3.BoolRef] = [z3.BoolVal(False)]
+        for i in range(1, len(busy)):
+            if i == 1:
+                seen.append(busy[0])
+                continue
+            flag = z3.Bool(f"{name}_{i}")
+            definitions.append(_equals(flag, _disjunction([seen[-1], busy[i - 1]])))
+            seen.append(flag)
+        return seen
+
+    def teacher_busy(self, teacher: str, day: int, slot: int) -> z3.BoolRef | None:
+        """Holds when ``teacher`` teaches this class in the cell; None if that is impossible."""
+        subjects = self._subjects_of_teacher(teacher)
+        if not subjects or slot > self.slots:
+            return None
+        return _disjunction([self.cells[(subject, day, slot)] for subject in subjects])
+
+    def compact_grid(self, model: z3.ModelRef) -> CompactGrid:
+        """Read the assigned cells out of a satisfying model."""
+        return self.compact(
+            {
+                (day, slot): subject
+                for (subject, day, slot), cell in self.cells.items()
+                if z3.is_true(model.eval(cell, model_completion=True))
+            }
+        )
+
+    def grid(self, model: z3.ModelRef) -> Grid:
+        """``compact_grid`` in the JSON form stored on revisions."""
+        return self.compact_grid(model).to_grid()
+
+    def _max_consecutive(self, subjects: list[str], limit: int) -> list[z3.BoolRef]:
+        """Naive encoding: every window of ``limit + 1`` slots holds at most ``limit`` lessons."""
+        assertions: list[z3.BoolRef] = []
+        for day in range(len(DAYS)):
+            busy = [z3.Or([self.cells[(s, day, slot)] for s in subjects]) for slot in self._all_slots()]
+            for start in range(len(busy) - limit):
+                assertions.append(z3.AtMost(*busy[start : start + limit + 1], limit))
+        return assertions
+
+
+class OneHotModel(TimetableModel):
+    """One boolean per (subject, day, slot); clashes and hour totals as cardinality constraints."""
+
+    encoding = "onehot"
+
+    def _make_cells(self) -> dict[tuple[str, int, int], z3.BoolRef]:
+        return {
+            (subject, day, slot): z3.Bool(f"x_{self.prefix}_{k}_{day}_{slot}")
+            for k, subject in enumerate(self.input.subjects)
+            for day in range(len(DAYS))
+            for slot in self._all_slots()
+        }
+
+    def hint(self, grid: Grid) -> list[tuple[z3.ExprRef, z3.ExprRef]]:
+        # Every cell gets a value, so a hint fully replaces the one left by a previous solve.
+        taught = grid_cells(grid)
+        return [
+            (cell, z3.BoolVal(taught.get((day, slot)) == subject)) for (subject, day, slot), cell in self.cells.items()
+        ]
+
+    def base_assertions(self) -> list[z3.BoolRef]:
+        assertions: list[z3.BoolRef] = []
+        for day in range(len(DAYS)):
+            for slot in self._all_slots():
+                lessons = [self.cells[(subject, day, slot)] for subject in self.input.subjects]
+                if len(lessons) > 1:
+                    assertions.append(z3.AtMost(*lessons, 1))
+        for subject, hours in self.hours.items():
+            lessons = [self.cells[(subject, day, slot)] for day in range(len(DAYS)) for slot in self._all_slots()]
+            assertions.append(z3.PbEq([(lesson, 1) for lesson in lessons], hours))
+        return assertions
+
+
+class IntegerModel(TimetableModel):
+    """One integer cell index per lesson instance; all lessons of the class pairwise ``Distinct``.
+
+    Hour totals hold by construction (one variable per weekly hour), and a cell's Boolean is
+    the disjunction of the subject's lesson variables pointing at it. A subject's lesson
+    instances are interchangeable, so they are kept in increasing cell order: otherwise every
+    grid has ``hours!`` equivalent models and unsat proofs must refute each of them.
+    """
+
+    encoding = "integer"
+
+    def _make_cells(self) -> dict[tuple[str, int, int], z3.BoolRef]:
+        self.lessons: dict[str, list[z3.ArithRef]] = {
+            subject: [z3.Int(f"p_{self.prefix}_{k}_{i}") for i in range(self.hours[subject])]
+            for k, subject in enumerate(self.input.subjects)
+        }
+        return {
+            (subject, day, slot): _disjunction([_equals(lesson, self.cell_index(day, slot)) for lesson in lessons])
+            for subject, lessons in self.lessons.items()
+            for day in range(len(DAYS))
+            for slot in self._all_slots()
+        }
+
+    def cell_index(self, day: int, slot: int) -> int:
+        return day * self.slots + slot - 1
+
+    def hint(self, grid: Grid) -> list[tuple[z3.ExprRef, z3.ExprRef]]:
+        # A subject's hinted cells go to its lessons in order; lessons beyond them stay unhinted.
+        positions: dict[str, list[int]] = {}
+        for (day, slot), subject in sorted(grid_cells(grid).items()):
+            if slot <= self.slots:
+                positions.setdefault(subject, []).append(self.cell_index(day, slot))
+        return [
+            (lesson, z3.IntVal(index))
+            for subject, lessons in self.lessons.items()
+            for lesson, index in zip(lessons, positions.get(subject, []), strict=False)
+        ]
+
+    def base_assertions(self) -> list[z3.BoolRef]:
+        every_lesson = [lesson for lessons in self.lessons.values() for lesson in lessons]
+        assertions = [_conjunction([lesson >= 0, lesson < len(DAYS) * self.slots]) for lesson in every_lesson]
+        if len(every_lesson) > 1:
+            assertions.append(z3.Distinct(*every_lesson))
+        assertions.extend(self.symmetry_breaking())
+        return assertions
+
+    def symmetry_breaking(self) -> list[z3.BoolRef]:
+        """Order each subject's lesson instances by cell index."""
+        return [earlier < later for lessons in self.lessons.values() for earlier, later in itertools.pairwise(lessons)]
+
+
+ENCODINGS: dict[str, type[TimetableModel]] = {model.encoding: model for model in (OneHotModel, IntegerModel)}
+
+
+def limit_z3_memory(memory_mb: int) -> None:
+    """Solver worker initializer: cap Z3's heap at ``Z3_MEMORY_SHARE`` of the worker's limit."""
+    z3.set_param("memory_max_size", max(1, int(memory_mb * Z3_MEMORY_SHARE)))
+
+
+def _raise_if_out_of_memory(solver: z3.Solver) -> None:
+    """Report an ``unknown`` caused by Z3's memory ceiling as MemoryError, not as a timeout."""
+    if "memory" in solver.reason_unknown():
+        raise MemoryError(solver.reason_unknown())
+
+
+def _statistics(solver: z3.Solver) -> dict[str, float]:
+    stats = solver.statistics()
+    return dict(stats[i] for i in range(len(stats)))
+
+
+def _shape(solver_input: SolverInput) -> tuple:
+    """The parts of a timetable the base model depends on: its hours, subjects and teachers."""
+    return (solver_input.weekly_hours, tuple(solver_input.subjects), tuple(sorted(solver_input.teachers.items())))
+
+
+def _availability(solver_input: SolverInput) -> str:
+    """The input's availability constraints, canonically: the key of their ``reduced_domains``."""
+    return json.dumps(
+        sorted(
+            json.dumps(formal, sort_keys=True, ensure_ascii=False)
+            for formal in solver_input.constraints.values()
+            if formal.get("constraint_type") in AVAILABILITY_TYPES
+        )
+    )
+
+
+class IncrementalSolver:
+    """A timetable's base model kept warm across solves, with constraints toggled by assumptions.
+
+    Every constraint is asserted once as ``Implies(literal, encoding)`` and switched on by passing
+    its literal to ``check``. Approving or rejecting one constraint therefore re-checks the warm
+    solver — keeping learned clauses — instead of re-encoding the base model and every constraint.
+
+    Availability is toggled like any other constraint, so the shape covers only hours, subjects
+    and teachers. Its ``reduced_domains`` are applied per check through a domain literal:
+    assumed, it rules out every cell outside the domains of the current availability constraints.
+    """
+
+    def __init__(
+        self,
+        solver_input: SolverInput,
+        config: SolverConfig = DEFAULT_CONFIG,
+        encoding: str = DEFAULT_ENCODING,
+    ) -> None:
+        self.model = ENCODINGS[encoding](solver_input)
+        self.shape = _shape(solver_input)
+        self.config = config
+        self.solver = z3.SolverFor(config.logic) if config.logic else z3.Solver()
+        for key, value in config.params:
+            self.solver.set(key, value)
+        self.solver.add(self.model.base_assertions())
+        self._tracked: dict[str, tuple[dict, z3.BoolRef]] = {}
+        self._literal_count = 0
+        self._assumed: dict[str, z3.BoolRef] = {}
+        self._domains: dict[str, z3.BoolRef | None] = {}
+        self._domain: list[z3.BoolRef] = []  # the domain literal assumed by the last check, if any
+        self._keep: dict[tuple[str, int, int], z3.BoolRef] = {}
+        self._idle: list[z3.BoolRef] | None = None
+
+    def matches(self, solver_input: SolverInput) -> bool:
+        """True if the base model can be reused for this input."""
+        return _shape(solver_input) == self.shape
+
+    @property
+    def reduced(self) -> bool:
+        """True if the last check assumed a domain literal, which no unsat core names."""
+        return bool(self._domain)
+
+    def literals(self, constraints: dict[str, dict]) -> dict[str, z3.BoolRef]:
+        """Return the assumption literal of each constraint, encoding only new or edited ones."""
+        literals: dict[str, z3.BoolRef] = {}
+        for constraint_id, formal in constraints.items():
+            tracked = self._tracked.get(constraint_id)
+            if tracked is None or tracked[0] != formal:
+                if tracked is not None:
+                    # Retire the stale encoding for good so Z3 can simplify it away.
+                    self.solver.add(z3.Not(tracked[1]))
+                literal = z3.Bool(f"c_{constraint_id}_{self._literal_count}")
+                self._literal_count += 1
+                self.solver.add(z3.Implies(literal, self.model.encode(formal)))
+                tracked = (formal, literal)
+                self._tracked[constraint_id] = tracked
+            literals[constraint_id] = tracked[1]
+        return literals
+
+    def _assume(self, solver_input: SolverInput, reduce: bool) -> list[z3.BoolRef]:
+        """Switch to the constraints of ``solver_input``; return the literals every check assumes."""
+        self.model.input = solver_input
+        self._assumed = self.literals(solver_input.constraints)
+        self._domain = []
+        if reduce:
+            key = _availability(solver_input)
+            if key not in self._domains:
+                self._domains[key] = self._domain_literal()
+            literal = self._domains[key]
+            self._domain = [literal] if literal is not None else []
+        return [*self._assumed.values(), *self._domain]
+
+    def _domain_literal(self) -> z3.BoolRef | None:
+        """A literal confining each subject to its ``reduced_domains``; None if one is wiped out.
+
+        A wiped-out domain is left to the constraint literals, so Z3 proves it unsat with a core.
+        """
+        domains = self.model.reduced_domains()
+        if domains is None:
+            return None
+        literal = z3.Bool(f"d_{self.model.prefix}_{len(self._domains)}")
+        self.solver.add(z3.Implies(literal, self.model.confine(domains)))
+        return literal
+
+    def check(
+        self,
+        solver_input: SolverInput,
+        timeout_seconds: float,
+        hint: Grid | None = None,
+        reduce: bool = True,
+    ) -> z3.CheckSatResult:
+        """Check the base model under exactly the constraints of ``solver_input``.
+
+        ``hint`` is a known grid, normally the previous revision's, that the answer should stay
+        close to. It never changes satisfiability: see ``_check_keeping``. With ``reduce`` the
+        domain literal is assumed too; without it an unsat core can name availability constraints.
+        """
+        assumptions = self._assume(solver_input, reduce)
+        deadline = time.monotonic() + timeout_seconds
+        if hint:
+            for var, value in self.model.hint(hint):
+                self.solver.set_initial_value(var, value)
+            outcome = self._check_keeping(hint, assumptions, deadline)
+            if outcome is not None:
+                return outcome
+        self.solver.set("timeout", max(1, int((deadline - time.monotonic()) * 1000)))
+        return self.solver.check(*assumptions)
+
+    def _check_keeping(self, hint: Grid, assumptions: list[z3.BoolRef], deadline: float) -> z3.CheckSatResult | None:
+        """Check while keeping as many of the hint's lessons in place as possible.
+
+        Each hinted lesson is an extra "keep" assumption. Keeps named in an unsat core are
+        dropped and the check repeated, so the cells touched by a constraint change move and
+        the rest of the week stays put. Returns ``None`` when the constraints alone are unsat
+        or the search did not settle, leaving the caller to check without keeps.
+        """
+        keeps = {str(literal): literal for literal in self._keeps(hint)}
+        while keeps:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            self.solver.set("timeout", max(1, int(remaining * 1000)))
+            outcome = self.solver.check(*assumptions, *keeps.values())
+            if outcome != z3.unsat:
+                return outcome if outcome == z3.sat else None
+            dropped = [str(lit) for lit in self.solver.unsat_core() if str(lit) in keeps]
+            if not dropped:
+                return None
+            for name in dropped:
+                del keeps[name]
+        return None
+
+    def check_window(
+        self,
+        solver_input: SolverInput,
+        grid: Grid,
+        window: list[tuple[int, int]],
+        timeout_seconds: float,
+    ) -> z3.CheckSatResult:
+        """Check with every lesson of ``grid`` outside ``window`` (``(day, slot)`` cells) kept in place.
+
+        Lessons inside the window may move anywhere not held by a kept lesson; ``unsat`` only
+        means the window is too small.
+        """
+        assumptions = self._assume(solver_input, reduce=True)
+        for var, value in self.model.hint(grid):
+            self.solver.set_initial_value(var, value)
+        keeps = self._keeps(grid, frozenset(window))
+        self.solver.set("timeout", max(1, int(timeout_seconds * 1000)))
+        return self.solver.check(*assumptions, *keeps)
+
+    def _keeps(self, grid: Grid, free: frozenset[tuple[int, int]] = frozenset()) -> list[z3.BoolRef]:
+        """Literals that, when assumed, keep each lesson of ``grid`` outside ``free`` in its cell."""
+        literals: list[z3.BoolRef] = []
+        for (day, slot), subject in grid_cells(grid).items():
+            key = (subject, day, slot)
+            if key not in self.model.cells or (day, slot) in free:
+                continue
+            if key not in self._keep:
+                literal = z3.Bool(f"k_{self.model.prefix}_{len(self._keep)}")
+                self.solver.add(z3.Implies(literal, self.model.cells[key]))
+                self._keep[key] = literal
+            literals.append(self._keep[key])
+        return literals
+
+    def unsat_core(self, budget_seconds: float) -> list[str]:
+        """Constraint ids responsible for the last ``unsat`` check; see ``_minimal_core``."""
+        return _minimal_core(self.solver, self._assumed, budget_seconds)
+
+    def idle_terms(self) -> list[z3.BoolRef]:
+        """The model's idle-hour Booleans, their definitions asserted on first use.
+
+        The definitions only name facts about the grid and never restrict it, so they stay
+        asserted for the life of the context.
+        """
+        if self._idle is None:
+            definitions, self._idle = self.model.idle_hours()
+            self.solver.add(definitions)
+        return self._idle
+
+    def minimize(
+        self,
+        penalties: list[z3.BoolRef],
+        deadline: float,
+        on_improved: Callable[[Grid, int], None],
+    ) -> tuple[Grid, int, bool]:
+        """Lower the number of true ``penalties`` below the last ``sat`` model's until the deadline.
+
+        Anytime linear search: each round asks for a grid strictly cheaper than the best so
+        far, through a fresh bound literal assumed alongside the constraints, and reports
+        every improvement to ``on_improved``. Returns the best grid, its cost, and whether
+        it was proven optimal.
+        """
+        model = self.solver.model()
+        best, cost = self.model.grid(model), self._cost(model, penalties)
+        on_improved(best, cost)
+        optimal = cost == 0
+        bounds: list[z3.BoolRef] = []
+        while not optimal:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            bound = z3.Bool(f"b_{self.model.prefix}_{self._literal_count}")
+            self._literal_count += 1
+            bounds.append(bound)
+            self.solver.add(z3.Implies(bound, z3.AtMost(*penalties, cost - 1)))
+            self.solver.set("timeout", max(1, int(remaining * 1000)))
+            outcome = self.solver.check(*self._assumed.values(), *self._domain, bound)
+            if outcome == z3.sat:
+                model = self.solver.model()
+                best, cost = self.model.grid(model), self._cost(model, penalties)
+                on_improved(best, cost)
+                optimal = cost == 0
+            else:
+                optimal = outcome == z3.unsat
+                break
+        # Bounds only make sense for this search; retire them so the warm context stays clean.
+        self.solver.add([z3.Not(bound) for bound in bounds])
+        return best, cost, optimal
+
+    def alternatives(
+        self,
+        solver_input: SolverInput,
+        count: int,
+        min_distance: int,
+        deadline: float,
+        on_found: Callable[[int, CompactGrid], None],
+    ) -> tuple[list[CompactGrid], bool]:
+        """Enumerate up to ``count`` grids, each ``min_distance`` lessons away from every earlier one.
+
+        After each model a blocking literal is added: assumed, it allows at most all but
+        ``min_distance`` of that grid's lessons to stay in their cells. Every check runs on the
+        same warm solver, so clauses learned finding one grid speed up the next. Returns the
+        grids and whether the enumeration is exhausted (no further grid exists).
+        """
+        assumptions = self._assume(solver_input, reduce=True)
+        found: list[CompactGrid] = []
+        blocks: list[z3.BoolRef] = []
+        exhausted = False
+        while len(found) < count:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self.solver.set("timeout", max(1, int(remaining * 1000)))
+            outcome = self.solver.check(*assumptions, *blocks)
+            if outcome != z3.sat:
+                exhausted = outcome == z3.unsat
+                break
+            grid = self.model.compact_grid(self.solver.model())
+            found.append(grid)
+            on_found(len(found) - 1, grid)
+            kept = [self.model.cells[(subject, day, slot)] for (day, slot), subject in grid.subjects().items()]
+            if len(kept) < min_distance:
+                exhausted = True  # too few lessons to move: every other grid is too close
+                break
+            block = z3.Bool(f"a_{self.model.prefix}_{self._literal_count}")
+            self._literal_count += 1
+            self.solver.add(z3.Implies(block, z3.AtMost(*kept, len(kept) - min_distance)))
+            blocks.append(block)
+        # Blocking clauses only make sense for this enumeration; retire them like ``minimize`` bounds.
+        self.solver.add([z3.Not(block) for block in blocks])
+        return found, exhausted
+
+    @staticmethod
+    def _cost(model: z3.ModelRef, penalties: list[z3.BoolRef]) -> int:
+        return sum(1 for term in penalties if z3.is_true(model.eval(term, model_completion=True)))
+
+
+_contexts: OrderedDict[str, IncrementalSolver] = OrderedDict()
+
+
+def _context_key(timetable_id: str, config: SolverConfig, encoding: str) -> str:
+    return f"{timetable_id}:{config.name}:{encoding}"
+
+
+def context_for(
+    solver_input: SolverInput,
+    config: SolverConfig = DEFAULT_CONFIG,
+    encoding: str = DEFAULT_ENCODING,
+) -> IncrementalSolver:
+    """Return this worker's warm context for the timetable, rebuilding it if the shape changed."""
+    key = _context_key(solver_input.timetable_id, config, encoding)
+    context = _contexts.pop(key, None)
+    if context is None or not context.matches(solver_input):
+        context = IncrementalSolver(solver_input, config, encoding)
+    _contexts[key] = context
+    while len(_contexts) > CONTEXT_CACHE_SIZE:
+        _contexts.popitem(last=False)
+    return context
+
+
+def _dump(job: SolveJob, context: IncrementalSolver) -> None:
+    """Write the job's first check to ``job.dump``: base model, constraints and domain literal as assumptions.
+
+    An instance already dumped is not encoded again, so repeated solves pay nothing for dumps.
+    """
+    assert job.dump is not None
+    if job.dump.exists():
+        return
+    context.model.input = job.input
+    assertions = context.model.base_assertions()
+    assumptions: list[z3.BoolRef] = []
+    for position, formal in enumerate(job.input.constraints.values()):
+        literal = z3.Bool(f"c_{position}")
+        assertions.append(z3.Implies(literal, context.model.encode(formal)))
+        assumptions.append(literal)
+    domains = context.model.reduced_domains()
+    if domains is not None:
+        literal = z3.Bool("domains")
+        assertions.append(z3.Implies(literal, context.model.confine(domains)))
+        assumptions.append(literal)
+    header = {
+        "key": job.dump.stem,
+        "timetable_id": job.input.timetable_id,
+        "encoding": job.encoding,
+        "config": job.config.name,
+        "logic": job.config.logic,
+        "params": list(job.config.params),
+        "timeout_seconds": job.timeout_seconds,
+        "constraints": len(job.input.constraints),
+    }
+    # A dump is a debugging aid: a full or read-only disk must not fail the solve.
+    with contextlib.suppress(OSError):
+        write_dump(job.dump, assertions, header, assumptions)
+
+
+def run_solve_job(job: SolveJob, emit: Callable[[Any], None]) -> SolveResult:
+    """Solve a timetable on the worker's warm context. Runs inside a solver worker process.
+
+    With ``teacher_preferred`` constraints, or ``idle_hours``, the first grid is refined until
+    the timeout, and each improvement is emitted as a ``SolveEvent`` so callers can show it
+    right away.
+    """
+    started = time.monotonic()
+    deadline = started + job.timeout_seconds
+    emit(SolveEvent("encoding"))
+    context = context_for(job.input, job.config, job.encoding)
+    if not context.model.fits:
+        emit(SolveEvent("conflicts", elapsed_seconds=time.monotonic() - started))
+        return SolveResult(status="unsat", elapsed_seconds=time.monotonic() - started, config=job.config.name)
+    if job.dump is not None:
+        _dump(job, context)
+    # Asserted before the first check: adding assertions afterwards would discard its model.
+    idle = context.idle_terms() if job.optimize and job.idle_hours else []
+    emit(SolveEvent("solving", elapsed_seconds=time.monotonic() - started))
+    outcome = context.check(job.input, max(1.0, deadline - time.monotonic()), job.hint)
+    result = SolveResult(
+        status="timeout",
+        elapsed_seconds=time.monotonic() - started,
+        statistics=_statistics(context.solver),
+        config=job.config.name,
+    )
+    if outcome == z3.sat:
+        result.status = "sat"
+        penalties = [*context.model.penalties(), *idle] if job.optimize else []
+        if penalties:
+
+            def on_improved(grid: Grid, cost: int) -> None:
+                emit(
+                    SolveEvent(
+                        "improved",
+                        grid=grid,
+                        cost=cost,
+                        idle_hours=context.model.count_idle_hours(grid) if idle else None,
+                        elapsed_seconds=time.monotonic() - started,
+                        statistics=_statistics(context.solver),
+                    )
+                )
+
+            result.grid, result.cost, result.optimal = context.minimize(penalties, deadline, on_improved)
+            result.statistics = _statistics(context.solver)
+            result.elapsed_seconds = time.monotonic() - started
+        else:
+            result.grid = context.model.grid(context.solver.model())
+    elif outcome == z3.unsat:
+        result.status = "unsat"
+        if context.reduced:
+            # Availability folded into the domain literal never shows up in a core: check the
+            # same context again without it.
+            outcome = context.check(job.input, max(1.0, deadline - time.monotonic()), reduce=False)
+        result.core_extracted = outcome == z3.unsat
+        result.conflicting_constraint_ids = context.unsat_core(job.core_budget_seconds) if result.core_extracted else []
+        result.elapsed_seconds = time.monotonic() - started
+        emit(
+            SolveEvent(
+                "conflicts",
+                elapsed_seconds=result.elapsed_seconds,
+                statistics=result.statistics,
+                conflicting_constraint_ids=result.conflicting_constraint_ids,
+            )
+        )
+    else:
+        _raise_if_out_of_memory(context.solver)
+    return result
+
+
+@dataclass
+class RepairJob:
+    """Re-solve of a few windows of an existing grid; all other lessons stay put."""
+
+    input: SolverInput
+    grid: Grid
+    windows: list[list[tuple[int, int]]]  # smallest first
+    timeout_seconds: float
+    encoding: str = DEFAULT_ENCODING
+
+
+def run_repair_job(job: RepairJob, emit: Callable[[Any], None]) -> SolveResult:
+    """Try each window in turn on the worker's warm context. Runs inside a solver worker process.
+
+    Returns ``sat`` with the repaired grid, or ``timeout`` when no window worked in time.
+    """
+    started = time.monotonic()
+    deadline = started + job.timeout_seconds
+    context = context_for(job.input, DEFAULT_CONFIG, job.encoding)
+    result = SolveResult(status="timeout", config="repair")
+    for window in job.windows:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not context.model.fits:
+            break
+        if context.check_window(job.input, job.grid, window, remaining) == z3.sat:
+            result.status = "sat"
+            result.grid = context.model.grid(context.solver.model())
+            break
+    result.elapsed_seconds = time.monotonic() - started
+    result.statistics = _statistics(context.solver)
+    return result
+
+
+@dataclass
+class FeasibilityJob:
+    """A quick satisfiability check of one timetable, without optimizing or building a grid."""
+
+    input: SolverInput
+    timeout_seconds: float
+    core_budget_seconds: float = 0.0
+    encoding: str = DEFAULT_ENCODING
+
+
+def run_feasibility_job(job: FeasibilityJob, emit: Callable[[Any], None]) -> SolveResult:
+    """Check whether any grid satisfies the input; if none does, name the conflict. Runs in a worker.
+
+    The check does not assume the domain literal, so cores can name availability constraints.
+    """
+    started = time.monotonic()
+    context = context_for(job.input, DEFAULT_CONFIG, job.encoding)
+    result = SolveResult(status="unsat" if not context.model.fits else "timeout")
+    if context.model.fits:
+        outcome = context.check(job.input, job.timeout_seconds, reduce=False)
+        if outcome == z3.sat:
+            result.status = "sat"
+        elif outcome == z3.unsat:
+            result.status = "unsat"
+            result.conflicting_constraint_ids = context.unsat_core(job.core_budget_seconds)
+    result.elapsed_seconds = time.monotonic() - started
+    result.statistics = _statistics(context.solver)
+    return result
+
+
+@dataclass
+class AlternativesJob:
+    """Enumeration of several distinct grids of one timetable on a warm context."""
+
+    input: SolverInput
+    count: int
+    timeout_seconds: float
+    min_distance: int = ALTERNATIVE_MIN_DISTANCE
+    config: SolverConfig = DEFAULT_CONFIG
+    encoding: str = DEFAULT_ENCODING
+
+
+@dataclass
+class AlternativesResult:
+    """Outcome of an alternatives job."""
+
+    status: str  # "sat" with at least one grid, "unsat" or "timeout"
+    grids: list[Grid] = field(default_factory=list)
+    exhausted: bool = False  # True when no further alternative exists
+    elapsed_seconds: float = 0.0
+    statistics: dict[str, float] = field(default_factory=dict)
+
+
+def run_alternatives_job(job: AlternativesJob, emit: Callable[[Any], None]) -> AlternativesResult:
+    """Enumerate alternative grids, emitting each as an ``alternative`` event. Runs in a worker."""
+    started = time.monotonic()
+    emit(SolveEvent("encoding"))
+    context = context_for(job.input, job.config, job.encoding)
+    if not context.model.fits:
+        return AlternativesResult(status="unsat", exhausted=True, elapsed_seconds=time.monotonic() - started)
+    emit(SolveEvent("solving", elapsed_seconds=time.monotonic() - started))
+
+    def on_found(index: int, grid: CompactGrid) -> None:
+        emit(
+            SolveEvent(
+                "alternative",
+                grid=grid.to_grid(),
+                index=index,
+                elapsed_seconds=time.monotonic() - started,
+                statistics=_statistics(context.solver),
+            )
+        )
+
+    grids, exhausted = context.alternatives(
+        job.input, job.count, job.min_distance, started + job.timeout_seconds, on_found
+    )
+    if not grids and not exhausted:
+        _raise_if_out_of_memory(context.solver)
+    return AlternativesResult(
+        status="sat" if grids else "unsat" if exhausted else "timeout",
+        grids=[grid.to_grid() for grid in grids],
+        exhausted=exhausted,
+        elapsed_seconds=time.monotonic() - started,
+        statistics=_statistics(context.solver),
+    )
+
+
+# Winning portfolio configuration per timetable, remembered by this web process.
+_winning_configs: OrderedDict[str, str] = OrderedDict()
+_WINNING_CONFIGS_SIZE = 1024
+
+
+def portfolio_for(timetable_id: str) -> list[SolverConfig]:
+    """Portfolio order for a timetable: its last winning configuration first."""
+    winner = _winning_configs.get(timetable_id)
+    return sorted(PORTFOLIO, key=lambda config: config.name != winner)
+
+
+def _remember_winner(timetable_id: str, config_name: str) -> None:
+    _winning_configs.pop(timetable_id, None)
+    _winning_configs[timetable_id] = config_name
+    while len(_winning_configs) > _WINNING_CONFIGS_SIZE:
+        _winning_configs.popitem(last=False)
+
+
+@dataclass
+class SchoolJob:
+    """Classes linked by shared teachers, solved together as one model."""
+
+    inputs: list[SolverInput]
+    timeout_seconds: float
+    core_budget_seconds: float = 0.0
+    encoding: str = DEFAULT_ENCODING
+
+
+@dataclass
+class SchoolResult:
+    """Outcome of a school-wide solve, or of one of its components."""
+
+    status: str  # "sat", "unsat" or "timeout"
+    grids: dict[str, Grid] = field(default_factory=dict)  # timetable id -> grid
+    elapsed_seconds: float = 0.0
+    statistics: dict[str, float] = field(default_factory=dict)
+    conflicting_constraint_ids: list[str] = field(default_factory=list)
+    components: list[list[str]] = field(default_factory=list)  # timetable ids solved together
+
+
+def teacher_components(inputs: list[SolverInput]) -> list[list[SolverInput]]:
+    """Group classes into connected components of the "shares a teacher" relation.
+
+    Classes in different components cannot clash, so each component is an independent
+    problem. Order follows the first class of each component in ``inputs``.
+    """
+    parent = list(range(len(inputs)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    first_class: dict[str, int] = {}
+    for index, solver_input in enumerate(inputs):
+        for teacher in {normalize_name(t) for t in solver_input.teachers.values()} - {""}:
+            if teacher in first_class:
+                parent[find(index)] = find(first_class[teacher])
+            else:
+                first_class[teacher] = index
+    components: dict[int, list[SolverInput]] = {}
+    for index, solver_input in enumerate(inputs):
+        components.setdefault(find(index), []).append(solver_input)
+    return list(components.values())
+
+
+def run_school_job(job: SchoolJob, emit: Callable[[Any], None]) -> SchoolResult:
+    """Solve a component of classes with no teacher in two classes at once. Runs in a worker.
+
+    A ``teacher_unavailable`` constraint describes the teacher, not the class it was entered
+    on, so it applies to every class of the component. ``teacher_preferred`` is not optimized
+    at school level. An unsat core is minimized within the job's ``core_budget_seconds``,
+    as for single-timetable solves.
+    """
+    started = time.monotonic()
+    models = [ENCODINGS[job.encoding](solver_input) for solver_input in job.inputs]
+    if not all(model.fits for model in models):
+        return SchoolResult(status="unsat", elapsed_seconds=time.monotonic() - started)
+    solver = z3.Solver()
+    for model in models:
+        solver.add(model.base_assertions())
+    literals: dict[str, z3.BoolRef] = {}
+    for model in models:
+        for constraint_id, formal in model.input.constraints.items():
+            scope = models if formal.get("constraint_type") == "teacher_unavailable" else [model]
+            literal = z3.Bool(f"c_{constraint_id}")
+            solver.add(z3.Implies(literal, _conjunction([m.encode(formal) for m in scope])))
+            literals[constraint_id] = literal
+    teachers = {normalize_name(t) for model in models for t in model.input.teachers.values()} - {""}
+    for teacher in sorted(teachers):
+        for day in range(len(DAYS)):
+            for slot in range(1, MAX_SLOTS_PER_DAY + 1):
+                busy = [b for b in (m.teacher_busy(teacher, day, slot) for m in models) if b is not None]
+                if len(busy) > 1:
+                    solver.add(z3.AtMost(*busy, 1))
+    solver.set("timeout", max(1, int(job.timeout_seconds * 1000)))
+    outcome = solver.check(*literals.values())
+    result = SchoolResult(
+        status="timeout",
+        elapsed_seconds=time.monotonic() - started,
+        statistics=_statistics(solver),
+    )
+    if outcome == z3.sat:
+        result.status = "sat"
+        result.grids = {model.input.timetable_id: model.grid(solver.model()) for model in models}
+    elif outcome == z3.unsat:
+        result.status = "unsat"
+        result.conflicting_constraint_ids = _minimal_core(solver, literals, job.core_budget_seconds)
+    else:
+        _raise_if_out_of_memory(solver)
+    return result
+
+
+def _core_warning(constraint_ids: list[str], constraints: list[Constraint]) -> ConflictWarning:
+    """An Italian warning naming the constraints of an unsat core."""
+    by_id = {str(c.id): c for c in constraints}
+    core = [by_id[cid] for cid in constraint_ids if cid in by_id]
+    return ConflictWarning(
+        conflict_type="unsat_core",
+        message=MESSAGES["conflict_unsat_core"].format(count=len(core)),
+        constraint_descriptions=[
+            (c.formal_representation or {}).get("description") or c.natural_language_text for c in core
+        ],
+    )
+
+
+class SolverService:
+    """Builds solve jobs from persisted timetables and runs them in the solver pool.
+
+    With a ``scheduler`` every job waits for its turn there first: single-timetable solves are
+    ``INTERACTIVE``, school-wide solves ``BATCH``, and jobs are capped per ``owner``; a portfolio
+    race is admitted as one job holding a worker per configuration. With a
+    ``dump_dir`` every single-timetable solve is dumped there as SMT-LIB2, named by fingerprint.
+    With ``idle_hours`` single-timetable solves also minimize teachers' idle hours, spending
+    the whole timeout unless the optimum is proven earlier.
+    """
+
+    def __init__(
+        self,
+        constraint_repo: ConstraintRepository,
+        solver_pool: SolverPool,
+        timeout_seconds: float,
+        core_budget_seconds: float = 0.0,
+        portfolio_size: int = 1,
+        encoding: str = DEFAULT_ENCODING,
+        revision_repo: RevisionRepository | None = None,
+        timetable_repo: TimetableRepository | None = None,
+        cache_repo: SolverCacheRepository | None = None,
+        cache_size: int = 1000,
+        scheduler: SolverScheduler | None = None,
+        dump_dir: Path | None = None,
+        idle_hours: bool = False,
+    ) -> None:
+        self.constraint_repo = constraint_repo
+        self.revision_repo = revision_repo
+        self.timetable_repo = timetable_repo
+        self.cache_repo = cache_repo
+        self.cache_size = cache_size
+        self.solver_pool = solver_pool
+        self.scheduler = scheduler
+        self.timeout_seconds = timeout_seconds
+        self.core_budget_seconds = core_budget_seconds
+        self.portfolio_size = max(1, min(portfolio_size, len(PORTFOLIO)))
+        self.encoding = encoding if encoding in ENCODINGS else DEFAULT_ENCODING
+        self.dump_dir = dump_dir
+        self.idle_hours = idle_hours
+
+    async def solve_timetable(self, timetable: Timetable) -> SolveResult:
+        """Solve a timetable against its verified constraints within the NFR-1 ceiling.
+
+        When the timetable already has a revision, its grid warm-starts the search.
+        """
+        constraints = await self.constraint_repo.get_by_timetable(timetable.id)
+        previous = await self.revision_repo.get_latest(timetable.id) if self.revision_repo else None
+        return await self.solve_input(
+            build_solver_input(timetable, constraints),
+            hint=previous.grid_data if previous else None,
+            owner=str(timetable.owner_id),
+        )
+
+    async def generate_revision(
+        self,
+        timetable: Timetable,
+        on_event: Callable[[SolveEvent], None] | None = None,
+    ) -> tuple[SolveResult, Revision | None]:
+        """Solve a timetable and, when satisfiable, store the grid as its next revision.
+
+        When a changed hard constraint breaks the previous revision's grid, only that grid is
+        repaired around the changes; see ``repair_input``. Otherwise, soft-only edits included,
+        the timetable is solved again warm-started from that grid, so preferences and idle hours
+        are optimized against the current constraints.
+        """
+        assert self.revision_repo is not None
+        constraints = await self.constraint_repo.get_by_timetable(timetable.id)
+        solver_input = build_solver_input(timetable, constraints)
+        previous = await self.revision_repo.get_latest(timetable.id)
+        owner = str(timetable.owner_id)
+        if previous is not None and RepairBuilder(solver_input).violated(previous.grid_data):
+            changed = changed_constraints(previous.constraints_snapshot, solver_input.constraints)
+            result = await self.repair_input(solver_input, previous.grid_data, changed, on_event=on_event, owner=owner)
+        else:
+            hint = previous.grid_data if previous is not None else None
+            result = await self.solve_input(solver_input, hint=hint, on_event=on_event, owner=owner)
+        if result.status != "sat" or result.grid is None:
+            return result, None
+        return result, await self._add_revision(timetable, result.grid, solver_input)
+
+    async def generate_alternatives(
+        self,
+        timetable: Timetable,
+        count: int,
+        on_event: Callable[[SolveEvent], None] | None = None,
+    ) -> AlternativesResult:
+        """Find up to ``count`` clearly different grids for the timetable, for the coordinator to pick from."""
+        constraints = await self.constraint_repo.get_by_timetable(timetable.id)
+        return await self.alternatives_input(
+            build_solver_input(timetable, constraints), count, on_event=on_event, owner=str(timetable.owner_id)
+        )
+
+    async def adopt_grid(self, timetable: Timetable, grid: Grid) -> Revision:
+        """Store a grid chosen among alternatives as the timetable's next revision."""
+        assert self.revision_repo is not None
+        constraints = await self.constraint_repo.get_by_timetable(timetable.id)
+        return await self._add_revision(timetable, grid, build_solver_input(timetable, constraints))
+
+    async def _add_revision(self, timetable: Timetable, grid: Grid, solver_input: SolverInput) -> Revision:
+        assert self.revision_repo is not None
+        revision = await self.revision_repo.add_next(
+            Revision(
+                timetable_id=timetable.id,
+                grid_data=grid,
+                constraints_snapshot=solver_input.constraints,
+            )
+        )
+        await _log.ainfo(
+            "revision_created",
+            timetable_id=str(timetable.id),
+            revision_number=revision.revision_number,
+        )
+        return revision
+
+    async def solve_input(
+        self,
+        solver_input: SolverInput,
+        hint: Grid | None = None,
+        on_event: Callable[[SolveEvent], None] | None = None,
+        owner: str | None = None,
+    ) -> SolveResult:
+        """Race ``portfolio_size`` configurations on separate workers; the first sat/unsat answer wins.
+
+        Losing jobs are cancelled, which kills their workers. The winner is remembered and
+        raced first on the next solve of the same timetable. ``hint`` is the previous
+        revision's grid: the search starts from it, so small constraint changes yield a
+        nearby timetable instead of a reshuffled week. Without one, a heuristic draft is built
+        in-process, streamed as a ``draft`` event and used as the hint instead; on easy
+        timetables Z3 just confirms it. ``on_event`` receives every strictly better grid found
+        by any racing configuration.
+
+        With a cache repository, unsat answers and proven-optimal grids are stored under the
+        input's fingerprint and an identical solve returns the stored answer without solving,
+        hinted or not. The fingerprint does not cover ``hint``: an unsat answer never depends
+        on it, but a grid found from a hint does, so hinted solves store only unsat answers.
+        """
+        if on_event is not None:
+            on_event(SolveEvent("queued"))
+        key = self._fingerprint(solver_input) if self.cache_repo else None
+        if key is not None:
+            cached = await self._cached(key, solver_input)
+            if cached is not None:
+                await _log.ainfo(
+                    "timetable_solved",
+                    timetable_id=solver_input.timetable_id,
+                    status=cached.status,
+                    config=cached.config,
+                    cache_hit=True,
+                )
+                return cached
+        previous = hint
+        if hint is None:
+            hint = draft_grid(solver_input)
+            if hint is not None and on_event is not None:
+                on_event(SolveEvent("draft", grid=hint))
+        configs = portfolio_for(solver_input.timetable_id)[: self.portfolio_size]
+        best_cost: int | None = None
+
+        def forward(event: SolveEvent) -> None:
+            nonlocal best_cost
+            if event.state == "improved":
+                if best_cost is not None and event.cost is not None and event.cost >= best_cost:
+                    return
+                best_cost = event.cost
+            if on_event is not None:
+                on_event(event)
+
+        result: SolveResult | None = None
+        failure: SolverJobError | None = None
+        # The racers are admitted together as one job of the owner, so the per-owner cap
+        # neither shrinks the portfolio nor lets one race take the owner's whole quota.
+        async with self._reserve(owner, INTERACTIVE, slots=len(configs)):
+            tasks = [asyncio.create_task(self._run(solver_input, config, hint, forward, owner)) for config in configs]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    try:
+                        candidate = await next_done
+                    except SolverJobError as exc:
+                        failure = exc
+                        continue
+                    if candidate.status in ("sat", "unsat"):
+                        result = candidate
+                        break
+                    result = result or candidate
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+        if result is None:
+            assert failure is not None
+            raise failure
+        if result.status in ("sat", "unsat"):
+            _remember_winner(solver_input.timetable_id, result.config)
+            if key is not None and _cacheable(result) and (previous is None or result.status == "unsat"):
+                await self._store(key, solver_input, result)
+        await _log.ainfo(
+            "timetable_solved",
+            timetable_id=solver_input.timetable_id,
+            status=result.status,
+            config=result.config,
+            portfolio_size=len(configs),
+            elapsed_seconds=round(result.elapsed_seconds, 3),
+            cost=result.cost,
+            optimal=result.optimal,
+            changed_cells=grid_distance(previous, result.grid) if previous and result.grid else None,
+            draft_changed_cells=grid_distance(hint, result.grid) if not previous and hint and result.grid else None,
+        )
+        return result
+
+    async def repair_input(
+        self,
+        solver_input: SolverInput,
+        grid: Grid,
+        changed: list[dict],
+        on_event: Callable[[SolveEvent], None] | None = None,
+        owner: str | None = None,
+    ) -> SolveResult:
+        """Adapt ``grid`` to a small constraint edit, moving as few lessons as possible.
+
+        First a swap-chain search in this process, then a Z3 re-solve confined to windows
+        around the ``changed`` constraints; both keep every other lesson in place. Only when
+        both fail is the whole timetable solved again, warm-started from ``grid``.
+        """
+        if on_event is not None:
+            on_event(SolveEvent("queued"))
+        started = time.monotonic()
+        builder = RepairBuilder(solver_input)
+        repaired, method = builder.repair(grid), "swap"
+        if repaired is None:
+            windows = builder.windows(grid, changed)
+            repaired, method = await self._repair_windows(solver_input, grid, windows, owner), "window"
+        if repaired is None:
+            await _log.ainfo("repair_failed", timetable_id=solver_input.timetable_id, changed=len(changed))
+            return await self.solve_input(solver_input, hint=grid, on_event=on_event, owner=owner)
+        result = SolveResult(
+            status="sat",
+            grid=repaired,
+            elapsed_seconds=time.monotonic() - started,
+            config="repair",
+            cost=builder.cost(repaired),
+        )
+        if on_event is not None:
+            on_event(SolveEvent("repaired", grid=repaired, cost=result.cost, elapsed_seconds=result.elapsed_seconds))
+        await _log.ainfo(
+            "timetable_repaired",
+            timetable_id=solver_input.timetable_id,
+            method=method,
+            changed=len(changed),
+            moved_cells=grid_distance(grid, repaired),
+            elapsed_seconds=round(result.elapsed_seconds, 3),
+        )
+        return result
+
+    async def check_approval(self, timetable: Timetable, constraint_id: uuid.UUID) -> ConflictWarning | None:
+        """Check a translated constraint against the verified ones before it is approved.
+
+        Returns a warning naming the constraints it clashes with when approving it would leave
+        no valid timetable. Returns None when it is feasible, when the check ran out of time,
+        or when the conflict lies among the verified constraints alone.
+        """
+        constraints = await self.constraint_repo.get_by_timetable(timetable.id)
+        candidate = next((c for c in constraints if c.id == constraint_id), None)
+        if (
+            candidate is None
+            or candidate.status != "translated"
+            or not isinstance(candidate.formal_representation, dict)
+        ):
+            return None
+        solver_input = build_solver_input(timetable, constraints)
+        solver_input.constraints[str(candidate.id)] = candidate.formal_representation
+        result = await self.feasibility_input(solver_input, owner=str(timetable.owner_id))
+        if result.status != "unsat" or str(candidate.id) not in result.conflicting_constraint_ids:
+            return None
+        by_id = {str(c.id): c for c in constraints}
+        others = [by_id[cid] for cid in result.conflicting_constraint_ids if cid != str(candidate.id)]
+        return ConflictWarning(
+            conflict_type="unsat_approval",
+            message=MESSAGES["constraint_conflicting" if others else "constraint_infeasible"],
+            constraint_descriptions=[
+                (c.formal_representation or {}).get("description") or c.natural_language_text for c in others
+            ],
+        )
+
+    async def feasibility_input(self, solver_input: SolverInput, owner: str | None = None) -> SolveResult:
+        """Check within ``FEASIBILITY_TIMEOUT_SECONDS`` whether the input has any valid grid.
+
+        The wait for a pool slot counts against the same budget: behind a long generation the
+        check gives up with ``timeout`` rather than holding the request. The check is advisory,
+        so a crashed or killed worker is logged and reported as ``timeout`` too.
+        """
+        job = FeasibilityJob(
+            input=solver_input,
+            timeout_seconds=FEASIBILITY_TIMEOUT_SECONDS,
+            core_budget_seconds=FEASIBILITY_CORE_BUDGET_SECONDS,
+            encoding=self.encoding,
+        )
+        budget = FEASIBILITY_TIMEOUT_SECONDS + FEASIBILITY_CORE_BUDGET_SECONDS + SOFT_TIMEOUT_MARGIN_SECONDS
+        started = time.monotonic()
+        try:
+            async with asyncio.timeout(budget):
+                result = await self._submit(
+                    run_feasibility_job,
+                    job,
+                    owner=owner,
+                    priority=INTERACTIVE,
+                    timeout=budget,
+                    affinity=_context_key(solver_input.timetable_id, DEFAULT_CONFIG, self.encoding),
+                )
+        except TimeoutError:
+            result = SolveResult(status="timeout", elapsed_seconds=time.monotonic() - started)
+        except SolverJobError as exc:
+            await _log.awarning(
+                "feasibility_check_failed", timetable_id=solver_input.timetable_id, error_key=exc.error_key
+            )
+            result = SolveResult(status="timeout", elapsed_seconds=time.monotonic() - started)
+        await _log.ainfo(
+            "feasibility_checked",
+            timetable_id=solver_input.timetable_id,
+            status=result.status,
+            conflicts=len(result.conflicting_constraint_ids),
+            elapsed_seconds=round(time.monotonic() - started, 3),
+        )
+        return result
+
+    async def alternatives_input(
+        self,
+        solver_input: SolverInput,
+        count: int,
+        min_distance: int = ALTERNATIVE_MIN_DISTANCE,
+        on_event: Callable[[SolveEvent], None] | None = None,
+        owner: str | None = None,
+    ) -> AlternativesResult:
+        """Enumerate up to ``count`` pairwise distinct grids on one warm worker context.
+
+        Each grid is streamed to ``on_event`` as an ``alternative`` event when found. If the
+        job is killed at the deadline, the grids streamed so far are still returned.
+        """
+        if on_event is not None:
+            on_event(SolveEvent("queued"))
+        config = portfolio_for(solver_input.timetable_id)[0]
+        job = AlternativesJob(
+            input=solver_input,
+            count=count,
+            min_distance=min_distance,
+            timeout_seconds=max(1.0, self.timeout_seconds - SOFT_TIMEOUT_MARGIN_SECONDS),
+            config=config,
+            encoding=self.encoding,
+        )
+        found: list[Grid] = []
+
+        def relay(event: SolveEvent) -> None:
+            if event.state == "alternative" and event.grid is not None:
+                found.append(event.grid)
+            if on_event is not None:
+                on_event(event)
+
+        started = time.monotonic()
+        try:
+            result = await self._submit(
+                run_alternatives_job,
+                job,
+                owner=owner,
+                priority=INTERACTIVE,
+                timeout=self.timeout_seconds,
+                on_event=relay,
+                affinity=_context_key(solver_input.timetable_id, config, self.encoding),
+            )
+        except SolverJobError as exc:
+            if exc.error_key != "solver_timeout":
+                raise
+            result = AlternativesResult(
+                status="sat" if found else "timeout", grids=found, elapsed_seconds=time.monotonic() - started
+            )
+        await _log.ainfo(
+            "alternatives_found",
+            timetable_id=solver_input.timetable_id,
+            status=result.status,
+            requested=count,
+            found=len(result.grids),
+            exhausted=result.exhausted,
+            elapsed_seconds=round(result.elapsed_seconds, 3),
+        )
+        return result
+
+    async def _repair_windows(
+        self, solver_input: SolverInput, grid: Grid, windows: list[list[tuple[int, int]]], owner: str | None
+    ) -> Grid | None:
+        if not windows:
+            return None
+        job = RepairJob(
+            input=solver_input,
+            grid=grid,
+            windows=windows,
+            timeout_seconds=REPAIR_TIMEOUT_SECONDS,
+            encoding=self.encoding,
+        )
+        try:
+            outcome = await self._submit(
+                run_repair_job,
+                job,
+                owner=owner,
+                priority=INTERACTIVE,
+                timeout=REPAIR_TIMEOUT_SECONDS + SOFT_TIMEOUT_MARGIN_SECONDS,
+                affinity=_context_key(solver_input.timetable_id, DEFAULT_CONFIG, self.encoding),
+            )
+        except SolverJobError:
+            return None
+        return outcome.grid if outcome.status == "sat" else None
+
+    def _fingerprint(self, solver_input: SolverInput) -> str:
+        return fingerprint(solver_input, self.encoding, self.timeout_seconds, self.idle_hours)
+
+    async def _cached(self, key: str, solver_input: SolverInput) -> SolveResult | None:
+        assert self.cache_repo is not None
+        entry = await self.cache_repo.get_by_fingerprint(key)
+        if entry is None:
+            return None
+        ids = [constraint_id for _, constraint_id in canonical_constraints(solver_input)]
+        return SolveResult(
+            status=entry.status,
+            grid=entry.grid_data,
+            conflicting_constraint_ids=[ids[position] for position in entry.core_positions if position < len(ids)],
+            config="cache",
+            cost=entry.cost,
+            optimal=entry.optimal,
+        )
+
+    async def _store(self, key: str, solver_input: SolverInput, result: SolveResult) -> None:
+        assert self.cache_repo is not None
+        positions = {constraint_id: i for i, (_, constraint_id) in enumerate(canonical_constraints(solver_input))}
+        await self.cache_repo.put(
+            SolverCacheEntry(
+                fingerprint=key,
+                status=result.status,
+                grid_data=result.grid,
+                core_positions=[positions[cid] for cid in result.conflicting_constraint_ids if cid in positions],
+                cost=result.cost,
+                optimal=result.optimal,
+            )
+        )
+        await self.cache_repo.evict(self.cache_size)
+
+    async def _run(
+        self,
+        solver_input: SolverInput,
+        config: SolverConfig,
+        hint: Grid | None = None,
+        on_event: Callable[[SolveEvent], None] | None = None,
+        owner: str | None = None,
+    ) -> SolveResult:
+        """Run one configuration, mapping a hard kill at the deadline to a ``timeout`` result.
+
+        The caller holds the scheduler reservation for ``owner``. The unsat-core budget is
+        carved out of the overall ceiling, not added to it. If the job was killed while
+        optimizing, the best grid it streamed is still returned.
+        """
+        best: SolveEvent | None = None
+
+        def relay(event: SolveEvent) -> None:
+            nonlocal best
+            if event.state == "improved":
+                best = event
+            if on_event is not None:
+                on_event(event)
+
+        job = SolveJob(
+            input=solver_input,
+            timeout_seconds=max(1.0, self.timeout_seconds - SOFT_TIMEOUT_MARGIN_SECONDS - self.core_budget_seconds),
+            core_budget_seconds=self.core_budget_seconds,
+            config=config,
+            encoding=self.encoding,
+            hint=hint,
+            idle_hours=self.idle_hours,
+        )
+        if self.dump_dir is not None:
+            job.dump = dump_path(self.dump_dir, self._fingerprint(solver_input))
+        started = time.monotonic()
+        try:
+            return await self._submit(
+                run_solve_job,
+                job,
+                owner=owner,
+                priority=INTERACTIVE,
+                timeout=self.timeout_seconds,
+                on_event=relay,
+                affinity=_context_key(solver_input.timetable_id, config, self.encoding),
+                reserved=True,
+            )
+        except SolverJobError as exc:
+            if exc.error_key != "solver_timeout":
+                raise
+            if best is not None:
+                return SolveResult(
+                    status="sat",
+                    grid=best.grid,
+                    elapsed_seconds=time.monotonic() - started,
+                    config=config.name,
+                    cost=best.cost,
+                )
+            return SolveResult(status="timeout", elapsed_seconds=time.monotonic() - started, config=config.name)
+
+    async def generate_school_revisions(self, owner_id: uuid.UUID) -> tuple[SchoolResult, dict[str, Revision]]:
+        """Solve every timetable of an owner together, as one school; see ``solve_school_inputs``.
+
+        When the school is satisfiable, each grid is stored as its timetable's next revision;
+        the revisions are returned by timetable id. Otherwise no timetable gets one.
+        """
+        assert self.timetable_repo is not None
+        timetables = await self.timetable_repo.get_by_owner(owner_id)
+        inputs = [
+            build_solver_input(timetable, await self.constraint_repo.get_by_timetable(timetable.id))
+            for timetable in timetables
+        ]
+        result = await self.solve_school_inputs(inputs, owner=str(owner_id))
+        revisions: dict[str, Revision] = {}
+        if result.status == "sat":
+            for timetable, solver_input in zip(timetables, inputs, strict=True):
+                grid = result.grids[solver_input.timetable_id]
+                revisions[solver_input.timetable_id] = await self._add_revision(timetable, grid, solver_input)
+        return result, revisions
+
+    async def solve_school_inputs(self, inputs: list[SolverInput], owner: str | None = None) -> SchoolResult:
+        """Solve several classes at once so that no shared teacher is booked twice in a slot.
+
+        Classes are split into components linked by shared teachers; components run in
+        parallel on the pool, each as one model. The school is ``unsat`` if any component is,
+        and ``timeout`` if any component ran out of time.
+        """
+        components = teacher_components(inputs)
+        started = time.monotonic()
+        tasks = [asyncio.create_task(self._run_component(component, owner)) for component in components]
+        try:
+            outcomes = await asyncio.gather(*tasks)
+        except BaseException:
+            # One component failed (e.g. solver_queue_full): the school cannot be solved, so
+            # stop the others instead of leaving them running or queued.
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        result = SchoolResult(
+            status="sat",
+            elapsed_seconds=time.monotonic() - started,
+            components=[[solver_input.timetable_id for solver_input in component] for component in components],
+        )
+        for outcome in outcomes:
+            result.grids.update(outcome.grids)
+            result.conflicting_constraint_ids.extend(outcome.conflicting_constraint_ids)
+            for name, value in outcome.statistics.items():  # peak over components
+                result.statistics[name] = max(value, result.statistics.get(name, value))
+        statuses = {outcome.status for outcome in outcomes}
+        if "unsat" in statuses:
+            result.status = "unsat"
+        elif "timeout" in statuses:
+            result.status = "timeout"
+        await _log.ainfo(
+            "school_solved",
+            status=result.status,
+            classes=len(inputs),
+            components=len(components),
+            largest_component=max((len(component) for component in components), default=0),
+            elapsed_seconds=round(result.elapsed_seconds, 3),
+        )
+        return result
+
+    async def _run_component(self, component: list[SolverInput], owner: str | None) -> SchoolResult:
+        job = SchoolJob(
+            inputs=component,
+            timeout_seconds=max(1.0, self.timeout_seconds - SOFT_TIMEOUT_MARGIN_SECONDS - self.core_budget_seconds),
+            core_budget_seconds=self.core_budget_seconds,
+            encoding=self.encoding,
+        )
+        started = time.monotonic()
+        try:
+            return await self._submit(run_school_job, job, owner=owner, priority=BATCH, timeout=self.timeout_seconds)
+        except SolverJobError as exc:
+            if exc.error_key != "solver_timeout":
+                raise
+            return SchoolResult(status="timeout", elapsed_seconds=time.monotonic() - started)
+
+    def _reserve(self, owner: str | None, priority: int, slots: int) -> contextlib.AbstractAsyncContextManager[None]:
+        """Hold ``slots`` workers in the scheduler when there is one; see ``SolverScheduler.reserve``."""
+        if self.scheduler is None:
+            return contextlib.nullcontext()
+        return self.scheduler.reserve(owner=owner, priority=priority, slots=slots)
+
+    async def _submit(
+        self,
+        fn: JobFunction,
+        job: Any,
+        *,
+        owner: str | None,
+        priority: int,
+        timeout: float,
+        on_event: Callable[[Any], None] | None = None,
+        affinity: str | None = None,
+        reserved: bool = False,
+    ) -> Any:
+        """Run a job through the scheduler when there is one, straight on the pool otherwise.
+
+        ``reserved`` jobs run under a ``_reserve`` their caller already holds, so go straight to the pool.
+        """
+        if self.scheduler is None or reserved:
+            return await self.solver_pool.run(fn, job, timeout=timeout, on_event=on_event, affinity=affinity)
+        return await self.scheduler.run(
+            fn, job, owner=owner, priority=priority, timeout=timeout, on_event=on_event, affinity=affinity
+        )
+
+    def explain_unsat(
+        self,
+        result: SolveResult,
+        timetable: Timetable,
+        constraints: list[Constraint],
+    ) -> ConflictWarning | None:
+        """Render an ``unsat`` result's core as an Italian conflict warning."""
+        if result.status != "unsat":
+            return None
+        if not result.core_extracted:
+            return ConflictWarning(
+                conflict_type="unsat_no_core",
+                message=MESSAGES["conflict_unsat_no_core"],
+                constraint_descriptions=[],
+            )
+        if not result.conflicting_constraint_ids:
+            return ConflictWarning(
+                conflict_type="unsat_base",
+                message=MESSAGES["conflict_unsat_base"].format(
+                    weekly_hours=timetable.weekly_hours,
+                    cells=len(DAYS) * slots_per_day(timetable.weekly_hours),
+                ),
+                constraint_descriptions=[],
+            )
+        return _core_warning(result.conflicting_constraint_ids, constraints)
+
+    def explain_school_unsat(self, result: SchoolResult, constraints: list[Constraint]) -> ConflictWarning | None:
+        """Render an ``unsat`` school's core, over the constraints of all its classes, as an Italian warning."""
+        if result.status != "unsat":
+            return None
+        if not result.conflicting_constraint_ids:
+            return ConflictWarning(
+                conflict_type="unsat_base",
+                message=MESSAGES["conflict_school_unsat_base"],
+                constraint_descriptions=[],
+            )
+        return _core_warning(result.conflicting_constraint_ids, constraints)
@@ -0,0 +1,302 @@
+"""Bounded pool of long-lived solver worker processes with hard per-job timeouts.
+
+Z3 holds the GIL in places and cannot be stopped from another thread, so every solve
+runs in a child process. A job that outlives its deadline is killed and its worker is
+replaced on the next acquire; the rest of the pool keeps serving requests. Optional
+address-space and CPU-time limits keep a runaway job from taking the whole node with it.
+"""
+
+import asyncio
+import contextlib
+import multiprocessing
+import resource
+import signal
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from multiprocessing.context import BaseContext
+from typing import Any
+
+import structlog
+
+from easyorario.exceptions import SolverJobError
+
+_log = structlog.get_logger()
+
+_SHUTDOWN_JOIN_SECONDS = 2.0
+
+type JobFunction = Callable[[Any, Callable[[Any], None]], Any]
+
+
+@dataclass(frozen=True)
+class WorkerLimits:
+    """Resource limits of each worker process; 0 leaves a resource unlimited."""
+
+    memory_mb: int = 0  # address space of the whole process (RLIMIT_AS)
+    cpu_seconds: int = 0  # CPU time of a single job (RLIMIT_CPU, re-armed before each job)
+
+
+def _limit_memory(limits: WorkerLimits) -> None:
+    if limits.memory_mb > 0:
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        resource.setrlimit(resource.RLIMIT_AS, (limits.memory_mb * 1024 * 1024, hard))
+
+
+def _limit_cpu(limits: WorkerLimits) -> None:
+    """Allow the next job ``cpu_seconds`` on top of what the process has used so far.
+
+    Only the soft limit moves, so it can be raised again for the next job; when it is hit
+    the kernel's SIGXCPU terminates the process.
+    """
+    if limits.cpu_seconds > 0:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        soft = int(usage.ru_utime + usage.ru_stime) + 1 + limits.cpu_seconds
+        resource.setrlimit(resource.RLIMIT_CPU, (soft if hard == resource.RLIM_INFINITY else min(soft, hard), hard))
+
+
+def _worker_main(conn: Connection, limits: WorkerLimits, initializer: Callable[[], None] | None) -> None:
+    """Worker process loop: run ``(fn, payload)`` jobs received over the pipe until told to stop.
+
+    ``fn`` is called as ``fn(payload, emit)``; ``emit`` streams intermediate events back to the
+    parent before the final result. A job raising MemoryError is reported as over its limits.
+    """
+
+    def emit(event: Any) -> None:
+        conn.send(("event", event))
+
+    _limit_memory(limits)
+    if initializer is not None:
+        initializer()
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+        fn, payload = message
+        _limit_cpu(limits)
+        try:
+            result = fn(payload, emit)
+        except MemoryError:
+            conn.send(("limit", "memory"))
+        except Exception as exc:  # any failure is reported to the parent
+            conn.send(("error", repr(exc)))
+        else:
+            conn.send(("result", result))
+
+
+def _mp_context(preload: list[str]) -> BaseContext:
+    """Prefer forkserver so workers start from a process that already imported Z3."""
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("forkserver")
+        ctx.set_forkserver_preload(preload)
+        return ctx
+    return multiprocessing.get_context("spawn")
+
+
+class _Worker:
+    """A worker process and the parent end of its pipe."""
+
+    def __init__(
+        self,
+        ctx: BaseContext,
+        limits: WorkerLimits,
+        initializer: Callable[[], None] | None = None,
+    ) -> None:
+        parent_conn, child_conn = ctx.Pipe()
+        self.conn = parent_conn
+        self.limits = limits
+        # Affinity keys of recent jobs, mirroring whatever warm state the process keeps per key.
+        self.keys: OrderedDict[str, None] = OrderedDict()
+        self.process = ctx.Process(  # type: ignore[attr-defined]
+            target=_worker_main, args=(child_conn, limits, initializer), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    @property
+    def alive(self) -> bool:
+        return self.process.is_alive() and not self.conn.closed
+
+    def exceeded(self) -> str | None:
+        """The limit (``"cpu"`` or ``"memory"``) that terminated the process, if any."""
+        if self.process.exitcode == -signal.SIGXCPU:
+            return "cpu"
+        # Z3 aborts the whole process when an allocation fails or memory_max_size is hit.
+        if self.process.exitcode == -signal.SIGABRT and self.limits.memory_mb > 0:
+            return "memory"
+        return None
+
+    def kill(self) -> None:
+        """Hard-kill the process; safe to call more than once."""
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self) -> None:
+        """Ask the process to exit, killing it if it does not comply in time."""
+        if self.alive:
+            with contextlib.suppress(OSError):
+                self.conn.send(None)
+            self.process.join(_SHUTDOWN_JOIN_SECONDS)
+        self.kill()
+
+
+class SolverPool:
+    """Runs picklable job functions on at most ``workers`` concurrent child processes.
+
+    Workers are spawned lazily and reused across jobs. Each job gets a hard deadline:
+    when it expires the worker is killed and ``SolverJobError("solver_timeout")`` is raised.
+    Jobs sharing an ``affinity`` key are routed to the idle worker that last ran that key,
+    so per-key state cached inside the process (e.g. a warm Z3 context) is reused.
+
+    A job that exceeds the workers' ``limits`` raises ``SolverJobError("solver_resource_limit")``
+    and, if the limit terminated it, its worker is replaced. ``initializer`` runs once in every
+    new worker, e.g. to set a library's own memory ceiling below ``limits.memory_mb``.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        preload: list[str] | None = None,
+        affinity_size: int = 16,
+        limits: WorkerLimits | None = None,
+        initializer: Callable[[], None] | None = None,
+    ) -> None:
+        self.max_workers = max(1, workers)
+        self.affinity_size = affinity_size
+        self.limits = limits or WorkerLimits()
+        self.initializer = initializer
+        self._ctx = _mp_context(preload or [])
+        self._idle: list[_Worker] = []
+        self._busy: set[_Worker] = set()
+        self._starting = 0
+        self._cond: asyncio.Condition | None = None
+
+    @property
+    def size(self) -> int:
+        """Number of live or starting worker processes."""
+        return len(self._idle) + len(self._busy) + self._starting
+
+    async def run(
+        self,
+        fn: JobFunction,
+        payload: Any,
+        *,
+        timeout: float,
+        on_event: Callable[[Any], None] | None = None,
+        affinity: str | None = None,
+    ) -> Any:
+        """Run ``fn(payload, emit)`` in a worker and return its result.
+
+        Raises SolverJobError on timeout, resource limits or worker failure. Cancelling the awaiting task
+        kills the worker, so the pool slot is freed immediately.
+        """
+        worker = await self._acquire(affinity)
+        if affinity is not None:
+            worker.keys.pop(affinity, None)
+            worker.keys[affinity] = None
+            while len(worker.keys) > self.affinity_size:
+                worker.keys.popitem(last=False)
+        loop = asyncio.get_running_loop()
+        emit: Callable[[Any], None] | None = None
+        if on_event is not None:
+            callback = on_event
+
+            def forward(event: Any) -> None:
+                loop.call_soon_threadsafe(callback, event)
+
+            emit = forward
+
+        try:
+            return await asyncio.to_thread(self._exchange, worker, fn, payload, timeout, emit)
+        except BaseException:
+            worker.kill()
+            raise
+        finally:
+            await self._release(worker)
+
+    def shutdown(self) -> None:
+        """Stop every worker process. Busy workers are killed."""
+        for worker in list(self._busy):
+            worker.kill()
+        for worker in self._idle:
+            worker.stop()
+        self._idle.clear()
+        self._busy.clear()
+
+    async def _acquire(self, affinity: str | None = None) -> _Worker:
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        async with self._cond:
+            while True:
+                for dead in [w for w in self._idle if not w.alive]:
+                    self._idle.remove(dead)
+                    dead.kill()
+                if self._idle:
+                    worker = next((w for w in self._idle if affinity in w.keys), self._idle[-1])
+                    self._idle.remove(worker)
+                    self._busy.add(worker)
+                    return worker
+                if self.size < self.max_workers:
+                    self._starting += 1
+                    break
+                await self._cond.wait()
+        try:
+            worker = await asyncio.to_thread(_Worker, self._ctx, self.limits, self.initializer)
+        finally:
+            self._starting -= 1
+        self._busy.add(worker)
+        await _log.adebug("solver_worker_started", pid=worker.process.pid)
+        return worker
+
+    async def _release(self, worker: _Worker) -> None:
+        assert self._cond is not None
+        async with self._cond:
+            self._busy.discard(worker)
+            if worker.alive:
+                self._idle.append(worker)
+            self._cond.notify()
+
+    @staticmethod
+    def _exchange(
+        worker: _Worker,
+        fn: JobFunction,
+        payload: Any,
+        timeout: float,
+        emit: Callable[[Any], None] | None,
+    ) -> Any:
+        """Send a job and block (in a thread) until its result, killing the worker at the deadline."""
+        deadline = time.monotonic() + timeout
+        try:
+            worker.conn.send((fn, payload))
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not worker.conn.poll(remaining):
+                    worker.kill()
+                    _log.warning("solver_job_killed", pid=worker.process.pid, timeout=timeout)
+                    raise SolverJobError("solver_timeout")
+                kind, value = worker.conn.recv()
+                if kind == "event":
+                    if emit is not None:
+                        emit(value)
+                    continue
+                if kind == "error":
+                    _log.error("solver_job_failed", pid=worker.process.pid, error=value)
+                    raise SolverJobError("solver_crashed")
+                if kind == "limit":
+                    _log.warning("solver_job_over_limit", pid=worker.process.pid, resource=value)
+                    raise SolverJobError("solver_resource_limit")
+                return value
+        except EOFError, OSError:
+            worker.kill()
+            exceeded = worker.exceeded()
+            if exceeded is not None:
+                _log.warning("solver_job_over_limit", pid=worker.process.pid, resource=exceeded)
+                raise SolverJobError("solver_resource_limit") from None
+            raise SolverJobError("solver_crashed") from None
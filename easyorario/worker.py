@@ -0,0 +1,64 @@
+"""Standalone generation worker: ``python -m easyorario.worker``.
+
+Runs queued generation jobs from the jobs table outside the web process, so solving keeps
+going across web restarts and more workers can be added on other hosts sharing the database.
+Run the web process with ``SOLVER_INLINE_WORKER=false`` when using it.
+"""
+
+import asyncio
+import signal
+
+import structlog
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from easyorario.app import _set_sqlite_pragmas, build_solver_pool, build_solver_service
+from easyorario.config import settings
+from easyorario.services.cancellation import CancellationRegistry
+from easyorario.services.generation import GenerationWorker
+from easyorario.services.progress import ProgressBroker
+from easyorario.services.scheduler import SolverScheduler
+from easyorario.services.solver import SolverService
+
+_log = structlog.get_logger()
+
+
+async def serve() -> None:
+    """Run a GenerationWorker until SIGINT or SIGTERM, then hand its running jobs back."""
+    engine = create_async_engine(settings.database_url)
+    event.listen(engine.sync_engine, "connect", _set_sqlite_pragmas)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    solver_pool = build_solver_pool()
+    solver_scheduler = SolverScheduler(
+        solver_pool, per_owner=settings.solver_jobs_per_owner, queue_size=settings.solver_queue_size
+    )
+
+    def service_factory(session: AsyncSession) -> SolverService:
+        return build_solver_service(session, solver_pool, solver_scheduler)
+
+    worker = GenerationWorker(
+        session_maker=session_maker,
+        service_factory=service_factory,
+        broker=ProgressBroker(),
+        cancellation=CancellationRegistry(),
+        concurrency=settings.solver_workers,
+    )
+    loop = asyncio.get_running_loop()
+    runner = asyncio.create_task(worker.run_forever())
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, runner.cancel)
+    try:
+        await asyncio.gather(runner, return_exceptions=True)
+    finally:
+        await _log.ainfo("generation_worker_stopping", worker_id=worker.worker_id)
+        await worker.shutdown()
+        solver_pool.shutdown()
+        await engine.dispose()
+
+
+def main() -> None:
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
@@ -37,8 +37,8 @@ async def _login(client, email: str, password: str) -> str:
 
 @pytest.fixture
 async def client():
-    """Async test client with in-memory database."""
-    app = create_app(database_url=TEST_DB_URL, create_all=True, static_pool=True)
+    """Async test client with in-memory database; generation jobs stay queued (no inline worker)."""
+    app = create_app(database_url=TEST_DB_URL, create_all=True, static_pool=True, inline_worker=False)
     async with AsyncTestClient(app=app) as client:
         yield client
     # Dispose the engine to prevent leaked connection warnings.
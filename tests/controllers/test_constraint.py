@@ -415,7 +415,7 @@ async def test_settings_page_shows_flash_message_from_query(authenticated_client
 # --- Verification approval/rejection tests (Story 3.3) ---
 
 
-async def _create_translated_constraint(client, timetable_data, monkeypatch):
+async def _create_translated_constraint(client, timetable_data, monkeypatch, translation=VALID_TRANSLATION):
     """Helper: create a timetable with one translated constraint, return (vincoli_url, timetable_id)."""
     vincoli_url = await _create_timetable(client, timetable_data)
     timetable_id = vincoli_url.split("/orario/")[1].split("/vincoli")[0]
@@ -430,7 +430,7 @@ async def _create_translated_constraint(client, timetable_data, monkeypatch):
     )
 
     async def mock_translate(self, **kwargs):
-        return VALID_TRANSLATION
+        return translation
 
     monkeypatch.setattr("easyorario.services.llm.LLMService.translate_constraint", mock_translate)
 
@@ -468,6 +468,49 @@ async def test_post_approva_sets_verified_and_redirects(authenticated_client, ti
     assert "verificato" in response.text
 
 
+async def test_post_approva_infeasible_constraint_stays_unapproved(authenticated_client, timetable_data, monkeypatch):
+    """A constraint that leaves no valid timetable is flagged right away instead of approved."""
+    always_away = {**VALID_TRANSLATION, "description": "Prof. Rossi mai disponibile", "days": None, "time_slots": None}
+    vincoli_url, timetable_id = await _create_translated_constraint(
+        authenticated_client, timetable_data, monkeypatch, translation=always_away
+    )
+    response = await authenticated_client.get(vincoli_url + "/verifica")
+    match = re.search(r"/vincoli/([0-9a-f-]+)/approva", response.text)
+    assert match, "Could not find approve form action in page"
+
+    csrf = _get_csrf_token(authenticated_client)
+    response = await authenticated_client.post(
+        f"/orario/{timetable_id}/vincoli/{match.group(1)}/approva",
+        headers={"x-csrftoken": csrf},
+        follow_redirects=False,
+    )
+    assert response.status_code == 200
+    assert "rende impossibile generare" in response.text
+    assert "Approva comunque" in response.text
+
+
+async def test_post_approva_confirmed_approves_infeasible_constraint(authenticated_client, timetable_data, monkeypatch):
+    """The coordinator can approve a flagged constraint anyway with the confirmation submit."""
+    always_away = {**VALID_TRANSLATION, "description": "Prof. Rossi mai disponibile", "days": None, "time_slots": None}
+    vincoli_url, timetable_id = await _create_translated_constraint(
+        authenticated_client, timetable_data, monkeypatch, translation=always_away
+    )
+    response = await authenticated_client.get(vincoli_url + "/verifica")
+    match = re.search(r"/vincoli/([0-9a-f-]+)/approva", response.text)
+    assert match, "Could not find approve form action in page"
+
+    csrf = _get_csrf_token(authenticated_client)
+    response = await authenticated_client.post(
+        f"/orario/{timetable_id}/vincoli/{match.group(1)}/approva?conferma=true",
+        headers={"x-csrftoken": csrf},
+        follow_redirects=False,
+    )
+    assert response.status_code in (301, 302, 303)
+    response = await authenticated_client.get(vincoli_url + "/verifica")
+    assert "verificato" in response.text
+    assert "Approva comunque" not in response.text
+
+
 async def test_post_rifiuta_sets_rejected_and_redirects(authenticated_client, timetable_data, monkeypatch):
     """AC #3: POST /rifiuta sets constraint status to rejected and redirects to /verifica."""
     vincoli_url, timetable_id = await _create_translated_constraint(authenticated_client, timetable_data, monkeypatch)
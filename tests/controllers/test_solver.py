@@ -0,0 +1,174 @@
+"""Tests for SolverController."""
+
+import json
+import re
+
+import pytest
+
+from easyorario.repositories.job import JobRepository
+from easyorario.services.generation import GenerationWorker
+from tests.conftest import _get_csrf_token
+
+
+@pytest.fixture
+def timetable_data() -> dict[str, str]:
+    """Valid form data for creating a timetable."""
+    return {
+        "class_identifier": "3A Liceo Scientifico",
+        "school_year": "2026/2027",
+        "weekly_hours": "10",
+        "subjects": "Matematica\nItaliano",
+        "teachers": "Matematica: Prof. Rossi",
+    }
+
+
+async def _create_timetable(client, timetable_data: dict[str, str]) -> str:
+    """Create a timetable and return the genera URL."""
+    await client.get("/orario/nuovo")
+    csrf = _get_csrf_token(client)
+    response = await client.post(
+        "/orario/nuovo",
+        data=timetable_data,
+        headers={"x-csrftoken": csrf},
+        follow_redirects=False,
+    )
+    assert response.status_code in (301, 302, 303)
+    return response.headers["location"].replace("/vincoli", "/genera")
+
+
+async def _start(client, genera_url: str) -> str:
+    """Start a generation job and return its job id."""
+    await client.get(genera_url)
+    csrf = _get_csrf_token(client)
+    response = await client.post(genera_url, headers={"x-csrftoken": csrf}, follow_redirects=False)
+    assert response.status_code in (301, 302, 303)
+    match = re.search(r"\?job=([0-9a-f]+)$", response.headers["location"])
+    assert match is not None
+    return match.group(1)
+
+
+async def _run_queued_jobs(client) -> None:
+    """Run the queued jobs to completion, as the worker would; the test app runs none inline."""
+    runner = client.app.state.generation_runner
+    worker = GenerationWorker(
+        session_maker=runner.session_maker,
+        service_factory=runner.service_factory,
+        broker=runner.broker,
+        cancellation=client.app.state.cancellation,
+    )
+    async with runner.session_maker() as session:
+        jobs = await JobRepository(session=session).claim(worker.worker_id, limit=10)
+        await session.commit()
+    for job in jobs:
+        await worker.run_job(job.id, job.timetable_id, job.kind)
+
+
+def _events(body: str) -> list[dict]:
+    return [json.loads(line.removeprefix("data: ")) for line in body.splitlines() if line.startswith("data: ")]
+
+
+async def test_get_genera_renders_start_button(authenticated_client, timetable_data):
+    """GET /orario/{id}/genera shows the start form."""
+    genera_url = await _create_timetable(authenticated_client, timetable_data)
+    response = await authenticated_client.get(genera_url)
+    assert response.status_code == 200
+    assert "Generazione orario" in response.text
+    assert "Genera orario" in response.text
+
+
+async def test_post_genera_redirects_to_job_progress(authenticated_client, timetable_data):
+    """POST starts a job and the progress page subscribes to its event stream."""
+    genera_url = await _create_timetable(authenticated_client, timetable_data)
+    job_id = await _start(authenticated_client, genera_url)
+    response = await authenticated_client.get(f"{genera_url}?job={job_id}")
+    assert response.status_code == 200
+    assert f"{genera_url}/{job_id}/eventi" in response.text
+
+
+async def test_event_stream_reports_states_until_done(authenticated_client, timetable_data):
+    """The SSE stream pushes the solve's states and ends with the new revision."""
+    genera_url = await _create_timetable(authenticated_client, timetable_data)
+    job_id = await _start(authenticated_client, genera_url)
+    await _run_queued_jobs(authenticated_client)
+    response = await authenticated_client.get(f"{genera_url}/{job_id}/eventi")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _events(response.text)
+    assert events[-1]["state"] == "done"
+    assert events[-1]["status"] == "sat"
+    assert events[-1]["revision_number"] == 1
+    assert "revisione 1" in events[-1]["message"]
+
+
+async def test_event_stream_for_unknown_job_returns_404(authenticated_client, timetable_data):
+    """A job id that was never started is not found."""
+    genera_url = await _create_timetable(authenticated_client, timetable_data)
+    response = await authenticated_client.get(f"{genera_url}/deadbeef/eventi")
+    assert response.status_code == 404
+
+
+async def test_get_genera_as_professor_returns_403(authenticated_professor_client):
+    """Professors cannot generate timetables."""
+    response = await authenticated_professor_client.get(
+        "/orario/00000000-0000-0000-0000-000000000000/genera", follow_redirects=False
+    )
+    assert response.status_code == 403
+
+
+async def test_generation_page_shows_latest_revision(authenticated_client, timetable_data):
+    """Once a revision exists, the generation page renders its week grid."""
+    genera_url = await _create_timetable(authenticated_client, timetable_data)
+    job_id = await _start(authenticated_client, genera_url)
+    await _run_queued_jobs(authenticated_client)
+    await authenticated_client.get(f"{genera_url}/{job_id}/eventi")
+    response = await authenticated_client.get(genera_url)
+    assert response.status_code == 200
+    assert "Revisione 1" in response.text
+    assert "1ª ora" in response.text
+    assert "Matematica" in response.text
+
+
+async def test_chosen_alternative_becomes_next_revision(authenticated_client, timetable_data):
+    """An alternatives job streams distinct grids; the chosen one is saved as a revision."""
+    genera_url = await _create_timetable(authenticated_client, timetable_data)
+    await authenticated_client.get(genera_url)
+    csrf = _get_csrf_token(authenticated_client)
+    response = await authenticated_client.post(
+        f"{genera_url}/alternative", headers={"x-csrftoken": csrf}, follow_redirects=False
+    )
+    match = re.search(r"\?job=([0-9a-f]+)$", response.headers["location"])
+    assert match is not None
+    job_id = match.group(1)
+    await _run_queued_jobs(authenticated_client)
+    events = _events((await authenticated_client.get(f"{genera_url}/{job_id}/eventi")).text)
+    chosen = events[-1]["alternatives"]
+    assert len(chosen) == 3
+
+    response = await authenticated_client.post(
+        f"{genera_url}/{job_id}/scegli", data={"index": "1"}, headers={"x-csrftoken": csrf}, follow_redirects=False
+    )
+    assert response.headers["location"].endswith("/genera")
+    assert "Revisione 1" in (await authenticated_client.get(genera_url)).text
+
+
+async def test_school_generation_saves_a_revision_per_timetable(authenticated_client, timetable_data):
+    """A school job solves all the coordinator's timetables together and saves a revision of each."""
+    genera_url = await _create_timetable(authenticated_client, timetable_data)
+    other_url = await _create_timetable(
+        authenticated_client,
+        timetable_data
+        | {"class_identifier": "3B", "weekly_hours": "6", "subjects": "Fisica", "teachers": "Fisica: Prof. Rossi"},
+    )
+    await authenticated_client.get(genera_url)
+    csrf = _get_csrf_token(authenticated_client)
+    response = await authenticated_client.post(
+        f"{genera_url}/scuola", headers={"x-csrftoken": csrf}, follow_redirects=False
+    )
+    match = re.search(r"\?job=([0-9a-f]+)$", response.headers["location"])
+    assert match is not None
+    await _run_queued_jobs(authenticated_client)
+    events = _events((await authenticated_client.get(f"{genera_url}/{match.group(1)}/eventi")).text)
+    assert events[-1]["status"] == "sat"
+    assert events[-1]["revision_number"] == 1
+    assert "2 classi" in events[-1]["message"]
+    assert "Revisione 1" in (await authenticated_client.get(other_url)).text
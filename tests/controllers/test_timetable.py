@@ -2,6 +2,7 @@
 
 import pytest
 
+from easyorario.services.generation import GenerationRunner
 from tests.conftest import _get_csrf_token
 
 
@@ -102,3 +103,63 @@ async def test_get_vincoli_stub_returns_placeholder(authenticated_client, timeta
     response = await authenticated_client.get(location)
     assert response.status_code == 200
     assert "Vincoli" in response.text
+
+
+async def _create(client, timetable_data: dict[str, str]) -> str:
+    """Create a timetable and return its base URL."""
+    await client.get("/orario/nuovo")
+    csrf_token = _get_csrf_token(client)
+    response = await client.post(
+        "/orario/nuovo",
+        data=timetable_data,
+        headers={"x-csrftoken": csrf_token},
+        follow_redirects=False,
+    )
+    return response.headers["location"].removesuffix("/vincoli")
+
+
+async def test_post_annulla_without_running_jobs_reports_nothing_to_cancel(
+    authenticated_client, timetable_data
+) -> None:
+    """Cancelling with nothing in flight returns to the verification page with a notice."""
+    base_url = await _create(authenticated_client, timetable_data)
+    csrf_token = _get_csrf_token(authenticated_client)
+    response = await authenticated_client.post(
+        f"{base_url}/annulla", headers={"x-csrftoken": csrf_token}, follow_redirects=False
+    )
+    assert response.status_code in (301, 302, 303)
+    assert response.headers["location"] == f"{base_url}/vincoli/verifica?message=nothing_to_cancel"
+    response = await authenticated_client.get(response.headers["location"])
+    assert "Nessuna operazione in corso" in response.text
+
+
+async def test_post_annulla_with_only_a_generation_reports_it_cancelled(
+    authenticated_client, timetable_data, monkeypatch
+) -> None:
+    """Cancelling a queued generation, with no translation running, names the generation."""
+
+    async def _one_generation(self, timetable_id) -> int:
+        return 1
+
+    monkeypatch.setattr(GenerationRunner, "cancel", _one_generation)
+    base_url = await _create(authenticated_client, timetable_data)
+    csrf_token = _get_csrf_token(authenticated_client)
+    response = await authenticated_client.post(
+        f"{base_url}/annulla", headers={"x-csrftoken": csrf_token}, follow_redirects=False
+    )
+    assert response.status_code in (301, 302, 303)
+    assert response.headers["location"] == f"{base_url}/vincoli/verifica?message=job_cancelled"
+
+
+async def test_post_annulla_with_job_returns_to_its_progress_page(authenticated_client, timetable_data) -> None:
+    """Cancelling from the generation page goes back to that job's progress stream."""
+    base_url = await _create(authenticated_client, timetable_data)
+    csrf_token = _get_csrf_token(authenticated_client)
+    response = await authenticated_client.post(
+        f"{base_url}/annulla",
+        data={"job": "abc123"},
+        headers={"x-csrftoken": csrf_token},
+        follow_redirects=False,
+    )
+    assert response.status_code in (301, 302, 303)
+    assert response.headers["location"] == f"{base_url}/genera?job=abc123"
@@ -0,0 +1,105 @@
+"""Tests for the JobRepository."""
+
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from easyorario.models.job import Job
+from easyorario.models.timetable import Timetable
+from easyorario.repositories.job import JobRepository, _now
+
+
+@pytest.fixture
+async def job_repo(db_session: AsyncSession) -> JobRepository:
+    return JobRepository(session=db_session)
+
+
+async def _queue(job_repo: JobRepository, timetable: Timetable, payload_hash: str = "a" * 64, age: int = 0) -> Job:
+    created_at = _now() - timedelta(seconds=age)
+    return await job_repo.add(
+        Job(kind="generation", timetable_id=timetable.id, payload_hash=payload_hash, created_at=created_at)
+    )
+
+
+async def _refresh(db_session: AsyncSession, job: Job) -> Job:
+    await db_session.refresh(job)
+    return job
+
+
+async def test_claim_takes_oldest_queued_jobs_once(db_timetable: Timetable, job_repo: JobRepository):
+    """A claimed job is running for its worker and no other worker can claim it."""
+    await _queue(job_repo, db_timetable, "b" * 64)
+    first = await _queue(job_repo, db_timetable, "a" * 64, age=10)
+
+    claimed = await job_repo.claim("w1", limit=1)
+    rest = await job_repo.claim("w2", limit=5)
+    none_left = await job_repo.claim("w3", limit=5)
+
+    assert [job.id for job in claimed] == [first.id]
+    assert claimed[0].status == "running"
+    assert claimed[0].worker_id == "w1"
+    assert claimed[0].attempts == 1
+    assert [job.worker_id for job in rest] == ["w2"]
+    assert none_left == []
+
+
+async def test_get_active_finds_queued_job_with_same_payload(db_timetable: Timetable, job_repo: JobRepository):
+    """An identical request joins the active job; other payloads, kinds and finished jobs do not match."""
+    job = await _queue(job_repo, db_timetable)
+
+    assert (await job_repo.get_active(db_timetable.id, "a" * 64, "generation")).id == job.id
+    assert await job_repo.get_active(db_timetable.id, "b" * 64, "generation") is None
+    assert await job_repo.get_active(db_timetable.id, "a" * 64, "alternatives") is None
+
+    await job_repo.claim("w1")
+    await job_repo.finish(job.id, "w1", "done", {"state": "done"})
+
+    assert await job_repo.get_active(db_timetable.id, "a" * 64, "generation") is None
+
+
+async def test_request_cancel_stops_queued_and_running_jobs(
+    db_session: AsyncSession, db_timetable: Timetable, job_repo: JobRepository
+):
+    """Queued jobs are cancelled outright; running ones fail their next heartbeat."""
+    running = await _queue(job_repo, db_timetable, "a" * 64)
+    await job_repo.claim("w1")
+    queued = await _queue(job_repo, db_timetable, "b" * 64)
+
+    assert await job_repo.heartbeat(running.id, "w1", {"state": "searching"})
+    assert await job_repo.request_cancel(db_timetable.id) == 2
+    assert not await job_repo.heartbeat(running.id, "w1")
+    assert (await _refresh(db_session, queued)).status == "cancelled"
+    assert (await _refresh(db_session, running)).progress == {"state": "searching"}
+
+
+async def test_recover_orphans_requeues_stale_jobs_until_out_of_attempts(
+    db_session: AsyncSession, db_timetable: Timetable, job_repo: JobRepository
+):
+    """A job whose worker went silent is requeued, and failed once it used up its attempts."""
+    job = await _queue(job_repo, db_timetable)
+    await job_repo.claim("w1")
+    stale = update(Job).where(Job.id == job.id).values(heartbeat_at=_now() - timedelta(minutes=5))
+
+    await db_session.execute(stale)
+    assert await job_repo.recover_orphans(timedelta(seconds=30), max_attempts=2) == 1
+    assert (await _refresh(db_session, job)).status == "queued"
+    assert not await job_repo.heartbeat(job.id, "w1")
+
+    await job_repo.claim("w2")
+    await db_session.execute(stale)
+    assert await job_repo.recover_orphans(timedelta(seconds=30), max_attempts=2) == 1
+    assert (await _refresh(db_session, job)).status == "failed"
+
+
+async def test_release_requeues_worker_jobs(db_session: AsyncSession, db_timetable: Timetable, job_repo: JobRepository):
+    """Jobs of a worker shutting down go back to the queue for the next one."""
+    job = await _queue(job_repo, db_timetable)
+    await job_repo.claim("w1")
+
+    assert await job_repo.release("w1") == 1
+    job = await _refresh(db_session, job)
+    assert job.status == "queued"
+    assert job.worker_id is None
+    assert [claimed.id for claimed in await job_repo.claim("w2")] == [job.id]
@@ -0,0 +1,102 @@
+"""Tests for the RevisionRepository."""
+
+import uuid
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from easyorario.models.revision import Revision
+from easyorario.models.timetable import Timetable
+from easyorario.repositories.revision import RevisionRepository
+
+
+@pytest.fixture
+async def revision_repo(db_session: AsyncSession) -> RevisionRepository:
+    return RevisionRepository(session=db_session)
+
+
+async def test_get_by_timetable_returns_revisions_in_number_order(
+    db_session: AsyncSession, db_timetable: Timetable, revision_repo: RevisionRepository
+):
+    """Revisions should be returned ordered by revision_number ascending."""
+    db_session.add_all(
+        [
+            Revision(timetable_id=db_timetable.id, revision_number=2, grid_data={}, constraints_snapshot={}),
+            Revision(timetable_id=db_timetable.id, revision_number=1, grid_data={}, constraints_snapshot={}),
+        ]
+    )
+    await db_session.flush()
+
+    results = await revision_repo.get_by_timetable(db_timetable.id)
+
+    assert [r.revision_number for r in results] == [1, 2]
+
+
+async def test_get_latest_returns_highest_revision_number(
+    db_session: AsyncSession, db_timetable: Timetable, revision_repo: RevisionRepository
+):
+    """The latest revision is the one with the highest revision_number."""
+    grid = {"lunedì": {"1": {"subject": "Matematica", "teacher": "Prof. Rossi", "room": None}}}
+    db_session.add_all(
+        [
+            Revision(timetable_id=db_timetable.id, revision_number=1, grid_data={}, constraints_snapshot={}),
+            Revision(timetable_id=db_timetable.id, revision_number=2, grid_data=grid, constraints_snapshot={}),
+        ]
+    )
+    await db_session.flush()
+
+    latest = await revision_repo.get_latest(db_timetable.id)
+
+    assert latest is not None
+    assert latest.revision_number == 2
+    assert latest.grid_data == grid
+
+
+async def test_get_latest_returns_none_without_revisions(revision_repo: RevisionRepository):
+    """A timetable that was never generated has no latest revision."""
+    assert await revision_repo.get_latest(uuid.uuid4()) is None
+
+
+async def test_revision_numbers_are_unique_per_timetable(db_session: AsyncSession, db_timetable: Timetable):
+    """Two revisions of one timetable cannot share a number."""
+    db_session.add_all(
+        [
+            Revision(timetable_id=db_timetable.id, revision_number=1, grid_data={}, constraints_snapshot={}),
+            Revision(timetable_id=db_timetable.id, revision_number=1, grid_data={}, constraints_snapshot={}),
+        ]
+    )
+    with pytest.raises(IntegrityError):
+        await db_session.flush()
+
+
+async def test_add_next_numbers_after_latest(
+    db_session: AsyncSession, db_timetable: Timetable, revision_repo: RevisionRepository
+):
+    """add_next numbers a revision after the timetable's latest one."""
+    first = await revision_repo.add_next(Revision(timetable_id=db_timetable.id, grid_data={}, constraints_snapshot={}))
+    second = await revision_repo.add_next(Revision(timetable_id=db_timetable.id, grid_data={}, constraints_snapshot={}))
+
+    assert (first.revision_number, second.revision_number) == (1, 2)
+
+
+async def test_add_next_retries_when_number_is_taken(
+    db_session: AsyncSession, db_timetable: Timetable, revision_repo: RevisionRepository, monkeypatch
+):
+    """A number taken by a concurrent job is skipped rather than duplicated."""
+    db_session.add(Revision(timetable_id=db_timetable.id, revision_number=1, grid_data={}, constraints_snapshot={}))
+    await db_session.flush()
+    get_latest = revision_repo.get_latest
+    calls = []
+
+    async def racing_get_latest(timetable_id):
+        calls.append(timetable_id)
+        return None if len(calls) == 1 else await get_latest(timetable_id)
+
+    monkeypatch.setattr(revision_repo, "get_latest", racing_get_latest)
+
+    revision = await revision_repo.add_next(
+        Revision(timetable_id=db_timetable.id, grid_data={}, constraints_snapshot={})
+    )
+
+    assert revision.revision_number == 2
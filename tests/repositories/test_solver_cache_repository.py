@@ -0,0 +1,54 @@
+"""Tests for the SolverCacheRepository."""
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from easyorario.models.solver_cache import SolverCacheEntry
+from easyorario.repositories.solver_cache import SolverCacheRepository
+
+
+@pytest.fixture
+async def cache_repo(db_session: AsyncSession) -> SolverCacheRepository:
+    return SolverCacheRepository(session=db_session)
+
+
+async def _count(db_session: AsyncSession) -> int:
+    return (await db_session.execute(select(func.count()).select_from(SolverCacheEntry))).scalar_one()
+
+
+async def test_get_by_fingerprint_returns_stored_entry(cache_repo: SolverCacheRepository):
+    """A stored entry is found by its fingerprint; unknown fingerprints miss."""
+    await cache_repo.put(SolverCacheEntry(fingerprint="a" * 64, status="unsat", core_positions=[0, 2]))
+
+    entry = await cache_repo.get_by_fingerprint("a" * 64)
+
+    assert entry is not None
+    assert entry.status == "unsat"
+    assert entry.core_positions == [0, 2]
+    assert await cache_repo.get_by_fingerprint("b" * 64) is None
+
+
+async def test_put_ignores_duplicate_fingerprint(db_session: AsyncSession, cache_repo: SolverCacheRepository):
+    """Storing a fingerprint twice keeps the first entry and leaves the session usable."""
+    await cache_repo.put(SolverCacheEntry(fingerprint="a" * 64, status="sat", grid_data={}))
+    await cache_repo.put(SolverCacheEntry(fingerprint="a" * 64, status="unsat"))
+
+    entry = await cache_repo.get_by_fingerprint("a" * 64)
+
+    assert entry is not None
+    assert entry.status == "sat"
+    assert await _count(db_session) == 1
+
+
+async def test_evict_keeps_most_recently_used_entries(db_session: AsyncSession, cache_repo: SolverCacheRepository):
+    """Eviction drops the least recently used entries beyond the size bound."""
+    for name in "abc":
+        await cache_repo.put(SolverCacheEntry(fingerprint=name * 64, status="unsat"))
+    await cache_repo.get_by_fingerprint("a" * 64)
+
+    evicted = await cache_repo.evict(max_entries=1)
+
+    assert evicted == 2
+    assert await _count(db_session) == 1
+    assert await cache_repo.get_by_fingerprint("a" * 64) is not None
@@ -0,0 +1,96 @@
+"""Tests for cooperative cancellation scopes and the per-timetable registry."""
+
+import asyncio
+import time
+import uuid
+
+import pytest
+
+from easyorario.exceptions import JobCancelledError
+from easyorario.services.cancellation import TRANSLATION, CancellationRegistry, CancelScope
+from easyorario.services.solver_pool import SolverPool
+
+
+def _sleep(seconds: float, emit) -> str:
+    time.sleep(seconds)
+    return "done"
+
+
+async def test_scope_returns_result_when_not_cancelled():
+    async def answer() -> int:
+        return 42
+
+    assert await CancelScope().run(answer()) == 42
+
+
+async def test_scope_cancel_aborts_running_awaitable():
+    scope = CancelScope()
+    started = asyncio.Event()
+    aborted = False
+
+    async def forever() -> None:
+        nonlocal aborted
+        started.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            aborted = True
+            raise
+
+    job = asyncio.create_task(scope.run(forever()))
+    await started.wait()
+    scope.cancel()
+    with pytest.raises(JobCancelledError):
+        await job
+    assert aborted
+
+
+async def test_cancelled_scope_does_not_start_new_work():
+    scope = CancelScope()
+    scope.cancel()
+    started = False
+
+    async def work() -> None:
+        nonlocal started
+        started = True
+
+    with pytest.raises(JobCancelledError):
+        await scope.run(work())
+    assert not started
+
+
+async def test_registry_cancels_only_scopes_of_the_timetable():
+    registry = CancellationRegistry()
+    timetable_id, other_id = uuid.uuid4(), uuid.uuid4()
+    with (
+        registry.track(timetable_id) as first,
+        registry.track(timetable_id) as second,
+        registry.track(other_id) as other,
+    ):
+        assert registry.cancel(timetable_id) == 2
+        assert first.cancelled and second.cancelled and not other.cancelled
+    assert registry.cancel(timetable_id) == 0
+
+
+async def test_registry_cancels_only_scopes_of_the_kind():
+    registry = CancellationRegistry()
+    timetable_id = uuid.uuid4()
+    with registry.track(timetable_id, TRANSLATION) as translation, registry.track(timetable_id, "generation") as other:
+        assert registry.cancel(timetable_id, TRANSLATION) == 1
+        assert translation.cancelled and not other.cancelled
+
+
+async def test_cancelling_a_solve_frees_the_pool_slot():
+    pool = SolverPool(workers=1)
+    try:
+        scope = CancelScope()
+        job = asyncio.create_task(scope.run(pool.run(_sleep, 30, timeout=60)))
+        await asyncio.sleep(0.5)
+        start = time.monotonic()
+        scope.cancel()
+        with pytest.raises(JobCancelledError):
+            await job
+        assert await pool.run(_sleep, 0, timeout=10) == "done"
+        assert time.monotonic() - start < 10
+    finally:
+        pool.shutdown()
@@ -1,5 +1,6 @@
 """Tests for the ConstraintService."""
 
+import asyncio
 import uuid
 from unittest.mock import AsyncMock
 
@@ -11,6 +12,7 @@
 from easyorario.models.constraint import Constraint
 from easyorario.models.timetable import Timetable
 from easyorario.repositories.constraint import ConstraintRepository
+from easyorario.services.cancellation import CancelScope
 from easyorario.services.constraint import ConstraintService
 from easyorario.services.llm import LLMService
 
@@ -304,6 +306,32 @@ async def test_translate_pending_constraints_retries_previously_failed(
     assert results[0].formal_representation == VALID_TRANSLATION
 
 
+async def test_translate_pending_constraints_stops_when_scope_is_cancelled(
+    db_session: AsyncSession, db_timetable: Timetable, constraint_service: ConstraintService, monkeypatch
+):
+    """Cancelling aborts the in-flight request; done translations stay, the rest stay pending."""
+    for text in ("Primo", "Secondo", "Terzo"):
+        await _add_pending_constraint(db_session, db_timetable, text)
+    scope = CancelScope()
+    calls = 0
+
+    async def mock_translate(**kwargs):
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            scope.cancel()
+            await asyncio.Event().wait()
+        return VALID_TRANSLATION
+
+    monkeypatch.setattr(constraint_service.llm_service, "translate_constraint", mock_translate)
+
+    results = await constraint_service.translate_pending_constraints(
+        timetable=db_timetable, llm_config=_make_llm_config(), scope=scope
+    )
+    assert calls == 2
+    assert [c.status for c in results] == ["translated", "pending", "pending"]
+
+
 # --- verify_constraint / reject_constraint tests (Story 3.3) ---
 
 
@@ -0,0 +1,96 @@
+"""Tests for the heuristic draft timetable."""
+
+import uuid
+
+import z3
+
+from easyorario.services.draft import draft_grid
+from easyorario.services.grid import SolverInput, grid_cells, grid_distance
+from easyorario.services.solver import IncrementalSolver
+
+
+def _formal(constraint_type: str, **fields) -> dict:
+    base = {
+        "constraint_type": constraint_type,
+        "description": "",
+        "teacher": None,
+        "subject": None,
+        "days": None,
+        "time_slots": None,
+        "max_consecutive_hours": None,
+        "room": None,
+        "notes": None,
+    }
+    return {**base, **fields}
+
+
+def _input(constraints: dict[str, dict] | None = None, weekly_hours: int = 30) -> SolverInput:
+    subjects = ["Matematica", "Italiano", "Storia", "Inglese", "Fisica"]
+    return SolverInput(
+        timetable_id=str(uuid.uuid4()),
+        weekly_hours=weekly_hours,
+        subjects=subjects,
+        teachers={
+            "Matematica": "Prof. Rossi",
+            "Fisica": "Prof. Rossi",
+            "Italiano": "Prof. Bianchi",
+            "Storia": "Prof. Bianchi",
+            "Inglese": "Prof. Verdi",
+        },
+        constraints=constraints or {},
+    )
+
+
+def _slots_of(grid: dict, subjects: set[str]) -> set[tuple[int, int]]:
+    return {cell for cell, subject in grid_cells(grid).items() if subject in subjects}
+
+
+def test_draft_places_every_hour_once():
+    grid = draft_grid(_input())
+    assert grid is not None
+    taught = list(grid_cells(grid).values())
+    assert len(taught) == 30
+    assert {subject: taught.count(subject) for subject in set(taught)} == {
+        "Matematica": 6,
+        "Italiano": 6,
+        "Storia": 6,
+        "Inglese": 6,
+        "Fisica": 6,
+    }
+    assert grid["lunedì"]["1"]["teacher"] is not None
+
+
+def test_draft_respects_hard_constraints():
+    constraints = {
+        "c1": _formal("teacher_unavailable", teacher="prof. rossi", days=["lunedì", "martedì"]),
+        "c2": _formal("subject_scheduling", subject="Inglese", time_slots=[1, 2]),
+        "c3": _formal("max_consecutive", teacher="Prof. Bianchi", max_consecutive_hours=2),
+    }
+    grid = draft_grid(_input(constraints))
+    assert grid is not None
+    assert all(day > 1 for day, _ in _slots_of(grid, {"Matematica", "Fisica"}))
+    assert all(slot <= 2 for _, slot in _slots_of(grid, {"Inglese"}))
+    bianchi = _slots_of(grid, {"Italiano", "Storia"})
+    assert not any((day, slot + 1) in bianchi and (day, slot + 2) in bianchi for day, slot in bianchi)
+
+
+def test_draft_prefers_teacher_preferred_cells():
+    preferred = _formal("teacher_preferred", teacher="Prof. Verdi", days=["sabato"])
+    grid = draft_grid(_input({"p1": preferred}))
+    assert grid is not None
+    assert {day for day, _ in _slots_of(grid, {"Inglese"})} == {5}
+
+
+def test_draft_gives_up_on_infeasible_input():
+    too_narrow = _formal("subject_scheduling", subject="Matematica", time_slots=[1], days=["lunedì"])
+    assert draft_grid(_input({"c1": too_narrow})) is None
+    assert draft_grid(_input(weekly_hours=60)) is None  # 60 hours in 48 cells
+
+
+def test_z3_confirms_a_feasible_draft():
+    solver_input = _input({"c1": _formal("teacher_unavailable", teacher="Prof. Rossi", days=["venerdì"])})
+    draft = draft_grid(solver_input)
+    assert draft is not None
+    context = IncrementalSolver(solver_input)
+    assert context.check(solver_input, 30, hint=draft) == z3.sat
+    assert grid_distance(draft, context.model.grid(context.solver.model())) == 0
@@ -0,0 +1,119 @@
+"""Tests for the generation runner's relay of jobs run by other workers, and heartbeat snapshots."""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from easyorario.models.base import Base
+from easyorario.models.job import Job
+from easyorario.models.timetable import Timetable
+from easyorario.models.user import User
+from easyorario.repositories.job import JobRepository
+from easyorario.services import generation
+from easyorario.services.generation import GenerationRunner, _snapshot
+from easyorario.services.progress import ProgressBroker
+from easyorario.services.solver import SolveEvent
+
+
+@pytest.fixture
+async def session_maker(tmp_path: Path):
+    # A file database: the relay reads from its own connection while the test writes from another.
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'jobs.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def _queued_job(session_maker) -> Job:
+    async with session_maker() as session:
+        user = User(email="owner@example.com", hashed_password="x", role="responsible_professor")
+        session.add(user)
+        await session.flush()
+        timetable = Timetable(
+            class_identifier="3A",
+            school_year="2025-2026",
+            weekly_hours=10,
+            subjects=["Matematica"],
+            teachers={"Matematica": "Prof. Rossi"},
+            owner_id=user.id,
+        )
+        session.add(timetable)
+        await session.flush()
+        job = await JobRepository(session=session).add(
+            Job(kind="generation", timetable_id=timetable.id, payload_hash="a" * 64)
+        )
+        await session.commit()
+        return job
+
+
+async def _collect(runner: GenerationRunner, job_id: str) -> list[dict]:
+    return [event async for event in runner.events(job_id)]
+
+
+async def _until(condition) -> None:
+    async with asyncio.timeout(5):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+async def test_streams_of_remote_jobs_share_one_relay(session_maker, monkeypatch):
+    """Streams of a job run by another worker read it once each; the relay follows it for all of them."""
+    monkeypatch.setattr(generation, "POLL_SECONDS", 0.01)
+    job = await _queued_job(session_maker)
+    broker = ProgressBroker()
+    runner = GenerationRunner(broker=broker, session_maker=session_maker, service_factory=None)  # type: ignore[arg-type]
+    lookups = 0
+    job_of = runner._job
+
+    async def counting_job(job_id: str) -> Job | None:
+        nonlocal lookups
+        lookups += 1
+        return await job_of(job_id)
+
+    monkeypatch.setattr(runner, "_job", counting_job)
+    streams = [asyncio.create_task(_collect(runner, job.id.hex)) for _ in range(2)]
+    await _until(lambda: broker.has(job.id.hex))
+
+    async with session_maker() as session:
+        repo = JobRepository(session=session)
+        await repo.claim("remote", limit=1)
+        await repo.heartbeat(job.id, "remote", {"state": "solving"})
+        await session.commit()
+    await _until(lambda: runner._relayed.get(job.id.hex) == {"state": "solving"})
+    async with session_maker() as session:
+        await JobRepository(session=session).finish(job.id, "remote", "done", {"state": "done", "status": "sat"})
+        await session.commit()
+
+    async with asyncio.timeout(5):
+        events = await asyncio.gather(*streams)
+    for stream in events:
+        assert [event["state"] for event in stream] == ["queued", "solving", "done"]
+        assert stream[-1]["status"] == "sat"
+    assert lookups == 2
+    assert runner._relayed == {}
+    await runner.shutdown()
+
+
+async def test_finished_remote_job_is_served_without_relay(session_maker):
+    job = await _queued_job(session_maker)
+    async with session_maker() as session:
+        repo = JobRepository(session=session)
+        await repo.claim("remote", limit=1)
+        await repo.finish(job.id, "remote", "done", {"state": "done", "status": "sat"})
+        await session.commit()
+    runner = GenerationRunner(broker=ProgressBroker(), session_maker=session_maker, service_factory=None)  # type: ignore[arg-type]
+    assert await _collect(runner, job.id.hex) == [{"state": "done", "status": "sat"}]
+    assert runner._relay is None
+
+
+def test_heartbeat_snapshot_leaves_out_grids_and_counters():
+    grid = {"lunedì": {"1": {"subject": "Matematica", "teacher": "Prof. Rossi", "room": None}}}
+    event = SolveEvent("improved", grid=grid, cost=2, statistics={"conflicts": 7.0, "memory": 12.5})
+    snapshot = _snapshot(event)
+    assert snapshot["grid"] is None
+    assert snapshot["statistics"] == {"conflicts": 7.0}
+    assert snapshot["cost"] == 2
+    assert event.grid == grid
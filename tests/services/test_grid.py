@@ -0,0 +1,124 @@
+"""Tests for the solver-independent timetable shape."""
+
+import uuid
+
+from easyorario.services.grid import CompactGrid, SolverInput, TimetableShape, grid_cells, grid_distance
+
+
+def _formal(constraint_type: str, **fields) -> dict:
+    base = {
+        "constraint_type": constraint_type,
+        "description": "",
+        "teacher": None,
+        "subject": None,
+        "days": None,
+        "time_slots": None,
+        "max_consecutive_hours": None,
+        "room": None,
+        "notes": None,
+    }
+    return {**base, **fields}
+
+
+def _shape(constraints: dict[str, dict], subjects: list[str] | None = None) -> TimetableShape:
+    subjects = subjects or ["Matematica", "Italiano"]
+    teachers = {"Matematica": "Prof. Rossi", "Italiano": "Prof. Bianchi", "Fisica": "Prof. Rossi"}
+    return TimetableShape(
+        SolverInput(
+            timetable_id=str(uuid.uuid4()),
+            weekly_hours=12,
+            subjects=subjects,
+            teachers={subject: teachers[subject] for subject in subjects},
+            constraints=constraints,
+        )
+    )
+
+
+def test_domains_apply_availability_constraints():
+    shape = _shape(
+        {
+            "r": _formal("teacher_unavailable", teacher="prof. rossi", days=["Lunedì"]),
+            "i": _formal("subject_scheduling", subject="Italiano", time_slots=[2]),
+        }
+    )
+    domains = shape.domains()
+    assert len(domains["Matematica"]) == 10 and all(day != 0 for day, _ in domains["Matematica"])
+    assert domains["Italiano"] == {(day, 2) for day in range(6)}
+
+
+def test_reduced_domains_give_hall_sets_to_their_subject():
+    # Italiano has six lessons and six second-hour cells: Matematica must take the first hours.
+    shape = _shape({"i": _formal("subject_scheduling", subject="Italiano", time_slots=[2])})
+    reduced = shape.reduced_domains()
+    assert reduced is not None
+    assert reduced["Matematica"] == {(day, 1) for day in range(6)}
+    assert reduced["Italiano"] == {(day, 2) for day in range(6)}
+
+
+def test_reduced_domains_detect_wipeout():
+    shape = _shape(
+        {
+            "i": _formal("subject_scheduling", subject="Italiano", time_slots=[2]),
+            "r": _formal("teacher_unavailable", teacher="Prof. Rossi", days=["lunedì"]),
+        }
+    )
+    assert shape.reduced_domains() is None
+
+
+def test_reduced_domains_count_a_teachers_subjects_together():
+    # Rossi teaches eight hours but is free for only six cells.
+    shape = _shape(
+        {"r": _formal("teacher_unavailable", teacher="Prof. Rossi", days=["lunedì", "martedì", "mercoledì"])},
+        subjects=["Matematica", "Italiano", "Fisica"],
+    )
+    assert shape.reduced_domains() is None
+
+
+def test_count_idle_hours_counts_gaps_between_a_teachers_lessons():
+    # Rossi waits two hours on Monday, Bianchi one on Tuesday; a lone lesson leaves no gap.
+    shape = _shape({}, subjects=["Matematica", "Italiano", "Fisica"])
+    shape.slots = 4
+    lesson = {"teacher": None, "room": None}
+    grid = {
+        "lunedì": {"1": {**lesson, "subject": "Matematica"}, "2": None, "4": {**lesson, "subject": "Fisica"}},
+        "martedì": {"1": {**lesson, "subject": "Italiano"}, "3": {**lesson, "subject": "Italiano"}},
+        "mercoledì": {"2": {**lesson, "subject": "Matematica"}},
+    }
+    assert shape.count_idle_hours(grid) == 3
+
+
+def _week() -> dict:
+    rossi = {"subject": "Matematica", "teacher": "Prof. Rossi", "room": None}
+    bianchi = {"subject": "Italiano", "teacher": "Prof. Bianchi", "room": "Aula 3"}
+    return {"lunedì": {"1": rossi, "2": bianchi}, "sabato": {"2": dict(rossi)}, "domenica": {"1": rossi}}
+
+
+def test_compact_grid_round_trips_the_json_form():
+    compact = CompactGrid.from_grid(_week())
+    assert compact.slots == 2
+    assert len(compact.lessons) == 2
+    assert compact.to_grid() == {k: v for k, v in _week().items() if k != "domenica"}
+    assert compact.subjects() == grid_cells(_week())
+    assert CompactGrid.unpack(compact.pack()) == compact
+
+
+def test_compact_grids_of_equal_weeks_are_equal_and_hash_alike():
+    week = _week()
+    reordered = {"sabato": week["sabato"], "lunedì": dict(reversed(week["lunedì"].items()))}
+    assert CompactGrid.from_grid(week) == CompactGrid.from_grid(reordered)
+    assert len({CompactGrid.from_grid(week), CompactGrid.from_grid(reordered)}) == 1
+
+
+def test_compact_grid_distance_matches_grid_distance():
+    moved = _week()
+    moved["lunedì"] = {"1": moved["lunedì"]["2"], "2": moved["lunedì"]["1"]}
+    moved["martedì"] = {"1": moved["sabato"].pop("2")}
+    assert CompactGrid.from_grid(_week()).distance(CompactGrid.from_grid(moved)) == grid_distance(_week(), moved) == 4
+
+
+def test_compact_grid_rows_list_every_slot_of_the_week():
+    rows = CompactGrid.from_grid(_week(), slots=3).rows()
+    assert [slot for slot, _ in rows] == [1, 2, 3]
+    assert rows[0][1][0] == ("Matematica", "Prof. Rossi", None)
+    assert rows[1][1][5] == ("Matematica", "Prof. Rossi", None)
+    assert rows[2][1] == [None] * 6
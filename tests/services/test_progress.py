@@ -0,0 +1,56 @@
+"""Tests for the in-process progress broker."""
+
+import asyncio
+
+from easyorario.services.progress import ProgressBroker
+
+
+async def _collect(broker: ProgressBroker, job_id: str) -> list[str]:
+    return [event["state"] async for event in broker.subscribe(job_id)]
+
+
+async def test_subscriber_receives_live_events_until_done():
+    broker = ProgressBroker()
+    broker.open("job")
+    broker.publish("job", {"state": "queued"})
+    collector = asyncio.create_task(_collect(broker, "job"))
+    await asyncio.sleep(0)
+    for state in ("encoding", "solving", "done"):
+        broker.publish("job", {"state": state})
+    assert await asyncio.wait_for(collector, 1) == ["queued", "encoding", "solving", "done"]
+
+
+async def test_late_subscriber_gets_latest_event_per_state():
+    broker = ProgressBroker()
+    broker.open("job")
+    for event in ({"state": "solving"}, {"state": "improved", "cost": 3}, {"state": "improved", "cost": 1}):
+        broker.publish("job", event)
+    broker.publish("job", {"state": "done"})
+
+    events = [event async for event in broker.subscribe("job")]
+
+    assert [event["state"] for event in events] == ["solving", "improved", "done"]
+    assert events[1]["cost"] == 1
+
+
+async def test_events_after_done_are_dropped():
+    broker = ProgressBroker()
+    broker.open("job")
+    broker.publish("job", {"state": "done"})
+    broker.publish("job", {"state": "improved"})
+    assert await _collect(broker, "job") == ["done"]
+
+
+async def test_unknown_job_yields_nothing():
+    assert await _collect(ProgressBroker(), "missing") == []
+
+
+def test_retention_evicts_finished_jobs_only():
+    broker = ProgressBroker(retain=1)
+    broker.open("running")
+    broker.open("finished")
+    broker.publish("finished", {"state": "done"})
+    broker.open("new")
+    assert broker.has("running")
+    assert not broker.has("finished")
+    assert broker.has("new")
@@ -0,0 +1,138 @@
+"""Tests for minimal-change repair of existing timetables."""
+
+import uuid
+
+import z3
+
+from easyorario.services.draft import draft_grid
+from easyorario.services.grid import DAYS, SolverInput, grid_cells, grid_distance
+from easyorario.services.repair import RepairBuilder, changed_constraints
+from easyorario.services.solver import IncrementalSolver, RepairJob, run_repair_job
+
+
+def _formal(constraint_type: str, **fields) -> dict:
+    base = {
+        "constraint_type": constraint_type,
+        "description": "",
+        "teacher": None,
+        "subject": None,
+        "days": None,
+        "time_slots": None,
+        "max_consecutive_hours": None,
+        "room": None,
+        "notes": None,
+    }
+    return {**base, **fields}
+
+
+def _input(constraints: dict[str, dict] | None = None, weekly_hours: int = 30) -> SolverInput:
+    return SolverInput(
+        timetable_id=str(uuid.uuid4()),
+        weekly_hours=weekly_hours,
+        subjects=["Matematica", "Italiano", "Storia", "Inglese", "Fisica"],
+        teachers={
+            "Matematica": "Prof. Rossi",
+            "Fisica": "Prof. Rossi",
+            "Italiano": "Prof. Bianchi",
+            "Storia": "Prof. Bianchi",
+            "Inglese": "Prof. Verdi",
+        },
+        constraints=constraints or {},
+    )
+
+
+def _valid(solver_input: SolverInput, grid: dict) -> bool:
+    """Z3 accepts the grid with every lesson pinned in place."""
+    return IncrementalSolver(solver_input).check_window(solver_input, grid, [], 10) == z3.sat
+
+
+def _rossi_cell(grid: dict) -> tuple[int, int]:
+    return next(cell for cell, subject in sorted(grid_cells(grid).items()) if subject in {"Matematica", "Fisica"})
+
+
+def test_changed_constraints_lists_new_and_edited_only():
+    before = {"a": _formal("general"), "b": _formal("teacher_unavailable", teacher="Prof. Rossi")}
+    after = {"b": _formal("teacher_unavailable", teacher="Prof. Verdi"), "c": _formal("general")}
+    assert changed_constraints(before, after) == [after["b"], after["c"]]
+
+
+def test_repair_moves_only_the_lessons_a_new_constraint_breaks():
+    grid = draft_grid(_input())
+    assert grid is not None
+    day, slot = _rossi_cell(grid)
+    solver_input = _input(
+        {"c1": _formal("teacher_unavailable", teacher="Prof. Rossi", days=[DAYS[day]], time_slots=[slot])}
+    )
+    repaired = RepairBuilder(solver_input).repair(grid)
+    assert repaired is not None
+    assert grid_cells(repaired).get((day, slot)) not in {"Matematica", "Fisica"}
+    assert grid_distance(grid, repaired) <= 2
+    assert _valid(solver_input, repaired)
+
+
+def test_repair_swaps_when_no_free_cell_fits():
+    # Matematica in the first hour and Italiano in the second, Monday to Friday; Saturday is free.
+    grid = {
+        day: {
+            "1": {"subject": "Matematica", "teacher": "Prof. Rossi", "room": None},
+            "2": {"subject": "Italiano", "teacher": "Prof. Bianchi", "room": None},
+        }
+        for day in DAYS[:5]
+    }
+    solver_input = SolverInput(
+        timetable_id=str(uuid.uuid4()),
+        weekly_hours=10,
+        subjects=["Matematica", "Italiano"],
+        teachers={"Matematica": "Prof. Rossi", "Italiano": "Prof. Bianchi"},
+        constraints={
+            "c1": _formal("teacher_unavailable", teacher="Prof. Rossi", days=["lunedì"], time_slots=[1]),
+            "c2": _formal("subject_scheduling", subject="Matematica", days=list(DAYS[:5])),
+        },
+    )
+    repaired = RepairBuilder(solver_input).repair(grid)
+    assert repaired is not None
+    assert _valid(solver_input, repaired)
+    assert 2 <= grid_distance(grid, repaired) <= 3
+
+
+def test_repair_gives_up_when_the_grid_no_longer_matches_the_class():
+    grid = draft_grid(_input())
+    assert grid is not None
+    assert RepairBuilder(_input(weekly_hours=24)).repair(grid) is None
+
+
+def test_only_grids_broken_by_a_hard_constraint_are_violated():
+    grid = draft_grid(_input())
+    assert grid is not None
+    day, slot = _rossi_cell(grid)
+    broken = _input({"c1": _formal("teacher_unavailable", teacher="Prof. Rossi", days=[DAYS[day]], time_slots=[slot])})
+    preferred = _input({"p1": _formal("teacher_preferred", teacher="Prof. Rossi", days=[DAYS[(day + 1) % 6]])})
+    assert RepairBuilder(broken).violated(grid)
+    assert not RepairBuilder(preferred).violated(grid)
+    assert not RepairBuilder(_input(weekly_hours=24)).violated(grid)
+
+
+def test_windows_grow_from_the_teacher_cells_to_their_days():
+    grid = draft_grid(_input())
+    assert grid is not None
+    changed = [_formal("teacher_unavailable", teacher="Prof. Verdi", days=["lunedì"], time_slots=[1])]
+    narrow, wide = RepairBuilder(_input({"c1": changed[0]})).windows(grid, changed)
+    inglese = {cell for cell, subject in grid_cells(grid).items() if subject == "Inglese"}
+    assert set(narrow) == inglese | {(0, 1)}
+    assert set(wide) == {(day, slot) for day, _ in narrow for slot in range(1, 7)}
+
+
+def test_repair_job_resolves_inside_a_window():
+    grid = draft_grid(_input())
+    assert grid is not None
+    day, slot = _rossi_cell(grid)
+    formal = _formal("teacher_unavailable", teacher="Prof. Rossi", days=[DAYS[day]])
+    solver_input = _input({"c1": formal})
+    windows = RepairBuilder(solver_input).windows(grid, [formal])
+    result = run_repair_job(
+        RepairJob(input=solver_input, grid=grid, windows=windows, timeout_seconds=10), lambda _: None
+    )
+    assert result.status == "sat"
+    assert _valid(solver_input, result.grid)
+    kept = {cell: subject for cell, subject in grid_cells(grid).items() if cell not in windows[-1]}
+    assert kept.items() <= grid_cells(result.grid).items()
@@ -0,0 +1,154 @@
+"""Tests for the fair, priority-aware solver job scheduler."""
+
+import asyncio
+
+import pytest
+
+from easyorario.exceptions import SolverJobError
+from easyorario.services.scheduler import BATCH, INTERACTIVE, SolverScheduler
+from easyorario.services.solver_pool import SolverPool
+
+
+def _double(payload: int, emit) -> int:
+    return payload * 2
+
+
+class _GatedPool:
+    """Stands in for SolverPool: records job start order and holds each job until released."""
+
+    def __init__(self, workers: int) -> None:
+        self.max_workers = workers
+        self.started: list[str] = []
+        self.gates: dict[str, asyncio.Event] = {}
+
+    async def run(self, fn, payload: str, *, timeout, on_event=None, affinity=None) -> str:
+        self.started.append(payload)
+        await self.gates.setdefault(payload, asyncio.Event()).wait()
+        return payload
+
+    def release(self, name: str) -> None:
+        self.gates.setdefault(name, asyncio.Event()).set()
+
+
+def _submit(scheduler: SolverScheduler, name: str, owner: str, priority: int = INTERACTIVE) -> asyncio.Task:
+    return asyncio.create_task(scheduler.run(None, name, owner=owner, priority=priority, timeout=10))
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_owner_cap_leaves_workers_for_other_owners():
+    pool = _GatedPool(workers=3)
+    scheduler = SolverScheduler(pool, per_owner=2)  # type: ignore[arg-type]
+    batch = [_submit(scheduler, f"a{i}", "alice", BATCH) for i in range(4)]
+    single = _submit(scheduler, "b0", "bob", BATCH)
+    await _settle()
+    assert pool.started == ["a0", "a1", "b0"]
+    assert scheduler.waiting == 2
+    for name in ("a0", "a1", "b0", "a2", "a3"):
+        pool.release(name)
+    assert await asyncio.gather(*batch, single) == ["a0", "a1", "a2", "a3", "b0"]
+    assert scheduler.running == 0
+
+
+async def test_interactive_jobs_overtake_batch_jobs_fifo_within_priority():
+    pool = _GatedPool(workers=1)
+    scheduler = SolverScheduler(pool, per_owner=5)  # type: ignore[arg-type]
+    tasks = [
+        _submit(scheduler, "running", "alice", BATCH),
+        _submit(scheduler, "batch", "alice", BATCH),
+        _submit(scheduler, "first", "bob"),
+        _submit(scheduler, "second", "carol"),
+    ]
+    await _settle()
+    for name in ("running", "first", "second", "batch"):
+        pool.release(name)
+        await _settle()
+    await asyncio.gather(*tasks)
+    assert pool.started == ["running", "first", "second", "batch"]
+
+
+async def test_full_queue_refuses_new_jobs():
+    pool = _GatedPool(workers=1)
+    scheduler = SolverScheduler(pool, queue_size=1)  # type: ignore[arg-type]
+    tasks = [_submit(scheduler, "running", "alice"), _submit(scheduler, "queued", "bob")]
+    await _settle()
+    with pytest.raises(SolverJobError) as exc_info:
+        await scheduler.run(None, "refused", owner="carol", timeout=10)
+    assert exc_info.value.error_key == "solver_queue_full"
+    pool.release("running")
+    pool.release("queued")
+    await asyncio.gather(*tasks)
+
+
+async def test_full_batch_queue_still_admits_interactive_jobs():
+    pool = _GatedPool(workers=1)
+    scheduler = SolverScheduler(pool, queue_size=1)  # type: ignore[arg-type]
+    tasks = [_submit(scheduler, "running", "alice", BATCH), _submit(scheduler, "queued", "alice", BATCH)]
+    await _settle()
+    with pytest.raises(SolverJobError):
+        await scheduler.run(None, "refused", owner="alice", priority=BATCH, timeout=10)
+    interactive = _submit(scheduler, "interactive", "bob")
+    await _settle()
+    for name in ("running", "interactive", "queued"):
+        pool.release(name)
+    assert await interactive == "interactive"
+    await asyncio.gather(*tasks)
+    assert pool.started == ["running", "interactive", "queued"]
+
+
+async def test_cancelled_waiting_job_gives_up_its_place():
+    pool = _GatedPool(workers=1)
+    scheduler = SolverScheduler(pool)  # type: ignore[arg-type]
+    running = _submit(scheduler, "running", "alice")
+    waiting = _submit(scheduler, "cancelled", "bob")
+    later = _submit(scheduler, "later", "carol")
+    await _settle()
+    waiting.cancel()
+    await _settle()
+    pool.release("running")
+    pool.release("later")
+    assert await later == "later"
+    await running
+    assert "cancelled" not in pool.started
+    assert scheduler.running == 0 and scheduler.waiting == 0
+
+
+async def test_reservation_holds_several_workers_as_one_owner_job():
+    pool = _GatedPool(workers=4)
+    scheduler = SolverScheduler(pool, per_owner=2)  # type: ignore[arg-type]
+    reserved = asyncio.Event()
+    done = asyncio.Event()
+
+    async def race() -> None:
+        async with scheduler.reserve(owner="alice", slots=3):
+            reserved.set()
+            await done.wait()
+
+    racing = asyncio.create_task(race())
+    await _settle()
+    assert reserved.is_set() and scheduler.running == 3
+    single = _submit(scheduler, "a0", "alice")
+    blocked = _submit(scheduler, "b0", "bob")
+    await _settle()
+    assert pool.started == ["a0"]  # alice's second job fits her cap; bob's needs a worker
+    done.set()
+    await racing
+    await _settle()
+    assert pool.started == ["a0", "b0"]
+    pool.release("a0")
+    pool.release("b0")
+    await asyncio.gather(single, blocked)
+    assert scheduler.running == 0
+
+
+async def test_scheduler_runs_jobs_on_a_real_pool():
+    pool = SolverPool(workers=1)
+    try:
+        scheduler = SolverScheduler(pool)
+        results = await asyncio.gather(*(scheduler.run(_double, n, owner="alice", timeout=10) for n in range(3)))
+        assert results == [0, 2, 4]
+    finally:
+        pool.shutdown()
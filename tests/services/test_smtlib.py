@@ -0,0 +1,89 @@
+"""Tests for SMT-LIB2 dumps of solver instances and their offline replay."""
+
+import uuid
+from pathlib import Path
+
+import pytest
+
+from easyorario.services.grid import SolverInput
+from easyorario.services.smtlib import dump_path, read_dump, replay
+from easyorario.services.solver import ENCODINGS, PORTFOLIO, SolveJob, fingerprint, run_solve_job
+
+
+def _input(constraints: dict[str, dict] | None = None) -> SolverInput:
+    return SolverInput(
+        timetable_id=str(uuid.uuid4()),
+        weekly_hours=10,
+        subjects=["Matematica", "Italiano"],
+        teachers={"Matematica": "Prof. Rossi", "Italiano": "Prof. Bianchi"},
+        constraints=constraints or {},
+    )
+
+
+def _overloaded() -> SolverInput:
+    """Matematica needs 5 hours but may only be taught in 2 cells."""
+    return _input(
+        {
+            "c1": {
+                "constraint_type": "subject_scheduling",
+                "subject": "Matematica",
+                "days": ["lunedì"],
+                "time_slots": [1, 2],
+            }
+        }
+    )
+
+
+@pytest.fixture(params=sorted(ENCODINGS))
+def encoding(request) -> str:
+    return request.param
+
+
+def _solve_dumped(solver_input: SolverInput, path: Path, encoding: str) -> str:
+    job = SolveJob(input=solver_input, timeout_seconds=30, encoding=encoding, dump=path)
+    return run_solve_job(job, lambda _: None).status
+
+
+@pytest.mark.parametrize("make_input", [_input, _overloaded])
+def test_replayed_dump_reproduces_the_solve(tmp_path: Path, encoding: str, make_input):
+    """A dumped instance replays offline to the status the production solve found."""
+    solver_input = make_input()
+    path = dump_path(tmp_path, fingerprint(solver_input, encoding, 30))
+
+    status = _solve_dumped(solver_input, path, encoding)
+    header, text = read_dump(path)
+    replayed, seconds, statistics = replay(text, 30, header["logic"], header["params"])
+
+    assert replayed == status
+    assert seconds >= 0
+    assert statistics
+    assert header["key"] == path.stem
+    assert header["encoding"] == encoding
+    assert header["config"] == PORTFOLIO[0].name
+
+
+def test_dump_keeps_constraints_behind_assumptions(tmp_path: Path):
+    """Constraints are assumed by the final check, as on the warm context, not hard-asserted."""
+    path = dump_path(tmp_path, "b" * 64)
+    assert _solve_dumped(_overloaded(), path, "onehot") == "unsat"
+    _, text = read_dump(path)
+    assert text.rstrip().endswith("(check-sat-assuming (c_0))")
+
+    status, _, _ = replay(text.replace("(check-sat-assuming (c_0))", "(check-sat)"), 30)
+    assert status == "sat"
+
+
+def test_dump_is_written_once_per_instance(tmp_path: Path, monkeypatch):
+    """Solving the same instance again keeps the first dump, without serializing it again."""
+    path = dump_path(tmp_path, "a" * 64)
+    _solve_dumped(_input(), path, "onehot")
+    first = path.read_text()
+
+    def _unexpected(*args, **kwargs):
+        raise AssertionError("an existing dump must not be rebuilt")
+
+    monkeypatch.setattr("easyorario.services.solver.write_dump", _unexpected)
+    _solve_dumped(_overloaded(), path, "onehot")
+
+    assert path.read_text() == first
+    assert [p.name for p in tmp_path.iterdir()] == [path.name]
@@ -0,0 +1,1156 @@
+"""Tests for the solver service: model encoding, solve outcomes, and pool integration."""
+
+import asyncio
+import functools
+import uuid
+
+import pytest
+import z3
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from easyorario.models.constraint import Constraint
+from easyorario.models.timetable import Timetable
+from easyorario.models.user import User
+from easyorario.repositories.constraint import ConstraintRepository
+from easyorario.repositories.revision import RevisionRepository
+from easyorario.repositories.solver_cache import SolverCacheRepository
+from easyorario.repositories.timetable import TimetableRepository
+from easyorario.services.draft import draft_grid
+from easyorario.services.grid import (
+    DAYS,
+    CompactGrid,
+    SolverInput,
+    grid_cells,
+    grid_distance,
+    slots_per_day,
+    subject_hours,
+)
+from easyorario.services.repair import RepairBuilder
+from easyorario.services.scheduler import BATCH, INTERACTIVE, SolverScheduler
+from easyorario.services.solver import (
+    DEFAULT_ENCODING,
+    ENCODINGS,
+    PORTFOLIO,
+    SOFT_TIMEOUT_MARGIN_SECONDS,
+    AlternativesJob,
+    FeasibilityJob,
+    IncrementalSolver,
+    IntegerModel,
+    SchoolJob,
+    SchoolResult,
+    SolveEvent,
+    SolveJob,
+    SolverConfig,
+    SolveResult,
+    SolverService,
+    build_solver_input,
+    context_for,
+    fingerprint,
+    limit_z3_memory,
+    portfolio_for,
+    run_alternatives_job,
+    run_feasibility_job,
+    run_school_job,
+    run_solve_job,
+    teacher_components,
+)
+from easyorario.services.solver_pool import SolverPool, WorkerLimits
+
+
+def _formal(constraint_type: str, **fields) -> dict:
+    base = {
+        "constraint_type": constraint_type,
+        "description": "",
+        "teacher": None,
+        "subject": None,
+        "days": None,
+        "time_slots": None,
+        "max_consecutive_hours": None,
+        "room": None,
+        "notes": None,
+    }
+    return {**base, **fields}
+
+
+def _input(constraints: dict[str, dict] | None = None, weekly_hours: int = 10) -> SolverInput:
+    return SolverInput(
+        timetable_id=str(uuid.uuid4()),
+        weekly_hours=weekly_hours,
+        subjects=["Matematica", "Italiano"],
+        teachers={"Matematica": "Prof. Rossi", "Italiano": "Prof. Bianchi"},
+        constraints=constraints or {},
+    )
+
+
+def _solve(solver_input: SolverInput, encoding: str = DEFAULT_ENCODING):
+    return run_solve_job(SolveJob(input=solver_input, timeout_seconds=30, encoding=encoding), lambda _: None)
+
+
+@pytest.fixture(params=sorted(ENCODINGS))
+def encoding(request) -> str:
+    return request.param
+
+
+def _cells(grid: dict, subject: str) -> list[tuple[str, int]]:
+    return [
+        (day, int(slot)) for day, slots in grid.items() for slot, cell in slots.items() if cell["subject"] == subject
+    ]
+
+
+def test_slots_per_day_matches_translation_prompt_range():
+    assert slots_per_day(30) == 6
+    assert slots_per_day(60) == 8
+    assert slots_per_day(2) == 1
+
+
+def test_subject_hours_splits_weekly_hours_evenly():
+    assert subject_hours(_input(weekly_hours=11)) == {"Matematica": 6, "Italiano": 5}
+
+
+def test_solve_without_constraints_places_every_hour(encoding: str):
+    result = _solve(_input(), encoding)
+    assert result.status == "sat"
+    assert result.grid is not None
+    assert len(_cells(result.grid, "Matematica")) == 5
+    assert len(_cells(result.grid, "Italiano")) == 5
+    assert set(result.grid) <= set(DAYS)
+
+
+def test_grid_cells_carry_teacher():
+    result = _solve(_input())
+    assert result.grid is not None
+    cell = next(iter(next(iter(result.grid.values())).values()))
+    assert cell["teacher"] in {"Prof. Rossi", "Prof. Bianchi"}
+
+
+def test_teacher_unavailable_is_respected(encoding: str):
+    formal = _formal("teacher_unavailable", teacher="Prof. Rossi", days=["lunedì", "martedì"])
+    result = _solve(_input({"c1": formal}), encoding)
+    assert result.status == "sat"
+    assert result.grid is not None
+    assert all(day not in ("lunedì", "martedì") for day, _ in _cells(result.grid, "Matematica"))
+
+
+def test_subject_scheduling_restricts_subject_to_given_cells(encoding: str):
+    days = ["martedì", "mercoledì", "giovedì", "venerdì", "sabato"]
+    formal = _formal("subject_scheduling", subject="Italiano", days=days, time_slots=[2])
+    result = _solve(_input({"c1": formal}), encoding)
+    assert result.status == "sat"
+    assert result.grid is not None
+    assert sorted(_cells(result.grid, "Italiano")) == sorted((day, 2) for day in days)
+
+
+def test_max_consecutive_limits_daily_runs(encoding: str):
+    formal = _formal("max_consecutive", subject="Matematica", max_consecutive_hours=1)
+    result = _solve(_input({"c1": formal}, weekly_hours=20), encoding)
+    assert result.status == "sat"
+    assert result.grid is not None
+    cells = set(_cells(result.grid, "Matematica"))
+    assert not any((day, slot + 1) in cells for day, slot in cells)
+
+
+def test_max_consecutive_caps_longer_runs(encoding: str):
+    capped = _input({"c1": _formal("max_consecutive", subject="Matematica", max_consecutive_hours=2)}, weekly_hours=20)
+    context = IncrementalSolver(capped, encoding=encoding)
+    assert context.check(capped, 30) == z3.sat
+    cells = set(_cells(context.model.grid(context.solver.model()), "Matematica"))
+    assert not any((day, slot + 1) in cells and (day, slot + 2) in cells for day, slot in cells)
+
+    # 10 lessons in the first two slots, at most one a day: unsat.
+    squeezed = _input(
+        {
+            "c1": _formal("max_consecutive", subject="Matematica", max_consecutive_hours=1),
+            "c2": _formal("subject_scheduling", subject="Matematica", time_slots=[1, 2]),
+        },
+        weekly_hours=20,
+    )
+    context = IncrementalSolver(squeezed, encoding=encoding)
+    assert context.check(squeezed, 30) == z3.unsat
+
+
+def test_room_requirement_is_reported_in_grid():
+    formal = _formal("room_requirement", subject="Matematica", room="Laboratorio")
+    result = _solve(_input({"c1": formal}))
+    assert result.grid is not None
+    rooms = {cell["room"] for slots in result.grid.values() for cell in slots.values() if cell["subject"] != "Italiano"}
+    assert rooms == {"Laboratorio"}
+
+
+def test_infeasible_constraints_report_unsat(encoding: str):
+    formal = _formal("teacher_unavailable", teacher="Prof. Rossi")
+    result = _solve(_input({"c1": formal}), encoding)
+    assert result.status == "unsat"
+    assert result.grid is None
+
+
+def test_unknown_names_do_not_constrain():
+    formal = _formal("teacher_unavailable", teacher="Prof. Nessuno")
+    assert _solve(_input({"c1": formal})).status == "sat"
+
+
+def test_incremental_solver_toggles_constraints_without_rebuilding(encoding: str):
+    blocking = _formal("teacher_unavailable", teacher="Prof. Rossi")
+    solver_input = _input({"c1": blocking})
+    context = IncrementalSolver(solver_input, encoding=encoding)
+    assert str(context.check(solver_input, 30)) == "unsat"
+
+    solver_input.constraints = {}
+    assert str(context.check(solver_input, 30)) == "sat"
+
+    solver_input.constraints = {"c1": blocking}
+    assert str(context.check(solver_input, 30)) == "unsat"
+
+
+def test_incremental_solver_reuses_literal_for_unchanged_constraint():
+    formal = _formal("teacher_unavailable", teacher="Prof. Rossi", days=["lunedì"])
+    context = IncrementalSolver(_input())
+    first = context.literals({"c1": formal})["c1"]
+    assert context.literals({"c1": dict(formal)})["c1"].eq(first)
+
+
+def test_incremental_solver_re_encodes_edited_constraint():
+    context = IncrementalSolver(_input())
+    before = _formal("teacher_unavailable", teacher="Prof. Rossi")
+    after = _formal("teacher_unavailable", teacher="Prof. Rossi", days=["lunedì"])
+    solver_input = _input({"c1": before})
+    assert str(context.check(solver_input, 30)) == "unsat"
+    solver_input.constraints = {"c1": after}
+    assert str(context.check(solver_input, 30)) == "sat"
+
+
+def test_integer_lessons_of_a_subject_are_ordered():
+    context = IncrementalSolver(_input(), encoding="integer")
+    assert context.check(_input(), 30) == z3.sat
+    model = context.solver.model()
+    assert isinstance(context.model, IntegerModel)
+    for lessons in context.model.lessons.values():
+        positions = [model.eval(lesson).as_long() for lesson in lessons]
+        assert positions == sorted(positions)
+
+
+def test_domain_literal_reduces_checks_with_and_without_it(encoding: str):
+    solver_input = _input(
+        {
+            "c1": _formal("teacher_unavailable", teacher="Prof. Rossi", days=["lunedì", "martedì"]),
+            "c2": _formal("subject_scheduling", subject="Italiano", time_slots=[2]),
+        }
+    )
+    context = IncrementalSolver(solver_input, encoding=encoding)
+    for reduce in (True, False):
+        assert context.check(solver_input, 30, reduce=reduce) == z3.sat
+        assert context.reduced == reduce
+        grid = context.model.grid(context.solver.model())
+        assert all(slot == 2 for _, slot in _cells(grid, "Italiano"))
+        assert all(day not in ("lunedì", "martedì") for day, _ in _cells(grid, "Matematica"))
+
+
+def test_wiped_out_domain_is_left_to_the_constraints():
+    context = IncrementalSolver(_conflicting_input())
+    assert context.check(_conflicting_input(), 30) == z3.unsat
+    assert not context.reduced
+
+
+def test_unsat_core_names_availability_constraints_despite_reduction(encoding: str):
+    solver_input = _input(
+        {
+            "c": _formal("max_consecutive", subject="Matematica", max_consecutive_hours=1),
+            "r": _formal("teacher_unavailable", teacher="Prof. Rossi", days=["lunedì", "martedì"]),
+        },
+        weekly_hours=12,
+    )
+    context = IncrementalSolver(solver_input, encoding=encoding)
+    assert context.check(solver_input, 30) == z3.unsat
+    assert context.reduced
+    result = run_solve_job(
+        SolveJob(input=solver_input, timeout_seconds=30, core_budget_seconds=5, encoding=encoding), lambda _: None
+    )
+    assert result.status == "unsat"
+    assert sorted(result.conflicting_constraint_ids) == ["c", "r"]
+
+
+def test_overloaded_window_is_refuted(encoding: str):
+    # 10 hours confined to the 6 first-slot cells: a pigeonhole symmetry breaking keeps cheap.
+    solver_input = _input(
+        {
+            "m": _formal("subject_scheduling", subject="Matematica", time_slots=[1]),
+            "i": _formal("subject_scheduling", subject="Italiano", time_slots=[1]),
+        }
+    )
+    assert _solve(solver_input, encoding).status == "unsat"
+
+
+def test_context_for_reuses_context_until_shape_changes():
+    solver_input = _input()
+    context = context_for(solver_input)
+    solver_input.constraints = {"c1": _formal("max_consecutive", subject="Matematica", max_consecutive_hours=2)}
+    assert context_for(solver_input) is context
+    solver_input.weekly_hours = 12
+    assert context_for(solver_input) is not context
+
+
+def test_context_for_keeps_context_when_availability_is_toggled():
+    solver_input = _input({"c1": _formal("teacher_unavailable", teacher="Prof. Rossi", days=["lunedì"])})
+    context = context_for(solver_input)
+    assert context.check(solver_input, 30) == z3.sat
+    assert context.reduced
+    solver_input.constraints = {}
+    assert context_for(solver_input) is context
+    assert context.check(solver_input, 30) == z3.sat
+    grid = context.model.grid(context.solver.model())
+    assert "lunedì" in grid
+
+
+def _grid(assignments: dict[tuple[str, int], str]) -> dict:
+    grid: dict = {}
+    for (day, slot), subject in assignments.items():
+        grid.setdefault(day, {})[str(slot)] = {"subject": subject, "teacher": None, "room": None}
+    return grid
+
+
+def test_grid_distance_counts_changed_cells():
+    before = _grid({("lunedì", 1): "Matematica", ("lunedì", 2): "Italiano"})
+    after = _grid({("lunedì", 1): "Italiano", ("martedì", 1): "Italiano"})
+    assert grid_distance(before, before) == 0
+    assert grid_distance(before, after) == 3
+
+
+def test_hint_reproduces_a_still_feasible_grid(encoding: str):
+    solver_input = _input()
+    days = DAYS[:5]
+    hint = _grid({(day, 1): "Matematica" for day in days} | {(day, 2): "Italiano" for day in days})
+    job = SolveJob(input=solver_input, timeout_seconds=30, encoding=encoding, hint=hint)
+    result = run_solve_job(job, lambda _: None)
+    assert result.status == "sat"
+    assert result.grid is not None
+    assert grid_distance(hint, result.grid) == 0
+
+
+def test_hint_never_overrides_constraints(encoding: str):
+    hint = _grid({(day, 1): "Matematica" for day in DAYS[:5]} | {(day, 2): "Italiano" for day in DAYS[:5]})
+    solver_input = _input({"c1": _formal("teacher_unavailable", teacher="Prof. Rossi", days=["lunedì"])})
+    job = SolveJob(input=solver_input, timeout_seconds=30, encoding=encoding, hint=hint)
+    result = run_solve_job(job, lambda _: None)
+    assert result.status == "sat"
+    assert result.grid is not None
+    assert ("lunedì", 1) not in _cells(result.grid, "Matematica")
+
+
+def _optimize(solver_input: SolverInput, encoding: str = DEFAULT_ENCODING) -> tuple[SolveResult, list[SolveEvent]]:
+    events: list[SolveEvent] = []
+    result = run_solve_job(SolveJob(input=solver_input, timeout_seconds=30, encoding=encoding), events.append)
+    return result, [event for event in events if event.state == "improved"]
+
+
+def test_teacher_preferred_is_minimized_and_streamed(encoding: str):
+    solver_input = _input({"p1": _formal("teacher_preferred", teacher="Prof. Rossi", time_slots=[1])})
+    result, events = _optimize(solver_input, encoding)
+    assert result.status == "sat"
+    assert result.grid is not None
+    assert result.cost == 0
+    assert result.optimal
+    assert all(slot == 1 for _, slot in _cells(result.grid, "Matematica"))
+    costs = [event.cost for event in events]
+    assert costs == sorted(costs, reverse=True)
+    assert len(set(costs)) == len(costs)
+    assert events[-1].grid == result.grid
+
+
+def test_unreachable_preference_stops_at_proven_optimum(encoding: str):
+    # Matematica has 5 hours but Monday only 2 slots: 3 lessons must fall outside the preference.
+    solver_input = _input({"p1": _formal("teacher_preferred", teacher="Prof. Rossi", days=["lunedì"])})
+    result, events = _optimize(solver_input, encoding)
+    assert result.status == "sat"
+    assert result.cost == 3
+    assert result.optimal
+    assert all(event.idle_hours is None for event in events)
+
+
+def test_idle_hours_are_minimized_to_the_unavoidable(encoding: str):
+    # Matematica fills slots 1 and 3 from Monday to Thursday: four idle hours for Prof. Rossi.
+    formal = _formal("subject_scheduling", subject="Matematica", days=DAYS[:4], time_slots=[1, 3])
+    solver_input = _input({"c1": formal}, weekly_hours=15)
+    events: list[SolveEvent] = []
+    job = SolveJob(input=solver_input, timeout_seconds=30, encoding=encoding, idle_hours=True)
+    result = run_solve_job(job, events.append)
+    assert result.status == "sat"
+    assert result.cost == 4
+    assert result.optimal
+    assert result.grid is not None
+    italiano: dict[str, list[int]] = {}
+    for day, slot in _cells(result.grid, "Italiano"):
+        italiano.setdefault(day, []).append(slot)
+    assert all(max(slots) - min(slots) + 1 == len(slots) for slots in italiano.values())
+    assert events[-1].state == "improved"
+    assert events[-1].cost == 4
+    assert events[-1].idle_hours == 4
+
+
+def test_preferences_are_ignored_without_optimization():
+    solver_input = _input({"p1": _formal("teacher_preferred", teacher="Prof. Rossi", time_slots=[1])})
+    events: list[SolveEvent] = []
+    result = run_solve_job(SolveJob(input=solver_input, timeout_seconds=30, optimize=False), events.append)
+    assert result.status == "sat"
+    assert result.cost is None
+    assert [event.state for event in events] == ["encoding", "solving"]
+
+
+def test_unsat_solve_streams_conflicts():
+    events: list[SolveEvent] = []
+    result = run_solve_job(SolveJob(input=_conflicting_input(), timeout_seconds=30), events.append)
+    assert [event.state for event in events] == ["encoding", "solving", "conflicts"]
+    assert events[-1].conflicting_constraint_ids == result.conflicting_constraint_ids
+
+
+def _conflicting_input() -> SolverInput:
+    """Matematica needs 5 hours but c1 + c2 leave it only giovedì (2 cells); c3 is unrelated."""
+    return _input(
+        {
+            "c1": _formal("teacher_unavailable", teacher="Prof. Rossi", days=["lunedì", "martedì", "mercoledì"]),
+            "c2": _formal(
+                "subject_scheduling", subject="Matematica", days=["lunedì", "martedì", "mercoledì", "giovedì"]
+            ),
+            "c3": _formal("teacher_unavailable", teacher="Prof. Bianchi", days=["sabato"], time_slots=[1]),
+        }
+    )
+
+
+def test_unsat_result_reports_minimal_core(encoding: str):
+    job = SolveJob(input=_conflicting_input(), timeout_seconds=30, core_budget_seconds=10, encoding=encoding)
+    result = run_solve_job(job, lambda _: None)
+    assert result.status == "unsat"
+    assert sorted(result.conflicting_constraint_ids) == ["c1", "c2"]
+
+
+def test_core_without_budget_still_covers_the_conflict():
+    job = SolveJob(input=_conflicting_input(), timeout_seconds=30, core_budget_seconds=0)
+    result = run_solve_job(job, lambda _: None)
+    assert {"c1", "c2"} <= set(result.conflicting_constraint_ids)
+
+
+def test_base_model_infeasibility_has_empty_core():
+    result = _solve(_input(weekly_hours=60))
+    assert result.status == "unsat"
+    assert result.conflicting_constraint_ids == []
+
+
+def test_unsat_without_extracted_core_is_flagged(monkeypatch: pytest.MonkeyPatch):
+    check = IncrementalSolver.check
+
+    def unreduced_check_times_out(self: IncrementalSolver, *args: object, reduce: bool = True) -> z3.CheckSatResult:
+        return check(self, *args, reduce=reduce) if reduce else z3.unknown
+
+    monkeypatch.setattr(IncrementalSolver, "check", unreduced_check_times_out)
+    # The reduced domain still has room for Matematica's 10 hours; only max_consecutive rules it out.
+    solver_input = _input(
+        {
+            "c1": _formal("subject_scheduling", subject="Matematica", days=["lunedì", "martedì", "mercoledì"]),
+            "c2": _formal("max_consecutive", subject="Matematica", max_consecutive_hours=1),
+        },
+        weekly_hours=20,
+    )
+    result = run_solve_job(SolveJob(input=solver_input, timeout_seconds=30), lambda _: None)
+    assert result.status == "unsat"
+    assert result.conflicting_constraint_ids == []
+    assert not result.core_extracted
+
+
+def test_explain_unsat_renders_core_descriptions(db_timetable: Timetable):
+    rows = [
+        Constraint(
+            id=uuid.uuid4(),
+            timetable_id=db_timetable.id,
+            natural_language_text=text,
+            formal_representation=_formal("general", description=description),
+            status="verified",
+        )
+        for text, description in (("Rossi mai", "Rossi non è mai disponibile"), ("Altro", ""))
+    ]
+    result = SolveResult(status="unsat", conflicting_constraint_ids=[str(rows[0].id), str(rows[1].id)])
+    service = SolverService(constraint_repo=None, solver_pool=None, timeout_seconds=1)  # type: ignore[arg-type]
+    warning = service.explain_unsat(result, db_timetable, rows)
+    assert warning is not None
+    assert warning.conflict_type == "unsat_core"
+    assert "2 vincoli" in warning.message
+    assert warning.constraint_descriptions == ["Rossi non è mai disponibile", "Altro"]
+
+
+def test_explain_unsat_without_core_blames_weekly_hours(db_timetable: Timetable):
+    service = SolverService(constraint_repo=None, solver_pool=None, timeout_seconds=1)  # type: ignore[arg-type]
+    warning = service.explain_unsat(SolveResult(status="unsat"), db_timetable, [])
+    assert warning is not None
+    assert warning.conflict_type == "unsat_base"
+    assert "30 ore" in warning.message
+
+
+def test_explain_unsat_without_extracted_core_does_not_blame_weekly_hours(db_timetable: Timetable):
+    service = SolverService(constraint_repo=None, solver_pool=None, timeout_seconds=1)  # type: ignore[arg-type]
+    warning = service.explain_unsat(SolveResult(status="unsat", core_extracted=False), db_timetable, [])
+    assert warning is not None
+    assert warning.conflict_type == "unsat_no_core"
+    assert "30 ore" not in warning.message
+
+
+def test_explain_unsat_ignores_other_outcomes(db_timetable: Timetable):
+    service = SolverService(constraint_repo=None, solver_pool=None, timeout_seconds=1)  # type: ignore[arg-type]
+    assert service.explain_unsat(SolveResult(status="sat"), db_timetable, []) is None
+
+
+@pytest.mark.parametrize("config", PORTFOLIO, ids=lambda config: config.name)
+def test_every_portfolio_configuration_solves_and_explains(config: SolverConfig, encoding: str):
+    job = SolveJob(input=_input(), timeout_seconds=30, config=config, encoding=encoding)
+    sat = run_solve_job(job, lambda _: None)
+    assert sat.status == "sat"
+    assert sat.config == config.name
+    job = SolveJob(
+        input=_conflicting_input(), timeout_seconds=30, core_budget_seconds=10, config=config, encoding=encoding
+    )
+    unsat = run_solve_job(job, lambda _: None)
+    assert unsat.status == "unsat"
+    assert sorted(unsat.conflicting_constraint_ids) == ["c1", "c2"]
+
+
+def test_build_solver_input_keeps_only_verified_translated_constraints(db_timetable: Timetable):
+    verified = Constraint(
+        id=uuid.uuid4(),
+        timetable_id=db_timetable.id,
+        natural_language_text="a",
+        formal_representation=_formal("general"),
+        status="verified",
+    )
+    translated = Constraint(
+        id=uuid.uuid4(),
+        timetable_id=db_timetable.id,
+        natural_language_text="b",
+        formal_representation=_formal("general"),
+        status="translated",
+    )
+    solver_input = build_solver_input(db_timetable, [verified, translated])
+    assert list(solver_input.constraints) == [str(verified.id)]
+    assert solver_input.subjects == ["Matematica"]
+
+
+@pytest.fixture
+def solver_pool():
+    pool = SolverPool(workers=1, preload=["easyorario.services.solver"])
+    yield pool
+    pool.shutdown()
+
+
+async def test_solve_timetable_runs_in_pool(db_session: AsyncSession, db_timetable: Timetable, solver_pool: SolverPool):
+    repo = ConstraintRepository(session=db_session)
+    await repo.add(
+        Constraint(
+            timetable_id=db_timetable.id,
+            natural_language_text="Rossi non c'è il lunedì",
+            formal_representation=_formal("teacher_unavailable", teacher="Prof. Rossi", days=["lunedì"]),
+            status="verified",
+        )
+    )
+    service = SolverService(constraint_repo=repo, solver_pool=solver_pool, timeout_seconds=30)
+    result = await service.solve_timetable(db_timetable)
+    assert result.status == "sat"
+    assert result.grid is not None
+    assert "lunedì" not in result.grid
+    assert sum(len(slots) for slots in result.grid.values()) == 30
+
+
+def test_feasibility_job_names_availability_and_keeps_context():
+    solver_input = _conflicting_input()
+    job = FeasibilityJob(input=solver_input, timeout_seconds=30, core_budget_seconds=10)
+    result = run_feasibility_job(job, lambda _: None)
+    assert result.status == "unsat"
+    assert sorted(result.conflicting_constraint_ids) == ["c1", "c2"]
+    context = context_for(solver_input)
+    del solver_input.constraints["c2"]
+    assert run_feasibility_job(FeasibilityJob(input=solver_input, timeout_seconds=30), lambda _: None).status == "sat"
+    assert context_for(solver_input) is context
+
+
+async def test_check_approval_flags_constraint_that_makes_timetable_impossible(
+    db_session: AsyncSession, db_timetable: Timetable, solver_pool: SolverPool
+):
+    repo = ConstraintRepository(session=db_session)
+    verified = await repo.add(
+        Constraint(
+            timetable_id=db_timetable.id,
+            natural_language_text="Rossi non c'è il lunedì",
+            formal_representation=_formal("teacher_unavailable", teacher="Prof. Rossi", days=["lunedì"]),
+            status="verified",
+        )
+    )
+    # 30 hours of Matematica: without Rossi on Tuesday too, only 24 cells are left.
+    doomed = await repo.add(
+        Constraint(
+            timetable_id=db_timetable.id,
+            natural_language_text="Rossi non c'è il martedì",
+            formal_representation=_formal("teacher_unavailable", teacher="Prof. Rossi", days=["martedì"]),
+            status="translated",
+        )
+    )
+    harmless = await repo.add(
+        Constraint(
+            timetable_id=db_timetable.id,
+            natural_language_text="Matematica al massimo 6 ore di fila",
+            formal_representation=_formal("max_consecutive", subject="Matematica", max_consecutive_hours=6),
+            status="translated",
+        )
+    )
+    service = SolverService(constraint_repo=repo, solver_pool=solver_pool, timeout_seconds=30)
+    warning = await service.check_approval(db_timetable, doomed.id)
+    assert warning is not None
+    assert warning.conflict_type == "unsat_approval"
+    assert warning.constraint_descriptions == [verified.natural_language_text]
+    assert await service.check_approval(db_timetable, harmless.id) is None
+    assert await service.check_approval(db_timetable, verified.id) is None
+
+
+async def test_crashed_feasibility_check_does_not_block_approval(
+    db_session: AsyncSession, db_timetable: Timetable, solver_pool: SolverPool
+):
+    repo = ConstraintRepository(session=db_session)
+    candidate = await repo.add(
+        Constraint(
+            timetable_id=db_timetable.id,
+            natural_language_text="Rossi non c'è mai",
+            formal_representation=_formal("teacher_unavailable", teacher="Prof. Rossi"),
+            status="translated",
+        )
+    )
+    service = SolverService(constraint_repo=repo, solver_pool=solver_pool, timeout_seconds=30)
+    service.encoding = "missing"  # the worker fails to build the model
+    result = await service.feasibility_input(_input())
+    assert result.status == "timeout"
+    assert await service.check_approval(db_timetable, candidate.id) is None
+
+
+async def test_generate_revision_numbers_revisions_and_keeps_grid_stable(
+    db_session: AsyncSession, db_timetable: Timetable, solver_pool: SolverPool
+):
+    constraint_repo = ConstraintRepository(session=db_session)
+    revision_repo = RevisionRepository(session=db_session)
+    service = SolverService(
+        constraint_repo=constraint_repo, revision_repo=revision_repo, solver_pool=solver_pool, timeout_seconds=30
+    )
+    result, first = await service.generate_revision(db_timetable)
+    assert result.status == "sat"
+    assert first is not None
+    assert first.revision_number == 1
+    assert first.constraints_snapshot == {}
+
+    # A constraint the first grid already satisfies: the warm start keeps the same week.
+    day, slot = next(
+        (day, slot)
+        for day in DAYS
+        for slot in range(1, slots_per_day(db_timetable.weekly_hours) + 1)
+        if str(slot) not in first.grid_data.get(day, {})
+    )
+    constraint = await constraint_repo.add(
+        Constraint(
+            timetable_id=db_timetable.id,
+            natural_language_text="Rossi non c'è",
+            formal_representation=_formal("teacher_unavailable", teacher="Prof. Rossi", days=[day], time_slots=[slot]),
+            status="verified",
+        )
+    )
+    result, second = await service.generate_revision(db_timetable)
+    assert second is not None
+    assert second.revision_number == 2
+    assert list(second.constraints_snapshot) == [str(constraint.id)]
+    assert grid_distance(first.grid_data, second.grid_data) == 0
+
+
+async def _two_subject_timetable(db_session: AsyncSession, db_user: User) -> Timetable:
+    """Matematica and Italiano, 5 hours each in 12 cells: two cells stay free."""
+    timetable = Timetable(
+        class_identifier="1B",
+        school_year="2025-2026",
+        weekly_hours=10,
+        subjects=["Matematica", "Italiano"],
+        teachers={"Matematica": "Prof. Rossi", "Italiano": "Prof. Bianchi"},
+        owner_id=db_user.id,
+    )
+    db_session.add(timetable)
+    await db_session.flush()
+    return timetable
+
+
+async def test_generate_revision_repairs_grid_broken_by_a_hard_change(
+    db_session: AsyncSession, db_user: User, solver_pool: SolverPool
+):
+    timetable = await _two_subject_timetable(db_session, db_user)
+    constraint_repo = ConstraintRepository(session=db_session)
+    service = SolverService(
+        constraint_repo=constraint_repo,
+        revision_repo=RevisionRepository(session=db_session),
+        solver_pool=solver_pool,
+        timeout_seconds=30,
+    )
+    _, first = await service.generate_revision(timetable)
+    assert first is not None
+    day, slot = next(cell for cell, subject in grid_cells(first.grid_data).items() if subject == "Matematica")
+    await constraint_repo.add(
+        Constraint(
+            timetable_id=timetable.id,
+            natural_language_text="Rossi non c'è",
+            formal_representation=_formal(
+                "teacher_unavailable", teacher="Prof. Rossi", days=[DAYS[day]], time_slots=[slot]
+            ),
+            status="verified",
+        )
+    )
+    result, second = await service.generate_revision(timetable)
+    assert result.config == "repair"
+    assert second is not None
+    assert grid_cells(second.grid_data).get((day, slot)) != "Matematica"
+
+
+async def test_generate_revision_optimizes_a_soft_only_change(
+    db_session: AsyncSession, db_user: User, solver_pool: SolverPool
+):
+    timetable = await _two_subject_timetable(db_session, db_user)
+    constraint_repo = ConstraintRepository(session=db_session)
+    service = SolverService(
+        constraint_repo=constraint_repo,
+        revision_repo=RevisionRepository(session=db_session),
+        solver_pool=solver_pool,
+        timeout_seconds=30,
+    )
+    _, first = await service.generate_revision(timetable)
+    assert first is not None
+    # Rossi would rather teach on the three days the first grid gives Matematica least.
+    lessons = grid_cells(first.grid_data)
+    days = sorted(DAYS, key=lambda d: sum(lessons.get((DAYS.index(d), s)) == "Matematica" for s in (1, 2)))[:3]
+    preference = await constraint_repo.add(
+        Constraint(
+            timetable_id=timetable.id,
+            natural_language_text="Rossi preferisce questi giorni",
+            formal_representation=_formal("teacher_preferred", teacher="Prof. Rossi", days=days),
+            status="verified",
+        )
+    )
+    before = RepairBuilder(build_solver_input(timetable, [preference])).cost(first.grid_data)
+    result, second = await service.generate_revision(timetable)
+    assert result.config != "repair"
+    assert second is not None
+    assert before is not None and before > 0
+    assert result.cost == 0
+
+
+async def test_portfolio_races_configurations_and_remembers_winner():
+    pool = SolverPool(workers=3, preload=["easyorario.services.solver"])
+    try:
+        service = SolverService(constraint_repo=None, solver_pool=pool, timeout_seconds=30, portfolio_size=3)  # type: ignore[arg-type]
+        solver_input = _input()
+        result = await service.solve_input(solver_input)
+        assert result.status == "sat"
+        assert result.config in {config.name for config in PORTFOLIO[:3]}
+        assert portfolio_for(solver_input.timetable_id)[0].name == result.config
+    finally:
+        pool.shutdown()
+
+
+async def test_solve_input_runs_within_worker_limits():
+    limits = WorkerLimits(memory_mb=2048, cpu_seconds=30)
+    pool = SolverPool(
+        workers=1,
+        preload=["easyorario.services.solver"],
+        limits=limits,
+        initializer=functools.partial(limit_z3_memory, limits.memory_mb),
+    )
+    try:
+        service = SolverService(constraint_repo=None, solver_pool=pool, timeout_seconds=30)  # type: ignore[arg-type]
+        assert (await service.solve_input(_input())).status == "sat"
+    finally:
+        pool.shutdown()
+
+
+def test_portfolio_order_defaults_to_declaration_order():
+    assert portfolio_for(str(uuid.uuid4())) == list(PORTFOLIO)
+
+
+async def test_solve_input_maps_hard_kill_to_timeout(solver_pool: SolverPool, monkeypatch):
+    from easyorario.exceptions import SolverJobError
+
+    async def _killed(*args, **kwargs):
+        raise SolverJobError("solver_timeout")
+
+    monkeypatch.setattr(solver_pool, "run", _killed)
+    service = SolverService(constraint_repo=None, solver_pool=solver_pool, timeout_seconds=1)  # type: ignore[arg-type]
+    result = await service.solve_input(_input())
+    assert result.status == "timeout"
+
+
+async def test_solve_input_streams_improved_grids(solver_pool: SolverPool):
+    service = SolverService(constraint_repo=None, solver_pool=solver_pool, timeout_seconds=30)  # type: ignore[arg-type]
+    solver_input = _input({"p1": _formal("teacher_preferred", teacher="Prof. Rossi", time_slots=[2])})
+    events: list[SolveEvent] = []
+    result = await service.solve_input(solver_input, on_event=events.append)
+    assert result.status == "sat"
+    assert result.cost == 0
+    assert [event.state for event in events][:4] == ["queued", "draft", "encoding", "solving"]
+    assert events[-1].state == "improved"
+    assert events[-1].cost == result.cost
+    assert events[-1].statistics
+
+
+async def test_solve_input_streams_draft_and_confirms_it(solver_pool: SolverPool):
+    service = SolverService(constraint_repo=None, solver_pool=solver_pool, timeout_seconds=30)  # type: ignore[arg-type]
+    events: list[SolveEvent] = []
+    result = await service.solve_input(_input(), on_event=events.append)
+    draft = next(event for event in events if event.state == "draft")
+    assert result.status == "sat"
+    assert draft.grid is not None
+    assert grid_distance(draft.grid, result.grid) == 0
+
+
+async def test_hard_kill_while_optimizing_keeps_best_grid(solver_pool: SolverPool, monkeypatch):
+    from easyorario.exceptions import SolverJobError
+
+    grid = {"lunedì": {"1": {"subject": "Matematica", "teacher": "Prof. Rossi", "room": None}}}
+
+    async def _killed(*args, on_event, **kwargs):
+        on_event(SolveEvent("improved", grid=grid, cost=4))
+        raise SolverJobError("solver_timeout")
+
+    monkeypatch.setattr(solver_pool, "run", _killed)
+    service = SolverService(constraint_repo=None, solver_pool=solver_pool, timeout_seconds=1)  # type: ignore[arg-type]
+    result = await service.solve_input(_input())
+    assert result.status == "sat"
+    assert result.grid == grid
+    assert result.cost == 4
+    assert not result.optimal
+
+
+def test_alternatives_are_pairwise_distinct(encoding: str):
+    events: list[SolveEvent] = []
+    job = AlternativesJob(input=_input(), count=3, timeout_seconds=30, min_distance=4, encoding=encoding)
+    result = run_alternatives_job(job, events.append)
+    assert result.status == "sat"
+    assert len(result.grids) == 3
+    grids = [CompactGrid.from_grid(grid) for grid in result.grids]
+    for i, grid in enumerate(grids):
+        for other in grids[i + 1 :]:
+            assert grid.distance(other) >= 4
+    assert [event.grid for event in events if event.state == "alternative"] == result.grids
+    assert [event.index for event in events if event.state == "alternative"] == [0, 1, 2]
+
+
+def test_alternatives_stop_when_exhausted():
+    # Two lessons cannot move three apart from where they are: the first grid is the only one.
+    solver_input = _input(weekly_hours=2)
+    solver_input.subjects = ["Matematica"]
+    solver_input.teachers = {"Matematica": "Prof. Rossi"}
+    result = run_alternatives_job(
+        AlternativesJob(input=solver_input, count=5, timeout_seconds=30, min_distance=3), lambda _: None
+    )
+    assert result.status == "sat"
+    assert result.exhausted
+    assert len(result.grids) == 1
+
+
+def test_alternatives_of_infeasible_input_are_unsat():
+    solver_input = _input({"c1": _formal("teacher_unavailable", teacher="Prof. Rossi")})
+    result = run_alternatives_job(AlternativesJob(input=solver_input, count=3, timeout_seconds=30), lambda _: None)
+    assert result.status == "unsat"
+    assert result.grids == []
+
+
+async def test_alternatives_input_streams_each_grid(solver_pool: SolverPool):
+    service = SolverService(constraint_repo=None, solver_pool=solver_pool, timeout_seconds=30)  # type: ignore[arg-type]
+    events: list[SolveEvent] = []
+    result = await service.alternatives_input(_input(), count=2, on_event=events.append)
+    assert result.status == "sat"
+    assert len(result.grids) == 2
+    assert [event.state for event in events].count("alternative") == 2
+
+
+def _class(teachers: dict[str, str], constraints: dict[str, dict] | None = None) -> SolverInput:
+    return SolverInput(
+        timetable_id=str(uuid.uuid4()),
+        weekly_hours=10,
+        subjects=list(teachers),
+        teachers=teachers,
+        constraints=constraints or {},
+    )
+
+
+def _solve_school(*inputs: SolverInput, encoding: str = DEFAULT_ENCODING):
+    return run_school_job(SchoolJob(inputs=list(inputs), timeout_seconds=30, encoding=encoding), lambda _: None)
+
+
+def test_teacher_components_link_classes_sharing_a_teacher():
+    a = _class({"Matematica": "Prof. Rossi", "Italiano": "Prof. Bianchi"})
+    b = _class({"Fisica": "prof. rossi "})
+    c = _class({"Storia": "Prof. Verdi"})
+    d = _class({"Inglese": "Prof. Neri", "Arte": "Prof. Bianchi"})
+    components = teacher_components([a, b, c, d])
+    assert [[i.timetable_id for i in component] for component in components] == [
+        [a.timetable_id, b.timetable_id, d.timetable_id],
+        [c.timetable_id],
+    ]
+
+
+def test_school_job_never_books_a_teacher_twice(encoding: str):
+    a = _class({"Matematica": "Prof. Rossi", "Italiano": "Prof. Bianchi"})
+    b = _class({"Fisica": "Prof. Rossi", "Storia": "Prof. Verdi"})
+    result = _solve_school(a, b, encoding=encoding)
+    assert result.status == "sat"
+    rossi_a = set(_cells(result.grids[a.timetable_id], "Matematica"))
+    rossi_b = set(_cells(result.grids[b.timetable_id], "Fisica"))
+    assert len(rossi_a) == 5
+    assert len(rossi_b) == 5
+    assert not rossi_a & rossi_b
+
+
+def test_school_job_applies_teacher_unavailability_to_every_class():
+    unavailable = _formal("teacher_unavailable", teacher="Prof. Rossi", days=["lunedì"])
+    a = _class({"Matematica": "Prof. Rossi", "Italiano": "Prof. Bianchi"}, {"c1": unavailable})
+    b = _class({"Fisica": "Prof. Rossi", "Storia": "Prof. Verdi"})
+    result = _solve_school(a, b)
+    assert result.status == "sat"
+    assert all(day != "lunedì" for day, _ in _cells(result.grids[b.timetable_id], "Fisica"))
+
+
+def test_school_job_reports_overbooked_shared_teacher_as_unsat():
+    # Three classes of 10 hours each, all taught by Rossi: 30 lessons in 12 weekly slots.
+    classes = [_class({"Matematica": "Prof. Rossi"}) for _ in range(3)]
+    assert _solve_school(*classes).status == "unsat"
+
+
+def test_school_job_minimizes_its_core():
+    # Without Monday and Tuesday, Rossi's 10 lessons no longer fit; Saturday off alone is harmless.
+    days_off = _formal("teacher_unavailable", teacher="Prof. Rossi", days=["lunedì", "martedì"])
+    saturday_off = _formal("teacher_unavailable", teacher="Prof. Rossi", days=["sabato"])
+    a = _class({"Matematica": "Prof. Rossi", "Italiano": "Prof. Bianchi"}, {"c1": days_off})
+    b = _class({"Fisica": "Prof. Rossi", "Storia": "Prof. Verdi"}, {"c2": saturday_off})
+    job = SchoolJob(inputs=[a, b], timeout_seconds=30, core_budget_seconds=10)
+    result = run_school_job(job, lambda _: None)
+    assert result.status == "unsat"
+    assert result.conflicting_constraint_ids == ["c1"]
+
+
+async def test_school_components_leave_room_for_the_core_budget(monkeypatch):
+    service = SolverService(constraint_repo=None, solver_pool=None, timeout_seconds=30, core_budget_seconds=4)  # type: ignore[arg-type]
+    jobs: list[SchoolJob] = []
+
+    async def _submit(fn, job, **kwargs):
+        jobs.append(job)
+        return SchoolResult(status="sat")
+
+    monkeypatch.setattr(service, "_submit", _submit)
+    await service.solve_school_inputs([_class({"Matematica": "Prof. Rossi"})])
+    assert jobs[0].core_budget_seconds == 4
+    assert jobs[0].timeout_seconds == 30 - SOFT_TIMEOUT_MARGIN_SECONDS - 4
+
+
+async def test_school_revisions_are_solved_in_components_and_saved(
+    db_session: AsyncSession, db_timetable: Timetable, solver_pool: SolverPool
+):
+    other = Timetable(
+        class_identifier="3B",
+        school_year="2025-2026",
+        weekly_hours=6,
+        subjects=["Fisica"],
+        teachers={"Fisica": "Prof. Rossi"},
+        owner_id=db_timetable.owner_id,
+    )
+    separate = Timetable(
+        class_identifier="4C",
+        school_year="2025-2026",
+        weekly_hours=10,
+        subjects=["Storia"],
+        teachers={"Storia": "Prof. Verdi"},
+        owner_id=db_timetable.owner_id,
+    )
+    db_session.add_all([other, separate])
+    await db_session.flush()
+    service = SolverService(
+        constraint_repo=ConstraintRepository(session=db_session),
+        timetable_repo=TimetableRepository(session=db_session),
+        revision_repo=RevisionRepository(session=db_session),
+        solver_pool=solver_pool,
+        timeout_seconds=30,
+    )
+    result, revisions = await service.generate_school_revisions(db_timetable.owner_id)
+    assert result.status == "sat"
+    assert result.components == [[str(db_timetable.id), str(other.id)], [str(separate.id)]]
+    first = set(_cells(result.grids[str(db_timetable.id)], "Matematica"))
+    second = set(_cells(result.grids[str(other.id)], "Fisica"))
+    assert len(first) == 30
+    assert len(second) == 6
+    assert not first & second
+    assert {tid: revision.grid_data for tid, revision in revisions.items()} == result.grids
+    assert all(revision.revision_number == 1 for revision in revisions.values())
+
+
+async def test_unsat_school_saves_no_revision_and_names_its_core(
+    db_session: AsyncSession, db_timetable: Timetable, solver_pool: SolverPool
+):
+    other = Timetable(
+        class_identifier="3B",
+        school_year="2025-2026",
+        weekly_hours=6,
+        subjects=["Fisica"],
+        teachers={"Fisica": "Prof. Rossi"},
+        owner_id=db_timetable.owner_id,
+    )
+    db_session.add(other)
+    await db_session.flush()
+    blocking = Constraint(
+        timetable_id=other.id,
+        natural_language_text="Rossi non insegna mai",
+        formal_representation=_formal("teacher_unavailable", teacher="Prof. Rossi", description="Rossi assente"),
+        status="verified",
+    )
+    db_session.add(blocking)
+    await db_session.flush()
+    service = SolverService(
+        constraint_repo=ConstraintRepository(session=db_session),
+        timetable_repo=TimetableRepository(session=db_session),
+        revision_repo=RevisionRepository(session=db_session),
+        solver_pool=solver_pool,
+        timeout_seconds=30,
+        core_budget_seconds=5,
+    )
+    result, revisions = await service.generate_school_revisions(db_timetable.owner_id)
+    assert result.status == "unsat"
+    assert revisions == {}
+    assert await service.revision_repo.get_latest(db_timetable.id) is None
+    warning = service.explain_school_unsat(result, [blocking])
+    assert warning is not None
+    assert warning.constraint_descriptions == ["Rossi assente"]
+
+
+async def test_solve_school_inputs_reports_z3_statistics(solver_pool: SolverPool):
+    service = SolverService(constraint_repo=None, solver_pool=solver_pool, timeout_seconds=30)  # type: ignore[arg-type]
+    a = _class({"Matematica": "Prof. Rossi", "Italiano": "Prof. Bianchi"})
+    b = _class({"Fisica": "Prof. Rossi", "Storia": "Prof. Verdi"})
+    result = await service.solve_school_inputs([a, b])
+    assert result.status == "sat"
+    assert result.components == [[a.timetable_id, b.timetable_id]]
+    assert result.statistics["max memory"] > 0
+
+
+async def test_refused_school_component_cancels_its_siblings(monkeypatch):
+    from easyorario.exceptions import SolverJobError
+
+    service = SolverService(constraint_repo=None, solver_pool=None, timeout_seconds=30)  # type: ignore[arg-type]
+    a = _class({"Matematica": "Prof. Rossi"})
+    b = _class({"Fisica": "Prof. Verdi"})
+    waiting = asyncio.Event()
+    cancelled: list[bool] = []
+
+    async def _submit(fn, job, **kwargs):
+        if job.inputs[0] is b:
+            raise SolverJobError("solver_queue_full")
+        try:
+            await waiting.wait()
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    monkeypatch.setattr(service, "_submit", _submit)
+    with pytest.raises(SolverJobError):
+        await service.solve_school_inputs([a, b])
+    assert cancelled == [True]
+
+
+class _RecordingScheduler(SolverScheduler):
+    def __init__(self, pool: SolverPool) -> None:
+        super().__init__(pool)
+        self.calls: list[tuple[str | None, int, int]] = []
+
+    def reserve(self, *, owner, priority=INTERACTIVE, slots=1):
+        self.calls.append((owner, priority, slots))
+        return super().reserve(owner=owner, priority=priority, slots=slots)
+
+
+async def test_service_schedules_single_solves_before_school_batches(solver_pool: SolverPool):
+    scheduler = _RecordingScheduler(solver_pool)
+    service = SolverService(constraint_repo=None, solver_pool=solver_pool, scheduler=scheduler, timeout_seconds=30)  # type: ignore[arg-type]
+    assert (await service.solve_input(_input(), owner="alice")).status == "sat"
+    a = _class({"Matematica": "Prof. Rossi", "Italiano": "Prof. Bianchi"})
+    assert (await service.solve_school_inputs([a], owner="alice")).status == "sat"
+    assert scheduler.calls == [("alice", INTERACTIVE, 1), ("alice", BATCH, 1)]
+
+
+async def test_portfolio_is_admitted_as_one_job_of_its_owner(solver_pool: SolverPool):
+    scheduler = _RecordingScheduler(solver_pool)
+    service = SolverService(
+        constraint_repo=None,  # type: ignore[arg-type]
+        solver_pool=solver_pool,
+        scheduler=scheduler,
+        timeout_seconds=30,
+        portfolio_size=3,
+    )
+    assert (await service.solve_input(_input(), owner="alice")).status == "sat"
+    assert scheduler.calls == [("alice", INTERACTIVE, 3)]
+
+
+def test_fingerprint_ignores_ids_and_constraint_order():
+    first = _input({"c1": _formal("teacher_unavailable", teacher="Prof. Rossi"), "c2": _formal("general")})
+    second = _input({"x": _formal("general"), "y": _formal("teacher_unavailable", teacher="Prof. Rossi")})
+    assert fingerprint(first, "onehot", 300) == fingerprint(second, "onehot", 300)
+
+
+def test_fingerprint_changes_with_content_and_settings():
+    base = _input({"c1": _formal("teacher_unavailable", teacher="Prof. Rossi")})
+    edited = _input({"c1": _formal("teacher_unavailable", teacher="Prof. Bianchi")})
+    key = fingerprint(base, "onehot", 300)
+    assert fingerprint(edited, "onehot", 300) != key
+    assert fingerprint(_input(base.constraints, weekly_hours=12), "onehot", 300) != key
+    assert fingerprint(base, "integer", 300) != key
+    assert fingerprint(base, "onehot", 60) != key
+    assert fingerprint(base, "onehot", 300, idle_hours=True) != key
+
+
+async def test_identical_solve_is_served_from_cache(db_session: AsyncSession, solver_pool: SolverPool, monkeypatch):
+    service = SolverService(
+        constraint_repo=None,  # type: ignore[arg-type]
+        cache_repo=SolverCacheRepository(session=db_session),
+        solver_pool=solver_pool,
+        timeout_seconds=30,
+    )
+    first = await service.solve_input(_conflicting_input())
+    assert first.status == "unsat"
+    assert first.conflicting_constraint_ids
+
+    async def _unexpected(*args, **kwargs):
+        raise AssertionError("cache hit must not reach the pool")
+
+    monkeypatch.setattr(solver_pool, "run", _unexpected)
+    # Same content under new ids: the cached core is mapped onto the new constraints.
+    renamed = _conflicting_input()
+    renamed.constraints = {f"new-{cid}": formal for cid, formal in renamed.constraints.items()}
+    second = await service.solve_input(renamed)
+    assert second.status == "unsat"
+    assert second.config == "cache"
+    assert sorted(second.conflicting_constraint_ids) == sorted(f"new-{cid}" for cid in first.conflicting_constraint_ids)
+
+
+async def test_hinted_sat_or_unfinished_solves_are_not_cached(
+    db_session: AsyncSession, solver_pool: SolverPool, monkeypatch
+):
+    from easyorario.exceptions import SolverJobError
+
+    cache_repo = SolverCacheRepository(session=db_session)
+    service = SolverService(
+        constraint_repo=None,  # type: ignore[arg-type]
+        cache_repo=cache_repo,
+        solver_pool=solver_pool,
+        timeout_seconds=30,
+    )
+    solver_input = _input()
+    key = service._fingerprint(solver_input)
+    hinted = await service.solve_input(solver_input, hint=draft_grid(solver_input))
+    assert hinted.status == "sat"
+    assert await cache_repo.get_by_fingerprint(key) is None
+
+    async def _killed_while_optimizing(fn, job, *, on_event=None, **kwargs):
+        on_event(SolveEvent("improved", grid=hinted.grid, cost=2))
+        raise SolverJobError("solver_timeout")
+
+    monkeypatch.setattr(service, "_submit", _killed_while_optimizing)
+    salvaged = await service.solve_input(solver_input)
+    assert (salvaged.status, salvaged.cost, salvaged.optimal) == ("sat", 2, False)
+    assert await cache_repo.get_by_fingerprint(key) is None
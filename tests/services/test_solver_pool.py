@@ -0,0 +1,165 @@
+"""Tests for the solver process pool: result delivery, events, hard timeouts, and failures."""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from easyorario.exceptions import SolverJobError
+from easyorario.services.solver_pool import SolverPool, WorkerLimits
+
+
+def _double(payload: int, emit) -> int:
+    return payload * 2
+
+
+def _pid(payload: None, emit) -> int:
+    return os.getpid()
+
+
+def _sleep(seconds: float, emit) -> str:
+    time.sleep(seconds)
+    return "done"
+
+
+def _emit_then_return(count: int, emit) -> int:
+    for i in range(count):
+        emit(i)
+    return count
+
+
+def _raise(payload: None, emit) -> None:
+    raise ValueError("boom")
+
+
+def _allocate(megabytes: int, emit) -> int:
+    return len(bytearray(megabytes * 1024 * 1024))
+
+
+def _spin(seconds: float, emit) -> str:
+    started = time.process_time()
+    while time.process_time() - started < seconds:
+        pass
+    return "done"
+
+
+_initialized = False
+
+
+def _initialize() -> None:
+    global _initialized
+    _initialized = True
+
+
+def _is_initialized(payload: None, emit) -> bool:
+    return _initialized
+
+
+@pytest.fixture
+def pool():
+    pool = SolverPool(workers=2)
+    yield pool
+    pool.shutdown()
+
+
+async def test_run_returns_job_result(pool: SolverPool):
+    assert await pool.run(_double, 21, timeout=10) == 42
+
+
+async def test_run_executes_in_a_separate_process(pool: SolverPool):
+    assert await pool.run(_pid, None, timeout=10) != os.getpid()
+
+
+async def test_workers_are_reused_across_jobs(pool: SolverPool):
+    first = await pool.run(_pid, None, timeout=10)
+    second = await pool.run(_pid, None, timeout=10)
+    assert first == second
+    assert pool.size == 1
+
+
+async def test_concurrency_is_bounded_by_worker_count(pool: SolverPool):
+    pids = await asyncio.gather(*(pool.run(_pid, None, timeout=10) for _ in range(6)))
+    assert len(set(pids)) <= 2
+    assert pool.size <= 2
+
+
+async def test_affinity_routes_jobs_to_the_same_worker(pool: SolverPool):
+    first, _ = await asyncio.gather(
+        pool.run(_pid, None, timeout=10, affinity="a"),
+        pool.run(_sleep, 0.2, timeout=10, affinity="b"),
+    )
+    results = [await pool.run(_pid, None, timeout=10, affinity="a") for _ in range(3)]
+    assert results == [first] * 3
+
+
+async def test_run_forwards_events_before_result(pool: SolverPool):
+    events: list[int] = []
+    result = await pool.run(_emit_then_return, 3, timeout=10, on_event=events.append)
+    await asyncio.sleep(0)
+    assert result == 3
+    assert events == [0, 1, 2]
+
+
+async def test_run_kills_worker_at_deadline(pool: SolverPool):
+    started = time.monotonic()
+    with pytest.raises(SolverJobError) as exc_info:
+        await pool.run(_sleep, 30, timeout=0.5)
+    assert exc_info.value.error_key == "solver_timeout"
+    assert time.monotonic() - started < 10
+    assert pool.size == 0
+
+
+async def test_pool_recovers_after_timeout(pool: SolverPool):
+    with pytest.raises(SolverJobError):
+        await pool.run(_sleep, 30, timeout=0.5)
+    assert await pool.run(_double, 2, timeout=10) == 4
+
+
+async def test_job_exception_raises_solver_crashed(pool: SolverPool):
+    with pytest.raises(SolverJobError) as exc_info:
+        await pool.run(_raise, None, timeout=10)
+    assert exc_info.value.error_key == "solver_crashed"
+    assert await pool.run(_double, 1, timeout=10) == 2
+
+
+async def test_cancelling_caller_kills_worker(pool: SolverPool):
+    task = asyncio.create_task(pool.run(_sleep, 30, timeout=60))
+    await asyncio.sleep(1.0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert pool.size == 0
+
+
+async def test_memory_limit_raises_resource_limit():
+    """A job allocating past the address-space limit fails as over its limits; the worker survives."""
+    pool = SolverPool(workers=1, limits=WorkerLimits(memory_mb=512))
+    try:
+        with pytest.raises(SolverJobError) as exc_info:
+            await pool.run(_allocate, 1024, timeout=30)
+        assert exc_info.value.error_key == "solver_resource_limit"
+        assert await pool.run(_allocate, 16, timeout=30) == 16 * 1024 * 1024
+    finally:
+        pool.shutdown()
+
+
+async def test_cpu_limit_applies_per_job():
+    """Each job gets the full CPU budget; one that exceeds it is stopped and its worker replaced."""
+    pool = SolverPool(workers=1, limits=WorkerLimits(cpu_seconds=1))
+    try:
+        assert [await pool.run(_spin, 0.6, timeout=30) for _ in range(2)] == ["done", "done"]
+        with pytest.raises(SolverJobError) as exc_info:
+            await pool.run(_spin, 10, timeout=30)
+        assert exc_info.value.error_key == "solver_resource_limit"
+        assert await pool.run(_double, 2, timeout=10) == 4
+    finally:
+        pool.shutdown()
+
+
+async def test_initializer_runs_in_every_worker():
+    pool = SolverPool(workers=1, initializer=_initialize)
+    try:
+        assert await pool.run(_is_initialized, None, timeout=10)
+    finally:
+        pool.shutdown()